@@ -169,6 +169,10 @@ housekeeping_thread.start()
 # Run on startup
 cleanup_old_reports()
 
+# Background meta-label model refresh (training runs in worker processes)
+from src.utils import training_scheduler
+training_scheduler.start()
+
 # Mount frontend build files (if exists)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 WEB_DIST_DIR = os.path.join(BASE_DIR, "web", "dist")
@@ -898,7 +902,7 @@ async def analyze_batch(req: AnalyzeRequest):
     # Create job and run in background
     job_id = str(uuid.uuid4())
     with _jobs_lock:
-        _jobs[job_id] = {"status": "running", "result": None, "error": None, "step_logs": [], "progress": {}}
+        _jobs[job_id] = {"status": "running", "result": None, "error": None, "step_logs": [], "progress": {}, "streams": {}}
 
     def _run_job():
         try:
@@ -918,6 +922,9 @@ async def analyze_batch(req: AnalyzeRequest):
     return {"job_id": job_id, "status": "running"}
 
 
+STREAM_TAIL_CHARS = 400  # characters of each active stream returned by /analyze-status
+
+
 @app.get("/analyze-status/{job_id}")
 async def analyze_status(job_id: str):
     """Poll for analysis job status. No-cache headers prevent mobile browser caching."""
@@ -943,8 +950,15 @@ async def analyze_status(job_id: str):
             headers={"Cache-Control": "no-cache, no-store, must-revalidate", "Pragma": "no-cache", "Expires": "0"}
         )
     else:
+        # Partial LLM output of the steps still streaming, per {symbol}_{step}: only the
+        # tail the UI shows is sent (polled every second), with the full length in "chars".
+        # Copied under the lock (writers append concurrently)
+        with _jobs_lock:
+            streams = {k: {**v, "text": v["text"][-STREAM_TAIL_CHARS:], "chars": len(v["text"])}
+                       for k, v in job.get("streams", {}).items() if v.get("status") == "streaming"}
         return JSONResponse(
-            content={"status": "running", "step_logs": job.get("step_logs", []), "progress": job.get("progress", {})},
+            content={"status": "running", "step_logs": job.get("step_logs", []), "progress": job.get("progress", {}),
+                     "streams": streams},
             headers={"Cache-Control": "no-cache, no-store, must-revalidate", "Pragma": "no-cache", "Expires": "0"}
         )
 
@@ -14,8 +14,11 @@ from ..tools.analyst_tools import (
     get_bbands,
     get_macd,
     get_vwap,
-    get_volume_analysis
+    get_volume_analysis,
+    get_technical_summary,
+    prime_indicator_panel
 )
+from ..utils.indicator_summary import is_summary_mode
 
 load_dotenv(os.path.join('config', '.env'))
 
@@ -60,9 +63,25 @@ SOCIAL MEDIA (Reddit):
 """
 
 class TechnicalAnalyst:
+    @staticmethod
+    def prime_batch(symbols: list, investment_period: str) -> int:
+        """Compute indicators for a whole batch in one panel pass before per-symbol analysis."""
+        return prime_indicator_panel(symbols, investment_period)
+
     @staticmethod
     def analyze(symbol: str, investment_period: str) -> str:
         """Fetch technical indicator data from APIs without LLM processing."""
+        if is_summary_mode():
+            # Compact table + signals; full series via get_indicator_series()
+            summary = get_technical_summary(symbol, investment_period)
+            volume_out = get_volume_analysis(symbol, investment_period)
+            return f"""=== TECHNICAL DATA: {symbol} ===
+
+{summary}
+
+{volume_out}
+"""
+
         data = download_yf_data(symbol)
         sma50 = get_sma(data, 50)
         sma100 = get_sma(data, 100)
@@ -102,15 +121,33 @@ class MarketAnalyst:
         }
         period = period_map.get(investment_period, "6mo")
 
-        # Major indices — fetch in parallel
-        from concurrent.futures import ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            spy_future = executor.submit(YahooFinanceCompat("SPY").get_history, period=period)
-            qqq_future = executor.submit(YahooFinanceCompat("QQQ").get_history, period=period)
-            vix_future = executor.submit(YahooFinanceCompat("^VIX").get_history, period="5d")
-            spy_hist = spy_future.result()
-            qqq_hist = qqq_future.result()
-            vix_hist = vix_future.result()
+        # Sector ETFs (XLK, XLF, XLV, XLE, XLI, XLC, XLY, XLP, XLU, XLRE, XLB)
+        sectors = {
+            "XLK": "Technology",
+            "XLF": "Financials",
+            "XLV": "Healthcare",
+            "XLE": "Energy",
+            "XLI": "Industrials",
+            "XLC": "Communication",
+            "XLY": "Consumer Discretionary",
+            "XLP": "Consumer Staples",
+            "XLU": "Utilities",
+            "XLRE": "Real Estate",
+            "XLB": "Materials"
+        }
+
+        # Batched fetch: indices over the analysis period, sectors/VIX/10Y over 1 month
+        index_symbols = ["SPY", "QQQ"]
+        monthly_symbols = list(sectors) + ["^VIX", "^TNX"]
+        if period == "1mo":
+            history = YahooFinanceCompat.get_history_batch(index_symbols + monthly_symbols, period="1mo")
+        else:
+            history = YahooFinanceCompat.get_history_batch(index_symbols, period=period)
+            history.update(YahooFinanceCompat.get_history_batch(monthly_symbols, period="1mo"))
+
+        spy_hist = history.get("SPY", pd.DataFrame())
+        qqq_hist = history.get("QQQ", pd.DataFrame())
+        vix_hist = history.get("^VIX", pd.DataFrame()).tail(5)
 
         # S&P 500 analysis
         spy_current = spy_hist['Close'].iloc[-1] if not spy_hist.empty else "N/A"
@@ -129,47 +166,17 @@ class MarketAnalyst:
         # Market breadth (simplified - skip component symbols to avoid crashes)
         breadth = "Market breadth data unavailable (simplified mode)"
 
-        # Sector performance (XLK, XLF, XLV, XLE, XLI, XLC, XLY, XLP, XLU, XLRE, XLB)
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        sectors = {
-            "XLK": "Technology",
-            "XLF": "Financials",
-            "XLV": "Healthcare",
-            "XLE": "Energy",
-            "XLI": "Industrials",
-            "XLC": "Communication",
-            "XLY": "Consumer Discretionary",
-            "XLP": "Consumer Staples",
-            "XLU": "Utilities",
-            "XLRE": "Real Estate",
-            "XLB": "Materials"
-        }
-
-        def _fetch_sector_perf(ticker, name):
-            try:
-                compat = YahooFinanceCompat(ticker)
-                h = compat.get_history(period="1mo")
-                if len(h) >= 2:
-                    perf = (h['Close'].iloc[-1] - h['Close'].iloc[0]) / h['Close'].iloc[0] * 100
-                    return f"{name}: {perf:.2f}%"
-            except:
-                pass
-            return None
-
+        # Sector performance (1 month)
         sector_perf = []
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            futures = {executor.submit(_fetch_sector_perf, t, n): n for t, n in sectors.items()}
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    sector_perf.append(result)
-
-        # Interest rates (10-year Treasury) — already fetched in parallel above if needed
-        try:
-            tnx_hist = YahooFinanceCompat("^TNX").get_history(period="1mo")
-            rate_10y = tnx_hist['Close'].iloc[-1] if not tnx_hist.empty else "N/A"
-        except:
-            rate_10y = "N/A"
+        for ticker, name in sectors.items():
+            h = history.get(ticker, pd.DataFrame())
+            if len(h) >= 2:
+                perf = (h['Close'].iloc[-1] - h['Close'].iloc[0]) / h['Close'].iloc[0] * 100
+                sector_perf.append(f"{name}: {perf:.2f}%")
+
+        # Interest rates (10-year Treasury)
+        tnx_hist = history.get("^TNX", pd.DataFrame())
+        rate_10y = tnx_hist['Close'].iloc[-1] if not tnx_hist.empty else "N/A"
 
         # Format values for display
         spy_sma50_str = f"${spy_sma50:.2f}" if isinstance(spy_sma50, float) else "N/A"
@@ -1,5 +1,9 @@
-import requests
 from datetime import datetime, timedelta
+from ..utils.async_fetch import fetch_all
+from ..utils.disk_cache import DiskCache
+
+# Persistent cache for World Bank series (annual data changes a few times a year)
+_wb_cache = DiskCache('worldbank')
 
 
 class GlobalEconomicAnalyst:
@@ -17,6 +21,21 @@ class GlobalEconomicAnalyst:
         'debt_to_gdp': 'GC.DOD.TOTL.GD.ZS', # Central government debt (% of GDP)
     }
 
+    # Cache lifetime per indicator (days). Entries also expire at the next WDI refresh.
+    INDICATOR_TTL_DAYS = {
+        'cpi': 30,
+        'inflation': 30,
+        'gdp_growth': 30,
+        'gdp_per_capita': 60,
+        'unemployment': 30,
+        'interest_rate': 60,
+        'trade_balance': 60,
+        'debt_to_gdp': 90,
+    }
+
+    # Months in which the World Development Indicators database is usually refreshed
+    WDI_REFRESH_MONTHS = (3, 7, 10, 12)
+
     # Major economies to track
     MAJOR_ECONOMIES = {
         'US': 'United States',
@@ -29,32 +48,89 @@ class GlobalEconomicAnalyst:
     def __init__(self):
         self.base_url = 'https://api.worldbank.org/v2'
 
-    def _fetch_indicator(self, indicator_code: str, country_code: str, periods: int = 4) -> list:
-        """Fetch indicator data for a specific country."""
-        url = f'{self.base_url}/country/{country_code}/indicator/{indicator_code}'
-        params = {
-            'format': 'json',
-            'per_page': periods,
-            'mrv': periods  # Most recent values
+    def _cache_expiry(self, indicator_name: str, now: datetime = None) -> float:
+        """Expiry (epoch seconds): indicator TTL, capped at the next WDI refresh month."""
+        now = now or datetime.now()
+        ttl_expiry = now + timedelta(days=self.INDICATOR_TTL_DAYS.get(indicator_name, 30))
+
+        year, month = now.year, now.month
+        for _ in range(12):
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+            if month in self.WDI_REFRESH_MONTHS:
+                break
+        next_refresh = datetime(year, month, 1)
+
+        return min(ttl_expiry, next_refresh).timestamp()
+
+    def _indicator_request(self, indicator_code: str, country_codes: list, periods: int) -> dict:
+        """Build the request for one indicator across several countries."""
+        # Multi-country syntax: country/US;CN;JP/indicator/...; mrv applies per country
+        return {
+            'url': f'{self.base_url}/country/{";".join(country_codes)}/indicator/{indicator_code}',
+            'params': {
+                'format': 'json',
+                'per_page': periods * len(country_codes),
+                'mrv': periods  # Most recent values
+            },
+            'timeout': 15,
         }
 
-        try:
-            response = requests.get(url, params=params, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                if len(data) > 1 and data[1]:
-                    return [
-                        {
-                            'date': item.get('date'),
-                            'value': item.get('value'),
-                            'country': item.get('country', {}).get('value')
-                        }
-                        for item in data[1] if item.get('value') is not None
-                    ]
-            return []
-        except Exception as e:
-            print(f'WARNING: Could not fetch {indicator_code} for {country_code}: {str(e)[:50]}')
-            return []
+    def _parse_indicator(self, response, country_codes: list) -> dict:
+        """Parse a multi-country indicator response into {country_code: [latest first]}."""
+        if response.status_code != 200:
+            return {}
+        data = response.json()
+        if len(data) < 2 or not data[1]:
+            return {}
+        results = {cc: [] for cc in country_codes}
+        for item in data[1]:
+            country_id = item.get('country', {}).get('id')
+            if item.get('value') is not None and country_id in results:
+                results[country_id].append({
+                    'date': item.get('date'),
+                    'value': item.get('value'),
+                    'country': item.get('country', {}).get('value')
+                })
+        for series in results.values():
+            series.sort(key=lambda x: x['date'] or '', reverse=True)
+        return results
+
+    def _fetch_indicators(self, country_codes: list, periods: int = 4) -> dict:
+        """
+        Fetch every indicator for all countries.
+
+        Disk-cached series are reused; misses are fetched concurrently on the
+        shared async loop (one request per indicator).
+
+        Returns:
+            Dict of indicator_name -> {country_code: [data points]}
+        """
+        results = {}
+        missing = []
+        for indicator_name, indicator_code in self.INDICATORS.items():
+            cached = _wb_cache.get((indicator_code, tuple(country_codes), periods))
+            if cached is not None:
+                results[indicator_name] = cached
+            else:
+                missing.append((indicator_name, indicator_code))
+
+        responses = fetch_all([self._indicator_request(ic, country_codes, periods) for _, ic in missing])
+        for (indicator_name, indicator_code), response in zip(missing, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                parsed = self._parse_indicator(response, country_codes)
+            except Exception as e:
+                print(f'WARNING: Could not fetch {indicator_code} for {",".join(country_codes)}: {str(e)[:50]}')
+                parsed = {}
+            if parsed:
+                _wb_cache.set((indicator_code, tuple(country_codes), periods), parsed,
+                              self._cache_expiry(indicator_name))
+            results[indicator_name] = parsed
+
+        return results
 
     def _get_period_label(self, investment_period: str) -> str:
         """Get display label for the investment period."""
@@ -93,30 +169,14 @@ class GlobalEconomicAnalyst:
 
 ---""")
 
-        # Fetch all indicators for all countries in parallel
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-
-        fetch_tasks = {}
-        for country_code, country_name in self.MAJOR_ECONOMIES.items():
-            for indicator_name, indicator_code in self.INDICATORS.items():
-                key = (country_code, country_name, indicator_name, indicator_code)
-                fetch_tasks[key] = None
-
-        results = {}
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = {
-                executor.submit(self._fetch_indicator, ic, cc, dp): (cc, cn, iname, ic)
-                for (cc, cn, iname, ic), dp in [
-                    (k, data_points) for k in fetch_tasks
-                ]
-            }
-            for future in as_completed(futures):
-                cc, cn, iname, ic = futures[future]
-                try:
-                    data = future.result()
-                    results[(cc, iname)] = data
-                except Exception:
-                    results[(cc, iname)] = []
+        # One request per indicator (all countries), cache misses fetched concurrently
+        country_codes = list(self.MAJOR_ECONOMIES)
+        by_indicator = self._fetch_indicators(country_codes, data_points)
+        results = {
+            (cc, iname): by_indicator.get(iname, {}).get(cc, [])
+            for iname in self.INDICATORS
+            for cc in country_codes
+        }
 
         # Build report sections from fetched data
         for country_code, country_name in self.MAJOR_ECONOMIES.items():
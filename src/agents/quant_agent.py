@@ -9,9 +9,25 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+import os
 import warnings
+from ..utils import indicator_engine, model_registry, training_scheduler, dataset_builder, triple_barrier
 warnings.filterwarnings('ignore')
 
+# Meta-label models in the registry: one per symbol (or universe), feature schema and
+# label horizon. The schema follows dataset_builder, which owns the feature definitions.
+META_LABEL_MODEL = 'meta_label'
+META_LABEL_FEATURES = dataset_builder.FEATURE_COLUMNS
+META_LABEL_UNIVERSE = 'universe'
+# 'symbol': one model per ticker; 'universe': one cross-sectional model for all tickers
+META_LABEL_SCOPE = os.getenv('META_LABEL_SCOPE', 'symbol').strip().lower()
+TRAIN_MAX_SAMPLES = int(os.getenv('TRAIN_MAX_SAMPLES', '3000'))  # TabPFN context limit
+
+
+def meta_label_schema(investment_period: str) -> str:
+    """Registry schema of a meta-label model: feature schema plus its label horizon in bars."""
+    return f"{dataset_builder.FEATURE_SCHEMA}h{dataset_builder.label_horizon(investment_period)}"
+
 
 class QuantAgent:
     """Triple-barrier + trend analysis based on Lopez de Prado."""
@@ -35,7 +51,8 @@ class QuantAgent:
             if ohlcv is None or len(ohlcv) < 50:
                 return self._format_no_data(symbol)
 
-            # Calculate indicators
+            # Calculate indicators (one engine pass, shared with Technical analysis)
+            indicator_engine.compute(ohlcv)
             atr = self._calculate_atr(ohlcv, period=14)
             volatility = self._calculate_volatility(ohlcv, period=20)
             adx = self._calculate_adx(ohlcv, period=14)
@@ -51,7 +68,7 @@ class QuantAgent:
             vol_regime = self._analyze_volatility(volatility, atr)
 
             # Meta-labels
-            meta_label = self._meta_label(ohlcv, trend, vol_regime)
+            meta_label = self._meta_label(ohlcv, trend, vol_regime, symbol, investment_period)
 
             # Format output
             return self._format_output(
@@ -87,88 +104,46 @@ class QuantAgent:
 
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate Average True Range."""
-        high = df['High']
-        low = df['Low']
-        close = df['Close']
-
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        return atr
+        return indicator_engine.get(df, 'ATR', period)
 
     def _calculate_volatility(self, df: pd.DataFrame, period: int = 20) -> pd.Series:
         """Calculate historical volatility (annualized)."""
-        returns = df['Close'].pct_change()
-        volatility = returns.rolling(window=period).std() * np.sqrt(252)
-        return volatility
+        return indicator_engine.get(df, 'VOLATILITY', period)
 
     def _calculate_adx(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         """Calculate Average Directional Index (ADX)."""
-        high = df['High']
-        low = df['Low']
-        close = df['Close']
-
-        # True Range
-        tr = pd.concat([
-            high - low,
-            abs(high - close.shift()),
-            abs(low - close.shift())
-        ], axis=1).max(axis=1)
-
-        # Directional Movement
-        up_move = high - high.shift()
-        down_move = low.shift() - low
-
-        plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0),
-                           index=df.index)
-        minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0),
-                            index=df.index)
-
-        # Smoothed averages
-        atr_smooth = tr.rolling(window=period).mean()
-        plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr_smooth)
-        minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr_smooth)
-
-        # ADX
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(window=period).mean()
-
+        indicators = indicator_engine.compute(df, {'adx': (period,)})
         return pd.DataFrame({
-            'adx': adx,
-            'plus_di': plus_di,
-            'minus_di': minus_di
+            'adx': indicators[indicator_engine.column('ADX', period)],
+            'plus_di': indicators[indicator_engine.column('PLUS_DI', period)],
+            'minus_di': indicators[indicator_engine.column('MINUS_DI', period)]
         })
 
-    def _find_support_resistance(self, df: pd.DataFrame) -> Dict[str, List]:
-        """Find support and resistance levels using swing highs/lows."""
+    def _find_support_resistance(self, df: pd.DataFrame, lookback: int = 5,
+                                 atr_tolerance: float = 0.5) -> Dict[str, List]:
+        """
+        Find support and resistance levels using swing highs/lows.
+
+        Swing points are bars that are the high (low) extreme of the centered
+        +/- lookback window. Swing levels within atr_tolerance * ATR-14 of each
+        other are merged, and the nearest clusters on each side of the current
+        price are kept.
+        """
         close = df['Close'].values
         high = df['High'].values
         low = df['Low'].values
+        current_price = close[-1]
 
-        # Find swing highs and lows (simple implementation)
-        lookback = 5
-        swing_highs = []
-        swing_lows = []
-
-        for i in range(lookback, len(df) - lookback):
-            if high[i] == max(high[i-lookback:i+lookback+1]):
-                swing_highs.append(high[i])
-            if low[i] == min(low[i-lookback:i+lookback+1]):
-                swing_lows.append(low[i])
-
-        # Get unique levels and sort
-        resistance = sorted(set(swing_highs), reverse=True)[:3]
-        support = sorted(set(swing_lows))[:3]
+        is_high, is_low = indicator_engine.swing_points(high, low, lookback)
 
-        # Ensure current price is considered
-        current_price = close[-1]
+        atr = indicator_engine.get(df, 'ATR', 14).iloc[-1]
+        tolerance = atr * atr_tolerance if not pd.isna(atr) else current_price * 0.01
+        resistance, _ = indicator_engine.cluster_levels(high[is_high], tolerance)
+        support, _ = indicator_engine.cluster_levels(low[is_low], tolerance)
 
-        # Filter: support below price, resistance above
-        support = [s for s in support if s < current_price][-3:]
-        resistance = [r for r in resistance if r > current_price][:3]
+        # Filter: support below price, resistance above; keep the three nearest
+        support = [float(s) for s in support[support < current_price][-3:]]
+        resistance = [float(r) for r in resistance[resistance > current_price][:3][::-1]]
 
         return {
             'support': support if support else [current_price * 0.95],
@@ -181,22 +156,21 @@ class QuantAgent:
         current_price = df['Close'].iloc[-1]
         current_atr = atr.iloc[-1] if not pd.isna(atr.iloc[-1]) else current_price * 0.02
 
-        # Period multipliers
-        period_days = {
-            'short+': 7,
-            'short': 21,
-            'medium': 45,
-            'long': 90
-        }
-        days = period_days.get(investment_period, 45)
+        days = triple_barrier.PERIOD_DAYS.get(investment_period, 45)
 
         # Triple-barrier levels (based on ATR)
-        profit_target_mult = 3.0  # 3x ATR for profit target
-        stop_loss_mult = 1.5      # 1.5x ATR for stop loss
+        profit_target_mult = triple_barrier.PROFIT_TARGET_MULT
+        stop_loss_mult = triple_barrier.STOP_LOSS_MULT
 
         profit_target = current_price + (current_atr * profit_target_mult)
         stop_loss = current_price - (current_atr * stop_loss_mult)
 
+        # How the same barriers resolved historically (first touch, incl. vertical barrier)
+        history = triple_barrier.first_touch(
+            df['High'], df['Low'], df['Close'], atr, triple_barrier.horizon_bars(days))
+        outcomes = history['barrier'][~np.isnan(history['barrier'])]
+        events = len(outcomes)
+
         profit_target_pct = ((profit_target - current_price) / current_price) * 100
         stop_loss_pct = ((stop_loss - current_price) / current_price) * 100
 
@@ -220,7 +194,11 @@ class QuantAgent:
             'stop_loss_pct': round(stop_loss_pct, 1),
             'time_barrier_days': days,
             'risk_reward_ratio': round(risk_reward, 2),
-            'atr': round(current_atr, 2)
+            'atr': round(current_atr, 2),
+            'historical_events': events,
+            'historical_profit_rate': round(float((outcomes > 0).mean()), 2) if events else None,
+            'historical_stop_rate': round(float((outcomes < 0).mean()), 2) if events else None,
+            'historical_time_rate': round(float((outcomes == 0).mean()), 2) if events else None,
         }
 
     def _analyze_trend(self, df: pd.DataFrame, adx: pd.DataFrame) -> Dict[str, Any]:
@@ -282,16 +260,18 @@ class QuantAgent:
             'atr_14': round(current_atr, 2)
         }
 
-    def _meta_label(self, df: pd.DataFrame, trend: Dict, vol_regime: Dict) -> Dict[str, Any]:
-        """Generate meta-label prediction using TabPFN-3 (trained model only)."""
-        import os
-        import joblib
-        from datetime import datetime
+    def _meta_label(self, df: pd.DataFrame, trend: Dict, vol_regime: Dict,
+                    symbol: str = None,
+                    investment_period: str = dataset_builder.DEFAULT_INVESTMENT_PERIOD) -> Dict[str, Any]:
+        """
+        Generate meta-label prediction using TabPFN-3 (inference only; rule-based until a model is ready).
 
-        model_path = "models/trained/meta_label_model.pkl"
+        The model is the one trained on labels with this investment period's vertical barrier.
+        """
+        scope = symbol if symbol and META_LABEL_SCOPE != 'universe' else META_LABEL_UNIVERSE
 
         # Prepare features for TabPFN
-        features = self._prepare_features(df, trend, vol_regime)
+        features = self._prepare_features(df)
 
         # Import TabPFN
         try:
@@ -305,36 +285,23 @@ class QuantAgent:
                 'error': 'TabPFN not installed. Run: pip install tabpfn'
             }
 
-        # Train model if not exists or is older than 7 days
-        should_train = False
-        if not os.path.exists(model_path):
-            should_train = True
-            print(f"INFO: No trained model found, training...")
-        else:
-            # Check model age
-            model_age_days = (datetime.now().timestamp() - os.path.getmtime(model_path)) / 86400
-            if model_age_days > 7:
-                should_train = True
-                print(f"INFO: Model is {model_age_days:.1f} days old, retraining...")
-
-        if should_train:
-            train_success = self._train_tabpfn_model(df)
-            if not train_success:
-                # If training fails and model exists, use existing model
-                if os.path.exists(model_path):
-                    print(f"WARNING: Training failed, using existing model")
+        # Inference only: missing/stale models are (re)trained by the background scheduler
+        entry = model_registry.load(META_LABEL_MODEL, scope, meta_label_schema(investment_period))
+        if model_registry.is_stale(entry):
+            if training_scheduler.request(scope, df, investment_period):
+                if entry is None:
+                    print(f"INFO: No trained model found for {scope}, training in background...")
                 else:
-                    return {
-                        'prediction': 'error',
-                        'confidence': 0,
-                        'score': 0,
-                        'method': 'error',
-                        'error': 'TabPFN training failed. Check logs for details.'
-                    }
-
-        # Load trained model
+                    print(f"INFO: Model for {scope} is {model_registry.age_days(entry):.1f} days old, retraining in background...")
+        if entry is None:
+            # Rule-based answer until the first model for this scope is ready
+            result = self._meta_label_rule_based(trend, vol_regime)
+            result['note'] = 'TabPFN model training in background'
+            return result
+
+        # Predict with the cached model
         try:
-            model = joblib.load(model_path)
+            model = entry['model']
             prediction_proba = model.predict_proba(features)[0]
             confidence = max(prediction_proba)
             prediction_idx = prediction_proba.argmax()
@@ -357,21 +324,38 @@ class QuantAgent:
                 'error': f'Model inference failed: {str(e)}'
             }
 
-    def _train_tabpfn_model(self, df: pd.DataFrame) -> bool:
-        """Train TabPFN model on historical data. Returns True if successful."""
-        import os
-        import joblib
-        from tabpfn import TabPFNClassifier
-
-        # Create models directory
-        os.makedirs("models/trained", exist_ok=True)
-
+    def _train_tabpfn_model(self, df: pd.DataFrame,
+                            investment_period: str = dataset_builder.DEFAULT_INVESTMENT_PERIOD) -> Optional[tuple]:
+        """Train TabPFN model on one symbol's history. Returns (model, metrics) or None."""
         # Generate training data using triple-barrier labels
-        X, y = self._generate_training_data(df)
+        X, y = self._generate_training_data(df, investment_period)
+        return self._fit_tabpfn(X, y)
+
+    def _train_universe_model(self,
+                              investment_period: str = dataset_builder.DEFAULT_INVESTMENT_PERIOD) -> Optional[tuple]:
+        """Train TabPFN on the cross-sectional universe dataset. Returns (model, metrics) or None."""
+        dataset = dataset_builder.load_or_build(investment_period=investment_period)
+        if dataset is None:
+            print(f"ERROR: Universe dataset unavailable")
+            return None
+
+        # TabPFN works on a bounded context: keep the most recent rows, in time order
+        rows = len(dataset['y'])
+        keep = np.arange(rows)
+        if rows > TRAIN_MAX_SAMPLES:
+            keep = np.argpartition(dataset['t'], rows - TRAIN_MAX_SAMPLES)[rows - TRAIN_MAX_SAMPLES:]
+        keep = keep[np.argsort(dataset['t'][keep], kind='stable')]
+        X = pd.DataFrame(np.asarray(dataset['X'][keep]), columns=dataset['features'])
+        y = pd.Series(np.asarray(dataset['y'][keep]))
+        return self._fit_tabpfn(X, y)
+
+    def _fit_tabpfn(self, X: pd.DataFrame, y: pd.Series) -> Optional[tuple]:
+        """Fit TabPFN on (X, y). Returns (model, metrics) or None."""
+        from tabpfn import TabPFNClassifier
 
         if len(X) < 50:
             print(f"ERROR: Insufficient training data ({len(X)} samples, need 50+)")
-            return False
+            return None
 
         # Check class distribution
         class_counts = y.value_counts()
@@ -379,7 +363,7 @@ class QuantAgent:
 
         if len(class_counts) < 2:
             print(f"ERROR: Need at least 2 classes, got {len(class_counts)}")
-            return False
+            return None
 
         # Train TabPFN with reduced ensemble for speed
         try:
@@ -394,101 +378,24 @@ class QuantAgent:
             acc = (model.predict(X_val) == y_val).mean()
             print(f"INFO: TabPFN holdout accuracy: {acc:.2f}")
 
-            # Save model
-            model_path = "models/trained/meta_label_model.pkl"
-            joblib.dump(model, model_path)
-            print(f"INFO: TabPFN model saved to {model_path}")
-            return True
+            return model, {'holdout_accuracy': float(acc), 'samples': len(X)}
         except Exception as e:
             print(f"ERROR: TabPFN training failed: {str(e)}")
-            return False
-
-    def _generate_training_data(self, df: pd.DataFrame) -> tuple:
-        """Generate labeled training data using triple-barrier method (vectorized)."""
-        close = df['Close']
-        volume = df['Volume']
-        n = len(close)
-
-        lookback = 50
-        forward = 20
-
-        if n < lookback + forward + 1:
-            return pd.DataFrame(), pd.Series(dtype=int)
-
-        # Pre-compute all rolling features once (vectorized)
-        returns_1d = close.pct_change()
-        returns_5d = close.pct_change(5)
-        returns_20d = close.pct_change(20)
-        volatility_20d = returns_1d.rolling(20).std() * np.sqrt(252)
-        rsi_14 = self._calculate_rsi(close, 14)
-        sma20 = close.rolling(20).mean()
-        sma50 = close.rolling(50).mean()
-        vol_sma20 = volume.rolling(20).mean()
-
-        # Triple-barrier labels (vectorized)
-        profit_target = close * 1.05
-        stop_loss = close * 0.95
-
-        # Rolling max/min of future prices
-        future_max = close.rolling(forward).max().shift(-forward)
-        future_min = close.rolling(forward).min().shift(-forward)
-
-        labels = pd.Series(1, index=close.index)  # default: hold
-        labels[future_max >= profit_target] = 2   # buy
-        labels[future_min <= stop_loss] = 0        # sell
-
-        # Build feature matrix using iloc slicing (no per-sample loop)
-        idx = range(lookback, n - forward)
-        X = pd.DataFrame({
-            'return_1d': returns_1d.iloc[idx].values,
-            'return_5d': returns_5d.iloc[idx].values,
-            'return_20d': returns_20d.iloc[idx].values,
-            'volatility_20d': volatility_20d.iloc[idx].values,
-            'rsi_14': rsi_14.iloc[idx].values,
-            'adx': 25.0,  # placeholder
-            'trend_strength': 0.5,  # placeholder
-            'momentum_score': 0.5,  # placeholder
-            'vol_regime': 0,  # placeholder
-            'price_vs_sma20': ((close.iloc[idx].values / sma20.iloc[idx].values) - 1),
-            'price_vs_sma50': ((close.iloc[idx].values / sma50.iloc[idx].values) - 1),
-            'volume_ratio': (volume.iloc[idx].values / vol_sma20.iloc[idx].values),
-        })
+            return None
 
-        y = labels.iloc[idx].reset_index(drop=True)
-
-        return X, y
-
-    def _prepare_features(self, df: pd.DataFrame, trend: Dict, vol_regime: Dict) -> pd.DataFrame:
-        """Prepare feature matrix for TabPFN."""
-        # Technical features
-        close = df['Close']
-        returns = close.pct_change()
-
-        features = pd.DataFrame({
-            'return_1d': [returns.iloc[-1]],
-            'return_5d': [returns.tail(5).mean()],
-            'return_20d': [returns.tail(20).mean()],
-            'volatility_20d': [returns.tail(20).std() * np.sqrt(252)],
-            'rsi_14': [self._calculate_rsi(close, 14).iloc[-1]],
-            'adx': [trend['adx']],
-            'trend_strength': [trend['trend_strength']],
-            'momentum_score': [trend['momentum_score']],
-            'vol_regime': [1 if vol_regime['regime'] == 'expanding' else (-1 if vol_regime['regime'] == 'contracting' else 0)],
-            'price_vs_sma20': [(close.iloc[-1] / close.rolling(20).mean().iloc[-1]) - 1],
-            'price_vs_sma50': [(close.iloc[-1] / close.rolling(50).mean().iloc[-1]) - 1],
-            'volume_ratio': [df['Volume'].iloc[-1] / df['Volume'].tail(20).mean()],
-        })
+    def _generate_training_data(self, df: pd.DataFrame,
+                                investment_period: str = dataset_builder.DEFAULT_INVESTMENT_PERIOD) -> tuple:
+        """Generate labeled training data (full feature set, vectorized)."""
+        X, y = dataset_builder.training_rows(df, investment_period)
+        return X.reset_index(drop=True), y.reset_index(drop=True)
 
-        return features
+    def _prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Prepare the feature row for the latest bar (same definitions as training)."""
+        return dataset_builder.feature_frame(df).iloc[[-1]].reset_index(drop=True)
 
     def _calculate_rsi(self, close: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI."""
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(indicator_engine.rsi(close.to_numpy(dtype=float), period), index=close.index)
 
     def _meta_label_rule_based(self, trend: Dict, vol_regime: Dict) -> Dict[str, Any]:
         """Rule-based fallback for meta-labeling."""
@@ -538,6 +445,15 @@ Unable to fetch OHLCV data for {symbol}. Quant analysis requires:
 **Recommendation:** Proceed with LLM-based analysis only.
 """
 
+    def _format_first_touch(self, triple_barrier: Dict) -> str:
+        """Table row with the historical first-touch outcome of the current barriers."""
+        if not triple_barrier.get('historical_events'):
+            return "| Historical First Touch | n/a |"
+        return (f"| Historical First Touch | Target {triple_barrier['historical_profit_rate']:.0%} / "
+                f"Stop {triple_barrier['historical_stop_rate']:.0%} / "
+                f"Time {triple_barrier['historical_time_rate']:.0%} "
+                f"({triple_barrier['historical_events']} events) |")
+
     def _format_output(self, symbol: str, triple_barrier: Dict, trend: Dict,
                       vol_regime: Dict, sr_levels: Dict, meta_label: Dict,
                       df: pd.DataFrame) -> str:
@@ -589,6 +505,7 @@ Unable to fetch OHLCV data for {symbol}. Quant analysis requires:
 | Time Barrier | {triple_barrier['time_barrier_days']} days |
 | Risk/Reward | **{triple_barrier['risk_reward_ratio']:.2f}** |
 | ATR (14) | ${triple_barrier['atr']:.2f} |
+{self._format_first_touch(triple_barrier)}
 
 ### Trend Analysis
 | Metric | Value |
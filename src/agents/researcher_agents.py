@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, SystemMessage
 from ..utils.qdrant_utils import get_past_lessons
-from ..utils.llm_client import get_llm_client, invoke_llm_with_retry
+from ..utils.llm_client import get_llm_client, invoke_llm_with_retry, ainvoke_llm_with_retry
 
 load_dotenv(os.path.join('config', '.env'))
 
@@ -64,7 +64,7 @@ Key points to focus on:
 
 class BullishResearcher:
     @staticmethod
-    def analyze(symbol: str, investment_period: str, fundamentals_report: str, sentiment_report: str, technical_report: str, market_report: str, memory: str = "") -> str:
+    def messages(symbol: str, investment_period: str, fundamentals_report: str, sentiment_report: str, technical_report: str, market_report: str, memory: str = "") -> list:
         period_desc = get_period_description(investment_period)
         user_prompt = f"""provide a bullish analysis for {symbol} with analysis period: {period_desc}
 Resources available:
@@ -82,11 +82,19 @@ Focus your analysis on the {period_desc} timeframe.
             SystemMessage(content=BULL_SYSTEM_PROMPT),
             HumanMessage(content=user_prompt)
         ]
-        return invoke_llm_with_retry(get_bull_llm(), messages, "Bull Analysis")
+        return messages
+
+    @staticmethod
+    def analyze(*args, **kwargs) -> str:
+        return invoke_llm_with_retry(get_bull_llm(), BullishResearcher.messages(*args, **kwargs), "Bull Analysis")
+
+    @staticmethod
+    async def aanalyze(*args, **kwargs) -> str:
+        return await ainvoke_llm_with_retry(get_bull_llm(), BullishResearcher.messages(*args, **kwargs), "Bull Analysis")
 
 class BearishResearcher:
     @staticmethod
-    def analyze(symbol: str, investment_period: str, fundamentals_report: str, sentiment_report: str, technical_report: str, market_report: str, memory: str = "") -> str:
+    def messages(symbol: str, investment_period: str, fundamentals_report: str, sentiment_report: str, technical_report: str, market_report: str, memory: str = "") -> list:
         period_desc = get_period_description(investment_period)
         user_prompt = f"""provide a bearish analysis for {symbol} with analysis period: {period_desc}
 Resources available:
@@ -104,11 +112,19 @@ Focus your analysis on the {period_desc} timeframe.
             SystemMessage(content=BEAR_SYSTEM_PROMPT),
             HumanMessage(content=user_prompt)
         ]
-        return invoke_llm_with_retry(get_bear_llm(), messages, "Bear Analysis")
+        return messages
+
+    @staticmethod
+    def analyze(*args, **kwargs) -> str:
+        return invoke_llm_with_retry(get_bear_llm(), BearishResearcher.messages(*args, **kwargs), "Bear Analysis")
+
+    @staticmethod
+    async def aanalyze(*args, **kwargs) -> str:
+        return await ainvoke_llm_with_retry(get_bear_llm(), BearishResearcher.messages(*args, **kwargs), "Bear Analysis")
 
 class DebateAgent:
     @staticmethod
-    def summarize(bull_analysis: str, bear_analysis: str, investment_period: str) -> str:
+    def messages(bull_analysis: str, bear_analysis: str, investment_period: str) -> list:
         period_desc = get_period_description(investment_period)
         user_prompt = f"""provide debate result based on both bullish analysis and bearish analysis for {period_desc} timeframe.
 Bull: {bull_analysis[:3000]}
@@ -132,8 +148,18 @@ Do NOT use h2 for sub-sections. Only use h2 for the main "Research Debate" headi
 Format your response with these exact headings to ensure consistent display in the analysis report."""),
             HumanMessage(content=user_prompt)
         ]
+        return messages
+
+    @staticmethod
+    def summarize(bull_analysis: str, bear_analysis: str, investment_period: str) -> str:
+        messages = DebateAgent.messages(bull_analysis, bear_analysis, investment_period)
         return invoke_llm_with_retry(get_debate_llm(), messages, "Research Debate")
 
+    @staticmethod
+    async def asummarize(bull_analysis: str, bear_analysis: str, investment_period: str) -> str:
+        messages = DebateAgent.messages(bull_analysis, bear_analysis, investment_period)
+        return await ainvoke_llm_with_retry(get_debate_llm(), messages, "Research Debate")
+
 def researcher_team(analyst_insights: dict, symbol: str, investment_period: str, past_lessons: str = "") -> dict:
     print('DEBUG: researcher_team')
     fundamentals = analyst_insights['fundamentals']
@@ -1,8 +1,9 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, SystemMessage
 from ..tools.analyst_tools import get_close_price
-from ..utils.llm_client import get_llm_client, invoke_llm_with_retry
+from ..utils.llm_client import get_llm_client, invoke_llm_with_retry, ainvoke_llm_with_retry
 
 load_dotenv(os.path.join('config', '.env'))
 
@@ -30,9 +31,9 @@ def get_forecast_period(investmentPeriod: str) -> str:
 
 class TradingAgent:
     @staticmethod
-    def decide(symbol: str, investment_period: str, analysis_data: str) -> str:
+    def messages(symbol: str, investment_period: str, analysis_data: str) -> list:
         """
-        Generate trading plan from combined analysis data.
+        Build the trading plan prompt (fetches the last close price).
 
         Args:
             symbol: Stock ticker
@@ -140,4 +141,16 @@ Based on the above analysis (which includes debate results, quant signals, and t
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
-        return invoke_llm_with_retry(get_llm(), messages, "Trading Plan")
\ No newline at end of file
+        return messages
+
+    @staticmethod
+    def decide(symbol: str, investment_period: str, analysis_data: str) -> str:
+        """Generate trading plan from combined analysis data (debate + quant + technical)."""
+        messages = TradingAgent.messages(symbol, investment_period, analysis_data)
+        return invoke_llm_with_retry(get_llm(), messages, "Trading Plan")
+
+    @staticmethod
+    async def adecide(symbol: str, investment_period: str, analysis_data: str) -> str:
+        """Async decide(); the close price lookup runs in a worker thread."""
+        messages = await asyncio.to_thread(TradingAgent.messages, symbol, investment_period, analysis_data)
+        return await ainvoke_llm_with_retry(get_llm(), messages, "Trading Plan")
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""
+Walk-forward backtest of QuantAgent signals over stored daily bars.
+
+Replays the quant logic at every historical bar, using only data up to that bar
+(all indicators are trailing), and trades each signal with TradingAgent's exit
+strategy:
+- Initial stop 1.5 x ATR below entry (1R), target 3 x ATR (2R)
+- 0.9R rule: at +0.9R sell half and move the stop to breakeven
+- Time stop: exit at the close after the investment period's holding days
+
+Everything is vectorized per symbol: signals come from one indicator-engine pass
+and exits from strided (events x horizon) windows, so a multi-year, 100-symbol
+run takes seconds. Signals are evaluated independently (overlapping trades are
+allowed), which measures signal quality rather than a portfolio's equity curve.
+
+Strategies reported:
+- signal:         QuantAgent entry_signal (long/short) alone
+- signal+regime:  entry_signal agrees with the ADX trend regime
+- signal+meta:    entry_signal agrees with the rule-based meta-label
+
+Usage:
+    python -m src.backtest                                  # universe, bar store only
+    python -m src.backtest --symbols AAPL,MSFT --period medium
+    python -m src.backtest --years 3 --online               # refresh bar store tails first
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from .utils import indicator_engine, dataset_builder, triple_barrier
+
+PARTIAL_R = 0.9           # 0.9R rule: take half off here, stop to breakeven
+PARTIAL_SIZE = 0.5
+STRATEGIES = ('signal', 'signal+regime', 'signal+meta')
+
+# Exit outcome codes
+STOP, PARTIAL_BREAKEVEN, PARTIAL_TARGET, PARTIAL_TIME, TIME = range(5)
+OUTCOME_NAMES = ['stop', 'partial+breakeven', 'partial+target', 'partial+time', 'time']
+
+
+# ============================================================================
+# SIGNALS (QuantAgent logic at every bar)
+# ============================================================================
+
+def signals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    QuantAgent's per-bar view: entry_signal (+1/-1/0), trend regime (+1 up,
+    -1 down, 0 weak/ranging) and the rule-based meta-label (+1 buy, -1 sell, 0 hold).
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    indicators = indicator_engine.compute(df)
+    features = dataset_builder.feature_frame(df)
+
+    with np.errstate(invalid='ignore'):
+        returns = close / indicator_engine.shift(close) - 1.0
+        recent = indicator_engine.rolling_mean(returns, 10)
+        entry = np.where(recent > 0.005, 1, np.where(recent < -0.005, -1, 0))
+
+        adx = np.nan_to_num(indicators['ADX_14'].to_numpy(), nan=20.0)
+        plus_di = np.nan_to_num(indicators['PLUS_DI_14'].to_numpy(), nan=25.0)
+        minus_di = np.nan_to_num(indicators['MINUS_DI_14'].to_numpy(), nan=25.0)
+        regime = np.where(adx > 30, np.where(plus_di > minus_di, 1, -1), 0)
+
+        # _meta_label_rule_based, vectorized
+        score = (0.3 * (regime == 1) - 0.3 * (regime == -1)
+                 + (features['momentum_score'].to_numpy() - 0.5) * 0.4
+                 - 0.1 * (features['vol_regime'].to_numpy() == 1))
+        meta = np.where(score > 0.1, 1, np.where(score < -0.1, -1, 0))
+
+    entry[np.isnan(recent)] = 0
+    return pd.DataFrame({'entry': entry, 'regime': regime, 'meta': meta}, index=df.index)
+
+
+# ============================================================================
+# EXITS (vectorized over every bar)
+# ============================================================================
+
+def _first(mask: np.ndarray, horizon: int) -> np.ndarray:
+    """Index of the first True per row (horizon if none)."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), horizon)
+
+
+def simulate_long(high, low, close, atr, horizon: int,
+                  profit_mult: float = triple_barrier.PROFIT_TARGET_MULT,
+                  stop_mult: float = triple_barrier.STOP_LOSS_MULT) -> Dict[str, np.ndarray]:
+    """
+    Exit every bar's long entry with the 1R stop, 0.9R partial, target and time stop.
+
+    Same-bar ambiguities resolve conservatively: a bar that touches both the
+    stop and the next level counts as the stop; the breakeven stop is active
+    from the bar after the partial exit.
+
+    Returns:
+        Dict of per-bar arrays: r (R-multiple), ret (return), outcome (code),
+        bars (holding bars) and valid (outcome known)
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+    n = len(close)
+    risk = stop_mult * atr
+    target_r = profit_mult / stop_mult
+
+    future_high = triple_barrier.future_window(high, horizon)
+    future_low = triple_barrier.future_window(low, horizon)
+    with np.errstate(invalid='ignore'):
+        t_stop = _first(future_low <= (close - risk)[:, None], horizon)
+        t_partial = _first(future_high >= (close + PARTIAL_R * risk)[:, None], horizon)
+        t_target = _first(future_high >= (close + profit_mult * atr)[:, None], horizon)
+        after_partial = np.arange(horizon)[None, :] > t_partial[:, None]
+        t_breakeven = _first((future_low <= close[:, None]) & after_partial, horizon)
+
+    stopped = (t_stop < horizon) & (t_stop <= t_partial)
+    partial = (t_partial < horizon) & ~stopped
+    hit_target = partial & (t_target < horizon) & ((t_target == t_partial) | (t_target < t_breakeven))
+    breakeven = partial & ~hit_target & (t_breakeven < horizon)
+    partial_time = partial & ~hit_target & ~breakeven
+
+    end = np.arange(n) + horizon
+    complete = end <= n - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        time_r = (close[np.minimum(end, n - 1)] - close) / risk
+
+    remainder_r = np.where(hit_target, target_r, np.where(breakeven, 0.0, time_r))
+    r = np.where(stopped, -1.0,
+                 np.where(partial, PARTIAL_SIZE * PARTIAL_R + (1 - PARTIAL_SIZE) * remainder_r, time_r))
+    outcome = np.select([stopped, hit_target, breakeven, partial_time],
+                        [STOP, PARTIAL_TARGET, PARTIAL_BREAKEVEN, PARTIAL_TIME], TIME)
+    bars = np.select([stopped, hit_target, breakeven], [t_stop + 1, t_target + 1, t_breakeven + 1], horizon)
+
+    resolved = stopped | hit_target | breakeven
+    valid = (resolved | complete) & np.isfinite(atr) & (atr > 0) & np.isfinite(close)
+    with np.errstate(invalid='ignore'):
+        ret = r * risk / close
+    return {'r': r, 'ret': ret, 'outcome': outcome, 'bars': bars, 'valid': valid}
+
+
+def simulate(df: pd.DataFrame, horizon: int) -> Dict[str, Dict[str, np.ndarray]]:
+    """Long and short exits for every bar (shorts run the long logic on negated prices)."""
+    atr = indicator_engine.compute(df)['ATR_14'].to_numpy()
+    high, low, close = (df[c].to_numpy(dtype=np.float64) for c in ('High', 'Low', 'Close'))
+    short = simulate_long(-low, -high, -close, atr, horizon)
+    with np.errstate(invalid='ignore'):
+        short['ret'] = short['r'] * triple_barrier.STOP_LOSS_MULT * atr / close
+    return {'long': simulate_long(high, low, close, atr, horizon), 'short': short}
+
+
+# ============================================================================
+# WALK-FORWARD RUN
+# ============================================================================
+
+def trades(df: pd.DataFrame, symbol: str, horizon: int) -> pd.DataFrame:
+    """Every strategy's trades for one symbol (one row per strategy and entry bar)."""
+    sig = signals(df)
+    exits = simulate(df, horizon)
+    entry = sig['entry'].to_numpy()
+    usable = np.arange(len(df)) >= dataset_builder.WARMUP_BARS
+
+    filters = {
+        'signal': entry != 0,
+        'signal+regime': (entry != 0) & (sig['regime'].to_numpy() == entry),
+        'signal+meta': (entry != 0) & (sig['meta'].to_numpy() == entry),
+    }
+    frames = []
+    for strategy, selected in filters.items():
+        for side, side_sign in (('long', 1), ('short', -1)):
+            result = exits[side]
+            mask = selected & (entry == side_sign) & usable & result['valid']
+            if not mask.any():
+                continue
+            frames.append(pd.DataFrame({
+                'symbol': symbol,
+                'strategy': strategy,
+                'side': side,
+                'time': df.index[mask],
+                'r': result['r'][mask],
+                'ret': result['ret'][mask],
+                'outcome': result['outcome'][mask],
+                'bars': result['bars'][mask],
+            }))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def summarize(all_trades: pd.DataFrame) -> pd.DataFrame:
+    """Hit rate, expectancy and R-multiple statistics per strategy."""
+    rows = []
+    for strategy in STRATEGIES:
+        t = all_trades[all_trades['strategy'] == strategy] if not all_trades.empty else all_trades
+        if t.empty:
+            rows.append({'strategy': strategy, 'trades': 0})
+            continue
+        r = t['r'].to_numpy()
+        wins, losses = r[r > 0], r[r < 0]
+        outcomes = np.bincount(t['outcome'].to_numpy(), minlength=len(OUTCOME_NAMES)) / len(t)
+        rows.append({
+            'strategy': strategy,
+            'trades': len(t),
+            'long_share': float((t['side'] == 'long').mean()),
+            'hit_rate': float((r > 0).mean()),
+            'expectancy_r': float(r.mean()),
+            'expectancy_pct': float(t['ret'].mean() * 100),
+            'avg_win_r': float(wins.mean()) if len(wins) else 0.0,
+            'avg_loss_r': float(losses.mean()) if len(losses) else 0.0,
+            'profit_factor': float(wins.sum() / -losses.sum()) if len(losses) else float('inf'),
+            'avg_bars': float(t['bars'].mean()),
+            **{f"{name}_rate": float(share) for name, share in zip(OUTCOME_NAMES, outcomes)},
+        })
+    return pd.DataFrame(rows).set_index('strategy')
+
+
+def walk_forward(all_trades: pd.DataFrame) -> pd.DataFrame:
+    """Expectancy (R) per calendar year and strategy, to check stability over time."""
+    if all_trades.empty:
+        return pd.DataFrame()
+    years = pd.DatetimeIndex(all_trades['time']).year
+    table = all_trades.assign(year=years).pivot_table(
+        index='year', columns='strategy', values='r', aggfunc='mean')
+    return table.reindex(columns=[s for s in STRATEGIES if s in table.columns])
+
+
+def run_backtest(symbols: List[str] = None, investment_period: str = 'short',
+                 period: str = '5y', offline: bool = True) -> Optional[Dict]:
+    """
+    Backtest QuantAgent signals over many symbols.
+
+    Args:
+        symbols: Tickers (default: the dataset universe)
+        investment_period: short+, short, medium, long (sets the time stop)
+        period: History per symbol, e.g. '5y'
+        offline: Read only the bar store (no network)
+
+    Returns:
+        Dict with 'summary', 'walk_forward', 'trades' DataFrames and timings,
+        or None if no symbol had usable bars
+    """
+    symbols = symbols or dataset_builder.load_universe()
+    horizon = triple_barrier.horizon_bars(triple_barrier.PERIOD_DAYS.get(investment_period, 45))
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=min(5, len(symbols)) or 1) as executor:
+        frames = list(executor.map(lambda s: dataset_builder.load_bars(s, period, offline=offline), symbols))
+    loaded = time.time()
+
+    parts, used, bars = [], 0, 0
+    for symbol, df in zip(symbols, frames):
+        if df is None or len(df) < dataset_builder.WARMUP_BARS + horizon + 1:
+            continue
+        if period != 'max':
+            df = df[df.index >= df.index[-1] - pd.DateOffset(years=_years(period))]
+        used += 1
+        bars += len(df)
+        parts.append(trades(df, symbol, horizon))
+    if not used:
+        print(f"WARNING: Backtest: no usable bars for {len(symbols)} symbols")
+        return None
+
+    all_trades = pd.concat([p for p in parts if not p.empty], ignore_index=True) if parts else pd.DataFrame()
+    return {
+        'summary': summarize(all_trades),
+        'walk_forward': walk_forward(all_trades),
+        'trades': all_trades,
+        'symbols': used,
+        'bars': bars,
+        'horizon': horizon,
+        'load_seconds': loaded - start,
+        'compute_seconds': time.time() - loaded,
+    }
+
+
+def _years(period: str) -> int:
+    return int(period[:-1]) if period.endswith('y') and period[:-1].isdigit() else 100
+
+
+def format_report(result: Dict, investment_period: str) -> str:
+    """Markdown report of a run_backtest() result."""
+    summary = result['summary']
+    lines = [
+        f"## Quant Signal Backtest ({investment_period}, time stop {result['horizon']} bars)",
+        "",
+        f"{result['symbols']} symbols, {result['bars']:,} bars; "
+        f"load {result['load_seconds']:.1f}s, compute {result['compute_seconds']:.1f}s",
+        "",
+        "| Strategy | Trades | Hit Rate | Expectancy (R) | Expectancy (%) | Avg Win R | Avg Loss R "
+        "| Profit Factor | Stop | 0.9R+BE | 0.9R+Target | 0.9R+Time | Time | Avg Bars |",
+        "|---|---|---|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for strategy, row in summary.iterrows():
+        if not row.get('trades'):
+            lines.append(f"| {strategy} | 0 |" + " n/a |" * 12)
+            continue
+        lines.append(
+            f"| {strategy} | {int(row['trades']):,} | {row['hit_rate']:.1%} | {row['expectancy_r']:+.3f} "
+            f"| {row['expectancy_pct']:+.2f}% | {row['avg_win_r']:.2f} | {row['avg_loss_r']:.2f} "
+            f"| {row['profit_factor']:.2f} | {row['stop_rate']:.0%} | {row['partial+breakeven_rate']:.0%} "
+            f"| {row['partial+target_rate']:.0%} | {row['partial+time_rate']:.0%} | {row['time_rate']:.0%} "
+            f"| {row['avg_bars']:.1f} |"
+        )
+    walk = result['walk_forward']
+    if not walk.empty:
+        lines += ["", "### Expectancy (R) by Year", "",
+                  "| Year | " + " | ".join(walk.columns) + " |",
+                  "|---|" + "---|" * len(walk.columns)]
+        for year, row in walk.iterrows():
+            lines.append(f"| {year} | " + " | ".join(f"{v:+.3f}" if pd.notna(v) else "n/a" for v in row) + " |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of QuantAgent signals')
+    parser.add_argument('--symbols', type=str, help='Comma-separated tickers (default: universe file)')
+    parser.add_argument('--period', type=str, default='short', help='Investment period: short+, short, medium, long')
+    parser.add_argument('--years', type=int, default=5, help='Years of history per symbol')
+    parser.add_argument('--online', action='store_true', help='Refresh bar store tails from Yahoo first')
+    parser.add_argument('--trades', type=str, help='Also write every trade to this CSV file')
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(',')] if args.symbols else None
+    result = run_backtest(symbols, args.period, f"{args.years}y", offline=not args.online)
+    if result is None:
+        return 1
+    print(format_report(result, args.period))
+    if args.trades:
+        result['trades'].to_csv(args.trades, index=False)
+        print(f"\nTrades written to {args.trades}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,70 @@
 """Shared job store for real-time progress tracking."""
 
 import threading
+import contextvars
+from datetime import datetime
 
 # Shared job storage
-_jobs = {}  # job_id -> {"status": "running"|"completed"|"failed", "result": ..., "error": ..., "step_logs": [], "progress": {}}
+_jobs = {}  # job_id -> {"status": "running"|"completed"|"failed", "result": ..., "error": ..., "step_logs": [], "progress": {}, "streams": {}}
 _jobs_lock = threading.Lock()
+
+# (job_id, symbol) the current pipeline is working for; copied into worker threads
+# with contextvars.copy_context() so LLM calls deep inside agents can stream to it
+_stream_target = contextvars.ContextVar('finagent_stream_target', default=None)
+
+
+def set_stream_target(job_id: str, symbol: str) -> contextvars.Token:
+    """Route streamed LLM output in this context to job_id/symbol; reset with the token."""
+    return _stream_target.set((job_id, symbol) if job_id else None)
+
+
+def reset_stream_target(token: contextvars.Token):
+    _stream_target.reset(token)
+
+
+def current_job_id() -> str:
+    """Job id of the current context, None outside a job."""
+    target = _stream_target.get()
+    return target[0] if target is not None else None
+
+
+def has_stream_target() -> bool:
+    """True if the current context belongs to a running job."""
+    target = _stream_target.get()
+    return target is not None and target[0] in _jobs
+
+
+def _update_stream(step_name: str, text: str = None, status: str = None, reset: bool = False):
+    target = _stream_target.get()
+    if target is None:
+        return
+    job_id, symbol = target
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        streams = job.setdefault("streams", {})
+        key = f"{symbol}_{step_name}"
+        stream = streams.get(key)
+        if stream is None or reset:
+            stream = streams[key] = {"symbol": symbol, "step": step_name, "text": "", "status": "streaming"}
+        if text:
+            stream["text"] += text
+        if status:
+            stream["status"] = status
+        stream["timestamp"] = datetime.now().strftime("%H:%M:%S")
+
+
+def start_stream(step_name: str):
+    """Begin (or restart, on retry) the partial output of a step."""
+    _update_stream(step_name, reset=True)
+
+
+def append_stream(step_name: str, text: str):
+    """Append partial LLM output for a step."""
+    _update_stream(step_name, text=text)
+
+
+def finish_stream(step_name: str, status: str = "completed"):
+    """Mark a step's stream completed / failed."""
+    _update_stream(step_name, status=status)
@@ -1,12 +1,16 @@
 from langchain_core.tools import tool
 from typing import Optional
 import pandas as pd
-import requests
 import xml.etree.ElementTree as ET
 import time
 from ..utils.data_fetchers import DataFetcher
 from ..utils.technical_indicators import calculate_macd, calculate_vwap
 from ..utils.yfinance_compat import YahooFinanceCompat
+from ..utils.async_fetch import fetch_all
+from ..utils import indicator_state
+from ..utils import indicator_engine
+from ..utils import indicator_summary
+from concurrent.futures import ThreadPoolExecutor
 
 fetcher = DataFetcher()
 
@@ -101,13 +105,17 @@ def get_reddit_sentiment(symbol: str) -> str:
     subreddits = ['wallstreetbets', 'stocks', 'investing']
     all_posts = []
 
-    def _fetch_subreddit(sub):
-        posts = []
-        try:
-            url = f'https://www.reddit.com/r/{sub}/search.rss?q={symbol}&restrict_sr=1&limit=5'
-            headers = {'User-Agent': 'FinAgent/1.0 (Financial Analysis Bot)'}
-            response = requests.get(url, headers=headers, timeout=10)
+    # All subreddits fetched concurrently on the shared async loop
+    headers = {'User-Agent': 'FinAgent/1.0 (Financial Analysis Bot)'}
+    responses = fetch_all([
+        {'url': f'https://www.reddit.com/r/{sub}/search.rss?q={symbol}&restrict_sr=1&limit=5', 'headers': headers, 'timeout': 10}
+        for sub in subreddits
+    ])
 
+    for sub, response in zip(subreddits, responses):
+        try:
+            if isinstance(response, Exception):
+                raise response
             if response.status_code == 200:
                 root = ET.fromstring(response.content)
                 ns = {'atom': 'http://www.w3.org/2005/Atom'}
@@ -115,18 +123,11 @@ def get_reddit_sentiment(symbol: str) -> str:
 
                 for entry in entries[:3]:
                     title = entry.find('atom:title', ns).text or 'N/A'
-                    posts.append(f"r/{sub}: {title}")
+                    all_posts.append(f"r/{sub}: {title}")
             else:
                 print(f'WARNING: Reddit r/{sub} returned HTTP {response.status_code}')
         except Exception as e:
             print(f'WARNING: Could not fetch from r/{sub}: {str(e)[:50]}')
-        return posts
-
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = {executor.submit(_fetch_subreddit, sub): sub for sub in subreddits}
-        for future in as_completed(futures):
-            all_posts.extend(future.result())
 
     if not all_posts:
         return "No Reddit data available"
@@ -158,6 +159,94 @@ def download_yf_data(symbol: str) -> pd.DataFrame:
         print(f"Error downloading data for {symbol}: {e}")
         return pd.DataFrame()
 
+def prime_indicator_panel(symbols: list, investmentPeriod: str) -> int:
+    """
+    Fetch bars for a batch and compute their indicators as one (time x symbol) panel.
+
+    Warms the indicator engine memo, so per-symbol technical and quant analysis
+    only look up results. Returns the number of symbols primed.
+    """
+    interval = get_yf_interval(investmentPeriod)
+    period = get_yf_period(investmentPeriod)
+    with ThreadPoolExecutor(max_workers=min(5, len(symbols)) or 1) as executor:
+        daily = list(executor.map(download_yf_data, symbols))
+        periodic = list(executor.map(
+            lambda s: fetcher.get_yf_history(s, interval=interval, period=period), symbols))
+
+    primed = indicator_engine.compute_panel(dict(zip(symbols, daily)))
+    indicator_engine.compute_panel(dict(zip(symbols, periodic)))
+    return len(primed)
+
+def get_indicator_series(symbol: str, investmentPeriod: str) -> dict:
+    """
+    Full indicator series as structured data.
+
+    Returns:
+        Dict with 'daily' (1y daily OHLCV + indicator columns), 'periodic'
+        (bars for the investment period's interval + indicator columns) and 'interval'
+    """
+    interval = get_yf_interval(investmentPeriod)
+    period = get_yf_period(investmentPeriod)
+    daily = download_yf_data(symbol)
+    periodic = fetcher.get_yf_history(symbol, interval=interval, period=period)
+    return {
+        'daily': daily.join(indicator_engine.compute(daily)) if not daily.empty else daily,
+        'periodic': periodic.join(indicator_engine.compute(periodic)) if not periodic.empty else periodic,
+        'interval': interval,
+    }
+
+def get_technical_summary(symbol: str, investmentPeriod: str) -> str:
+    """Compact indicator table (latest, change, slope, percentile) plus crossover signals."""
+    describe = indicator_summary.describe
+    crossover = indicator_summary.crossover
+    render_crossover = indicator_summary.render_crossover
+
+    data = get_indicator_series(symbol, investmentPeriod)
+    daily, periodic, interval = data['daily'], data['periodic'], data['interval']
+    if daily.empty:
+        return "Technical summary: No data"
+
+    close = daily['Close']
+    last_bar = indicator_summary.format_timestamp
+    sections = [f"DAILY INDICATORS ({len(daily)} bars to {last_bar(daily.index[-1])}):"]
+    sections.append(indicator_summary.render_table([
+        ('Close', describe(close)),
+        ('SMA-50', describe(daily['SMA_50'])),
+        ('SMA-100', describe(daily['SMA_100'])),
+        ('EMA-10', describe(daily['EMA_10'])),
+        ('RSI-36', describe(daily['RSI_36'])),
+        ('BB upper (36)', describe(daily['BB_UPPER_36'])),
+        ('BB lower (36)', describe(daily['BB_LOWER_36'])),
+    ]))
+
+    signals = [
+        render_crossover('Close', 'SMA-50', crossover(close, daily['SMA_50'])),
+        render_crossover('Close', 'SMA-100', crossover(close, daily['SMA_100'])),
+        render_crossover('SMA-50', 'SMA-100', crossover(daily['SMA_50'], daily['SMA_100'])),
+        render_crossover('Close', 'EMA-10', crossover(close, daily['EMA_10'])),
+        render_crossover('RSI-36', '70 (overbought)', crossover(daily['RSI_36'], 70)),
+        render_crossover('RSI-36', '30 (oversold)', crossover(daily['RSI_36'], 30)),
+    ]
+    upper, lower = daily['BB_UPPER_36'].iloc[-1], daily['BB_LOWER_36'].iloc[-1]
+    if pd.notna(upper) and pd.notna(lower) and upper > lower:
+        percent_b = (close.iloc[-1] - lower) / (upper - lower) * 100
+        signals.append(f"- Bollinger %B (36): {percent_b:.0f}% (0% = lower band, 100% = upper band)")
+
+    if not periodic.empty:
+        sections.append(f"\nMACD 12/26/9 & VWAP ({interval} bars, {len(periodic)} bars to {last_bar(periodic.index[-1])}):")
+        sections.append(indicator_summary.render_table([
+            ('MACD', describe(periodic['MACD_12_26_9'])),
+            ('MACD signal', describe(periodic['MACD_SIGNAL_12_26_9'])),
+            ('MACD histogram', describe(periodic['MACD_HIST_12_26_9'])),
+            ('VWAP', describe(periodic['VWAP'])),
+        ]))
+        signals.append(render_crossover('MACD', 'signal', crossover(periodic['MACD_12_26_9'], periodic['MACD_SIGNAL_12_26_9'])))
+        signals.append(render_crossover(f'Close ({interval})', 'VWAP', crossover(periodic['Close'], periodic['VWAP'])))
+
+    sections.append("\nSIGNALS:")
+    sections.extend(signals)
+    return "\n".join(sections)
+
 def get_sma(data: pd.DataFrame, time_period: int = 36) -> str:
     """Get Simple Moving Average."""
     data, meta = fetcher.get_sma(data, time_period)
@@ -219,19 +308,21 @@ def get_volume_analysis(symbol: str, investmentPeriod: str) -> str:
 
     volume = hist['Volume']
     close = hist['Close']
+    # Latest values from the incremental per-(symbol, interval) state (O(new bars) per call)
+    indicators = indicator_state.latest(symbol, interval, hist)
 
     # Current volume and averages
     current_volume = volume.iloc[-1]
-    vol_sma_10 = volume.rolling(10).mean().iloc[-1]
-    vol_sma_20 = volume.rolling(20).mean().iloc[-1]
-    vol_sma_50 = volume.rolling(50).mean().iloc[-1] if len(volume) >= 50 else vol_sma_20
+    vol_sma_10 = indicators['VOLUME_SMA_10']
+    vol_sma_20 = indicators['VOLUME_SMA_20']
+    vol_sma_50 = indicators['VOLUME_SMA_50'] if len(volume) >= 50 else vol_sma_20
 
     # Relative Volume (RVOL) - current vs 20-day average
     rvol = current_volume / vol_sma_20 if vol_sma_20 > 0 else 1.0
 
     # Volume Spike Detection
     # Spike = volume > 2x 20-day average
-    vol_std = volume.rolling(20).std().iloc[-1]
+    vol_std = indicators['VOLUME_STD_20']
     vol_zscore = (current_volume - vol_sma_20) / vol_std if vol_std > 0 else 0
 
     if rvol >= 2.0:
@@ -246,8 +337,8 @@ def get_volume_analysis(symbol: str, investmentPeriod: str) -> str:
         spike_status = "⚪ NORMAL (RVOL 0.5-1.2)"
 
     # Volume Trend (10-day vs 20-day crossover)
-    vol_trend_10 = volume.rolling(10).mean().iloc[-1]
-    vol_trend_20 = volume.rolling(20).mean().iloc[-1]
+    vol_trend_10 = vol_sma_10
+    vol_trend_20 = vol_sma_20
     if vol_trend_10 > vol_trend_20 * 1.1:
         vol_trend = "📈 INCREASING (10DMA > 20DMA)"
     elif vol_trend_10 < vol_trend_20 * 0.9:
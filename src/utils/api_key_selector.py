@@ -8,10 +8,37 @@ URL Prefix Mapping:
 - https://api.deepseek* → DEEPSEEK_API_KEY
 - https://open.bigmodel* → BIGMODEL_API_KEY
 - https://api.minimax* → MINIMAX_API_KEY
+
+The same prefixes name the provider for per-provider limits (see llm_scheduler.py).
 """
 
 import os
 
+# URL prefix -> provider id (used for LLM_MAX_CONCURRENCY_<ID> / LLM_TPM_<ID>)
+PROVIDER_PREFIXES = [
+    ("https://zenmux", "zenmux"),
+    ("https://apihub.agnes-ai", "agnes"),
+    ("https://integrate.api.nvidia", "nvidia"),
+    ("https://api.deepseek", "deepseek"),
+    ("https://open.bigmodel", "bigmodel"),
+    ("https://api.minimax", "minimax"),
+]
+
+
+def get_provider_for_url(url: str) -> str:
+    """
+    Provider id for a base URL ("zenmux", "agnes", ...), "other" if unknown.
+
+    Unknown URLs are keyed by the URL itself so unrelated endpoints don't share limits.
+    """
+    if not url:
+        return "other"
+    url_lower = url.lower()
+    for prefix, provider in PROVIDER_PREFIXES:
+        if url_lower.startswith(prefix):
+            return provider
+    return url_lower.rstrip("/")
+
 
 def get_api_key_for_url(url: str) -> str:
     """
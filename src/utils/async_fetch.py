@@ -0,0 +1,156 @@
+"""
+Async Fetch Engine - One shared event loop for concurrent outbound HTTP I/O.
+
+Features:
+- A single asyncio loop in a daemon thread, started lazily and shared process-wide
+- One httpx.AsyncClient (keep-alive, HTTP/2 when the 'h2' package is installed)
+- Global per-host concurrency limits (same sizes as the sync session pools)
+- Shares the per-host rate limiter and 429/5xx backoff with the sync path
+- fetch_all() lets synchronous code fan out many GETs without spawning threads
+- Honors FINAGENT_REPLAY record/replay cassettes (see replay.py)
+
+Usage:
+    responses = fetch_all([{'url': url, 'params': params}, ...])
+    # Each item is an httpx.Response or the Exception raised for that request
+    # (TimeoutError for requests still pending when the fan-out timeout expires)
+"""
+
+import asyncio
+import logging
+import concurrent.futures
+import threading
+from urllib.parse import urlsplit
+from .http_session import POOL_SIZES, DEFAULT_POOL_SIZE, http_get
+from . import rate_limiter
+from . import replay
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+FETCH_ALL_TIMEOUT = 120  # seconds a caller waits for a whole fan-out
+RUN_GRACE = 5  # extra seconds run() waits for a fan-out to cancel its own pending requests
+
+_loop = None
+_loop_lock = threading.Lock()
+_client = None
+_semaphores = {}  # host -> asyncio.Semaphore (created on the loop thread)
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, daemon=True, name='async-fetch')
+            thread.start()
+            logger.debug(f"Async fetch loop started (http2={_HTTP2})")
+        return _loop
+
+
+def run(coro, timeout: float = None):
+    """
+    Run a coroutine on the shared loop from synchronous code and wait for its result.
+
+    Raises TimeoutError after timeout seconds; the coroutine is cancelled on the loop.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Async fetch did not complete within {timeout}s")
+
+
+def _get_client():
+    """Get the shared AsyncClient (only called on the loop thread)."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=_HTTP2,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+    return _client
+
+
+def _get_semaphore(host: str) -> asyncio.Semaphore:
+    """Get the per-host concurrency limit (only called on the loop thread)."""
+    if host not in _semaphores:
+        _semaphores[host] = asyncio.Semaphore(POOL_SIZES.get(host, DEFAULT_POOL_SIZE))
+    return _semaphores[host]
+
+
+async def fetch(url: str, params: dict = None, headers: dict = None, timeout: float = 30):
+    """GET a URL on the shared loop, respecting the host's concurrency and rate limits."""
+    if replay.is_replaying():
+        return replay.load_http(url, params)
+    host = urlsplit(url).netloc.lower()
+    for attempt in range(rate_limiter.MAX_ATTEMPTS):
+        await rate_limiter.acquire_async(url)
+        async with _get_semaphore(host):
+            response = await _get_client().get(url, params=params, headers=headers, timeout=timeout)
+        if not rate_limiter.observe(url, response, attempt):
+            break
+    if replay.is_recording():
+        replay.save_http(url, params, response)
+    return response
+
+
+async def _gather(specs: list, timeout: float) -> list:
+    """Fetch specs concurrently; requests still pending after timeout are cancelled."""
+    tasks = [asyncio.ensure_future(fetch(**spec)) for spec in specs]
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+    finally:
+        for task in tasks:
+            task.cancel()  # no-op for finished tasks
+    if pending:
+        await asyncio.wait(pending)
+    results = []
+    for task in tasks:
+        if task.cancelled():
+            results.append(TimeoutError(f"Request did not complete within {timeout}s"))
+        else:
+            results.append(task.exception() or task.result())
+    return results
+
+
+def fetch_all(specs: list, timeout: float = FETCH_ALL_TIMEOUT) -> list:
+    """
+    Fetch many URLs concurrently on the shared loop.
+
+    Args:
+        specs: List of dicts with 'url' and optional 'params', 'headers', 'timeout'
+        timeout: Max seconds to wait for the whole batch
+
+    Returns:
+        List aligned with specs: a response, or the Exception raised for that request
+    """
+    if not specs:
+        return []
+    if httpx is None or replay.is_replaying():
+        # No async client available (or replaying cassettes): sequential pooled requests
+        results = []
+        for spec in specs:
+            try:
+                results.append(http_get(**spec))
+            except Exception as e:
+                results.append(e)
+        return results
+    try:
+        return run(_gather(specs, timeout), timeout + RUN_GRACE)
+    except TimeoutError as e:
+        logger.warning(f"Async fetch of {len(specs)} requests timed out: {e}")
+        return [e for _ in specs]
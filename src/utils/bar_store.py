@@ -0,0 +1,171 @@
+"""
+Bar Store - Persistent on-disk columnar store for historical OHLCV bars.
+
+Features:
+- One Parquet file per (symbol, interval) under BAR_STORE_DIR (default ./data/bars)
+- Falls back to pickle files when pyarrow is not installed
+- Sidecar JSON metadata (covered range start, last refresh time)
+- Per-file locks so concurrent pipelines never interleave writes
+- Atomic writes (temp file + os.replace), so a crash never leaves a torn file
+- Bypassed while FINAGENT_REPLAY is recording or replaying
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+import pandas as pd
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from . import replay
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+BAR_STORE_DIR = os.getenv('BAR_STORE_DIR', os.path.join('data', 'bars'))
+
+# Only bars that are final once the session closes are worth persisting
+STORED_INTERVALS = ('1d', '5d', '1wk', '1mo', '3mo')
+
+# How far before the last stored bar a tail refresh starts. The latest bar is
+# still forming (and weekly/monthly live bars can carry a mid-period timestamp),
+# so everything from the first re-fetched bar onward is replaced.
+TAIL_REWIND = {
+    '1d': timedelta(days=5),
+    '5d': timedelta(days=10),
+    '1wk': timedelta(days=14),
+    '1mo': timedelta(days=62),
+    '3mo': timedelta(days=185),
+}
+
+try:
+    import pyarrow  # noqa: F401
+    _FILE_EXT = 'parquet'
+except ImportError:
+    _FILE_EXT = 'pkl'
+
+_file_locks = {}
+_file_locks_lock = threading.Lock()
+
+
+def is_stored_interval(interval: str) -> bool:
+    """Check whether bars of this interval are persisted."""
+    return interval in STORED_INTERVALS and not replay.is_active()
+
+
+def get_tail_rewind(interval: str) -> timedelta:
+    """Get how far back a tail refresh reaches before the last stored bar."""
+    return TAIL_REWIND.get(interval, timedelta(days=5))
+
+
+def range_start(period: str, now: datetime = None) -> datetime:
+    """
+    Convert a Yahoo range string ('3d', '9mo', '3y', 'ytd', 'max') to a start datetime.
+
+    Returns:
+        Start datetime, or datetime.min for 'max'
+    """
+    now = now or datetime.utcnow()
+    if period == 'max':
+        return datetime.min
+    if period == 'ytd':
+        return datetime(now.year, 1, 1)
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if not match:
+        print(f"WARNING: Unknown range '{period}' in range_start, using 1y")
+        return now - timedelta(days=365)
+    count, unit = int(match.group(1)), match.group(2)
+    days = {'d': 1, 'wk': 7, 'mo': 31, 'y': 366}[unit]
+    return now - timedelta(days=count * days)
+
+
+def _base_path(symbol: str, interval: str) -> str:
+    safe_symbol = re.sub(r'[^A-Za-z0-9.-]', '_', symbol.upper())
+    return os.path.join(BAR_STORE_DIR, f"{safe_symbol}_{interval}")
+
+
+def get_lock(symbol: str, interval: str) -> threading.Lock:
+    """Get the lock guarding one (symbol, interval) file."""
+    key = _base_path(symbol, interval)
+    with _file_locks_lock:
+        if key not in _file_locks:
+            _file_locks[key] = threading.Lock()
+        return _file_locks[key]
+
+
+def load(symbol: str, interval: str):
+    """
+    Load stored bars and metadata.
+
+    Returns:
+        Tuple of (DataFrame indexed by bar time, metadata dict). Empty when absent.
+    """
+    base = _base_path(symbol, interval)
+    data_path = f"{base}.{_FILE_EXT}"
+    meta_path = f"{base}.json"
+    if not os.path.exists(data_path) or not os.path.exists(meta_path):
+        return pd.DataFrame(), {}
+    try:
+        if _FILE_EXT == 'parquet':
+            df = pd.read_parquet(data_path)
+        else:
+            df = pd.read_pickle(data_path)
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        return df, meta
+    except Exception as e:
+        logger.warning(f"Bar store: could not read {data_path}: {e}")
+        return pd.DataFrame(), {}
+
+
+def save(symbol: str, interval: str, df: pd.DataFrame, meta: dict):
+    """Atomically write bars and metadata."""
+    base = _base_path(symbol, interval)
+    data_path = f"{base}.{_FILE_EXT}"
+    meta_path = f"{base}.json"
+    try:
+        os.makedirs(BAR_STORE_DIR, exist_ok=True)
+        tmp_data = f"{data_path}.tmp"
+        if _FILE_EXT == 'parquet':
+            df.to_parquet(tmp_data)
+        else:
+            df.to_pickle(tmp_data)
+        tmp_meta = f"{meta_path}.tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+    except Exception as e:
+        logger.warning(f"Bar store: could not write {data_path}: {e}")
+
+
+def merge_tail(stored: pd.DataFrame, fetched: pd.DataFrame) -> pd.DataFrame:
+    """Replace stored bars from the first fetched bar onward with the fetched bars."""
+    if stored.empty:
+        return fetched
+    if fetched.empty:
+        return stored
+    head = stored[stored.index < fetched.index.min()]
+    return pd.concat([head, fetched]).sort_index()
+
+
+def make_meta(covered_from: datetime) -> dict:
+    """Build metadata for a freshly written file."""
+    return {
+        'covered_from': covered_from.isoformat() if covered_from != datetime.min else 'max',
+        'updated_at': time.time(),
+    }
+
+
+def covers(meta: dict, start: datetime) -> bool:
+    """Check whether stored history reaches back to start."""
+    covered_from = meta.get('covered_from')
+    if not covered_from:
+        return False
+    if covered_from == 'max':
+        return True
+    return datetime.fromisoformat(covered_from) <= start
@@ -38,16 +38,20 @@ class CostTracker:
 
     def __init__(self):
         self.entries = []
+        self.cache_hits = []
+        self.timings = []
         self.total_input_tokens = 0
         self.total_output_tokens = 0
 
+    def _cost(self, model: str, input_tokens: int, output_tokens: int) -> tuple:
+        pricing = get_model_pricing(model)
+        return (input_tokens / 1_000_000) * pricing[0], (output_tokens / 1_000_000) * pricing[1]
+
     def track(self, model: str, input_tokens: int, output_tokens: int):
         """Record token usage for a model."""
         if input_tokens == 0 and output_tokens == 0:
             return
-        pricing = get_model_pricing(model)
-        input_cost = (input_tokens / 1_000_000) * pricing[0]
-        output_cost = (output_tokens / 1_000_000) * pricing[1]
+        input_cost, output_cost = self._cost(model, input_tokens, output_tokens)
         self.entries.append({
             "model": model,
             "input_tokens": input_tokens,
@@ -59,6 +63,25 @@ class CostTracker:
         self.total_input_tokens += input_tokens
         self.total_output_tokens += output_tokens
 
+    def track_cache_hit(self, model: str, input_tokens: int, output_tokens: int):
+        """Record a response served from the LLM cache (not billed; counted as savings)."""
+        input_cost, output_cost = self._cost(model, input_tokens, output_tokens)
+        self.cache_hits.append({
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "saved_cost": round(input_cost + output_cost, 6),
+        })
+
+    def track_latency(self, step: str, provider: str, queue_wait: float, model_latency: float):
+        """Record how long a call waited for a provider slot vs. how long the model took."""
+        self.timings.append({
+            "step": step,
+            "provider": provider,
+            "queue_wait": queue_wait,
+            "model_latency": model_latency,
+        })
+
     def get_total_cost(self) -> float:
         return round(sum(e["total_cost"] for e in self.entries), 6)
 
@@ -75,16 +98,33 @@ class CostTracker:
             by_model[m]["output_tokens"] += e["output_tokens"]
             by_model[m]["cost"] = round(by_model[m]["cost"] + e["total_cost"], 1)
 
+        # Queue wait vs. model latency per step (seconds)
+        by_step = {}
+        for t in self.timings:
+            step = by_step.setdefault(t["step"], {"provider": t["provider"], "calls": 0, "queue_wait": 0.0, "model_latency": 0.0})
+            step["calls"] += 1
+            step["queue_wait"] = round(step["queue_wait"] + t["queue_wait"], 1)
+            step["model_latency"] = round(step["model_latency"] + t["model_latency"], 1)
+
         return {
             "total_cost": total_cost,
             "total_input_tokens": self.total_input_tokens,
             "total_output_tokens": self.total_output_tokens,
             "by_model": by_model,
+            "cache_hits": len(self.cache_hits),
+            "cached_input_tokens": sum(h["input_tokens"] for h in self.cache_hits),
+            "cached_output_tokens": sum(h["output_tokens"] for h in self.cache_hits),
+            "saved_cost": round(sum(h["saved_cost"] for h in self.cache_hits), 6),
+            "queue_wait_seconds": round(sum(t["queue_wait"] for t in self.timings), 1),
+            "model_latency_seconds": round(sum(t["model_latency"] for t in self.timings), 1),
+            "by_step_latency": by_step,
         }
 
     def reset(self):
         """Reset tracker for a new analysis run."""
         self.entries.clear()
+        self.cache_hits.clear()
+        self.timings.clear()
         self.total_input_tokens = 0
         self.total_output_tokens = 0
 
@@ -2,10 +2,13 @@ import os
 from dotenv import load_dotenv
 from typing import Dict, Any, Tuple, Optional
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import yfinance as yf
 import time
 from .yfinance_compat import YahooFinanceCompat
+from . import fundamentals_cache
+from . import replay
+from . import indicator_engine
 
 load_dotenv(os.path.join('config', '.env'))
 
@@ -15,10 +18,10 @@ class DataFetcher:
         pass
 
     def get_company_overview(self, symbol: str) -> Tuple[pd.DataFrame, Dict]:
-        """Get company overview using yfinance."""
+        """Get company overview using yfinance (cached snapshot, see fundamentals_cache)."""
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = fundamentals_cache.get_info(symbol, lambda: replay.call(
+                'yfinance', {'call': 'info', 'symbol': symbol}, lambda: yf.Ticker(symbol).info))
             # Convert info dict to a format similar to Alpha Vantage
             data = pd.DataFrame([info])
             meta = {'source': 'yfinance'}
@@ -53,8 +56,8 @@ class DataFetcher:
 
     def get_news_sentiment(self, symbol: str, limit: int = 20) -> Tuple[pd.DataFrame, Dict]:
         urlList = []
-        ticker = yf.Ticker(symbol)
-        data = ticker.news[:limit]
+        news = replay.call('yfinance', {'call': 'news', 'symbol': symbol}, lambda: yf.Ticker(symbol).news)
+        data = news[:limit]
         if data:
             for item in data:
                 urlList.append(item['content']['canonicalUrl']['url'])
@@ -69,8 +72,9 @@ class DataFetcher:
 
         for ticker_symbol in macro_tickers:
             try:
-                ticker = yf.Ticker(ticker_symbol)
-                news = ticker.news[:limit//len(macro_tickers)]
+                news = replay.call('yfinance', {'call': 'news', 'symbol': ticker_symbol},
+                                   lambda: yf.Ticker(ticker_symbol).news)
+                news = news[:limit//len(macro_tickers)]
                 for item in news:
                     if 'content' in item and 'canonicalUrl' in item['content']:
                         all_news.append({
@@ -85,38 +89,29 @@ class DataFetcher:
         return all_news[:limit], meta
 
     def download_yf_data(self, symbol: str) -> pd.DataFrame:
-        # download 3 years data
-        start_date = datetime.now() - timedelta(days=1095)
-        start_date_str = start_date.strftime('%Y-%m-%d')
-        data = yf.download(symbol, start=start_date_str)
-        return data
+        # 3 years of daily data, served from the local bar store (only the tail is downloaded)
+        return YahooFinanceCompat(symbol).get_history(period='3y', interval='1d')
 
     def get_sma(self, data: pd.DataFrame, time_period: int = 20) -> Tuple[pd.DataFrame, Dict]:
-        sma = data['Close'].rolling(time_period).mean()
+        sma = indicator_engine.get(data, 'SMA', time_period).rename('Close')
         sma = sma.dropna()
         meta = {'source': 'yfinance'}
         return sma, meta
 
     def get_ema(self, data: pd.DataFrame, time_period: int = 12) -> Tuple[pd.DataFrame, Dict]:
-        ema = data['Close'].ewm(span=time_period, adjust=False).mean()
+        ema = indicator_engine.get(data, 'EMA', time_period).rename('Close')
         meta = {'source': 'yfinance'}
         return ema, meta
 
     def get_rsi(self, data: pd.DataFrame, time_period: int = 14) -> Tuple[pd.DataFrame, Dict]:
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=time_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=time_period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        rsi = indicator_engine.get(data, 'RSI', time_period).rename('Close')
         rsi = rsi.dropna()
         meta = {'source': 'yfinance'}
         return rsi, meta
 
     def get_bbands(self, data: pd.DataFrame, time_period: int = 20) -> Tuple[pd.DataFrame, Dict]:
-        rolling_mean = data['Close'].rolling(window=time_period).mean()
-        rolling_std = data['Close'].rolling(window=time_period).std()
-        upper = rolling_mean + (rolling_std * 2)
-        lower = rolling_mean - (rolling_std * 2)
+        upper = indicator_engine.get(data, 'BB_UPPER', time_period).rename('Close')
+        lower = indicator_engine.get(data, 'BB_LOWER', time_period).rename('Close')
         bbands = pd.concat([upper, lower], axis=1)
         bbands = bbands.dropna()
         meta = {'source': 'yfinance'}
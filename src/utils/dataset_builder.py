@@ -0,0 +1,332 @@
+"""
+Dataset Builder - Cross-sectional meta-label training data over a ticker universe.
+
+Features:
+- feature_frame(): the full meta-label feature set for every bar of one symbol,
+  vectorized on top of the indicator engine (no placeholder columns); the same
+  function builds the inference row, so training and inference always agree
+- Universe defaults to every ticker in web/public/ticket_mapping.json, with
+  multi-year daily history served from the local bar store
+- Writes a compact float32 feature matrix plus int8 labels, bar times and
+  symbol ids as memory-mapped files; later training runs reopen them instead
+  of rebuilding
+- Builds are atomic: data files carry a build id and the JSON sidecar, written
+  last, points at the current build
+- Labels use the investment period's vertical barrier (triple_barrier.PERIOD_DAYS),
+  the same horizon QuantAgent applies at inference; one dataset per period
+- Rebuilt when older than DATASET_MAX_AGE_HOURS or when the feature schema changes
+
+Layout: {DATASET_DIR}/{name}-{period}.v{schema}.json plus raw arrays
+{name}-{period}.v{schema}.{build}.{X,y,t,sym}
+
+Config (config/.env):
+- DATASET_DIR: output directory (default data/datasets)
+- DATASET_PERIOD: history per symbol (default 5y)
+- DATASET_MAX_AGE_HOURS: rebuild after this many hours (default 24)
+- DATASET_UNIVERSE_FILE: ticker list (default web/public/ticket_mapping.json)
+- DATASET_OFFLINE: 1 to read only what the bar store already holds (no network)
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from . import bar_store, indicator_engine, triple_barrier
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+DATASET_DIR = os.getenv('DATASET_DIR', os.path.join('data', 'datasets'))
+DATASET_PERIOD = os.getenv('DATASET_PERIOD', '5y')
+DATASET_MAX_AGE_HOURS = float(os.getenv('DATASET_MAX_AGE_HOURS', '24'))
+DATASET_UNIVERSE_FILE = os.getenv('DATASET_UNIVERSE_FILE', os.path.join('web', 'public', 'ticket_mapping.json'))
+DATASET_OFFLINE = os.getenv('DATASET_OFFLINE', '').strip().lower() in ('1', 'true', 'yes')
+
+# Meta-label feature/label schema. Bump FEATURE_SCHEMA whenever a definition below changes.
+FEATURE_SCHEMA = 3
+FEATURE_COLUMNS = [
+    'return_1d', 'return_5d', 'return_20d', 'volatility_20d', 'rsi_14', 'adx',
+    'trend_strength', 'momentum_score', 'vol_regime', 'price_vs_sma20',
+    'price_vs_sma50', 'volume_ratio',
+]
+WARMUP_BARS = 50          # bars before features are trusted (SMA-50)
+VOL_RANK_WINDOW = 252     # trailing bars for the volatility percentile
+DEFAULT_INVESTMENT_PERIOD = 'medium'  # label horizon for unknown periods (as QuantAgent)
+
+_build_lock = threading.Lock()
+
+
+# ============================================================================
+# FEATURES AND LABELS (one symbol, vectorized)
+# ============================================================================
+
+def feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Meta-label features for every bar of an OHLCV frame.
+
+    Matches QuantAgent's trend/volatility analysis evaluated at each bar:
+    ADX defaults to 20 before it is defined, momentum is the 20-bar mean/std
+    of returns mapped to 0-1, and vol_regime is +1/-1/0 for a volatility
+    percentile above 75 / below 25 / in between (trailing VOL_RANK_WINDOW bars).
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+    indicators = indicator_engine.compute(df)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close / indicator_engine.shift(close) - 1.0
+        mean_20 = indicator_engine.rolling_mean(returns, 20)
+        std_20 = indicator_engine.rolling_std(returns, 20)
+        momentum = np.where(std_20 > 0, mean_20 / std_20, 0.0)
+        adx = np.nan_to_num(indicators['ADX_14'].to_numpy(), nan=20.0)
+
+        volatility = indicators['VOLATILITY_20']
+        percentile = volatility.rolling(VOL_RANK_WINDOW, min_periods=20).rank(pct=True).to_numpy()
+        vol_regime = np.where(percentile > 0.75, 1.0, np.where(percentile < 0.25, -1.0, 0.0))
+
+        features = pd.DataFrame({
+            'return_1d': returns,
+            'return_5d': indicator_engine.rolling_mean(returns, 5),
+            'return_20d': mean_20,
+            'volatility_20d': volatility.to_numpy(),
+            'rsi_14': indicators['RSI_14'].to_numpy(),
+            'adx': adx,
+            'trend_strength': np.minimum(adx / 50.0, 1.0),
+            'momentum_score': np.clip((momentum + 2.0) / 4.0, 0.0, 1.0),
+            'vol_regime': vol_regime,
+            'price_vs_sma20': close / indicators['SMA_20'].to_numpy() - 1.0,
+            'price_vs_sma50': close / indicators['SMA_50'].to_numpy() - 1.0,
+            'volume_ratio': volume / indicators['VOLUME_SMA_20'].to_numpy(),
+        }, index=df.index)
+    return features[FEATURE_COLUMNS]
+
+
+def label_horizon(investment_period: str) -> int:
+    """Vertical barrier (daily bars) of the triple-barrier labels for an investment period."""
+    days = triple_barrier.PERIOD_DAYS.get(investment_period, triple_barrier.PERIOD_DAYS[DEFAULT_INVESTMENT_PERIOD])
+    return triple_barrier.horizon_bars(days)
+
+
+def label_series(df: pd.DataFrame, horizon: int) -> pd.Series:
+    """
+    First-touch triple-barrier labels per bar: 2 (buy) if the ATR-scaled profit
+    target is touched first, 0 (sell) if the stop is, 1 (hold) if neither is
+    touched within horizon bars. NaN where the outcome is not known yet.
+    """
+    atr = indicator_engine.compute(df)['ATR_14']
+    return triple_barrier.label_frame(df, atr, horizon)['label']
+
+
+def training_rows(df: pd.DataFrame, investment_period: str = DEFAULT_INVESTMENT_PERIOD):
+    """(features, labels) for the bars of one symbol that are usable for training."""
+    features = feature_frame(df)
+    labels = label_series(df, label_horizon(investment_period))
+    usable = np.isfinite(features.to_numpy()).all(axis=1) & labels.notna().to_numpy()
+    usable[:WARMUP_BARS] = False
+    return features[usable], labels[usable].astype(np.int8)
+
+
+# ============================================================================
+# UNIVERSE DATASET (memory-mapped)
+# ============================================================================
+
+def load_universe(path: str = None) -> List[str]:
+    """Tickers from the universe file (a list of {"ticker", ...} entries)."""
+    path = path or DATASET_UNIVERSE_FILE
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except Exception as e:
+        print(f"WARNING: Could not read universe {path}: {e}")
+        return []
+    seen = []
+    for entry in entries:
+        ticker = entry.get('ticker', '').strip().upper() if isinstance(entry, dict) else str(entry).upper()
+        if ticker and ticker not in seen:
+            seen.append(ticker)
+    return seen
+
+
+def load_bars(symbol: str, period: str, offline: bool = None) -> pd.DataFrame:
+    """Daily bars for a symbol: bar store only when offline, else store + tail refresh."""
+    if DATASET_OFFLINE if offline is None else offline:
+        bars, _ = bar_store.load(symbol, '1d')
+        return bars
+    try:
+        from .yfinance_compat import YahooFinanceCompat
+        return YahooFinanceCompat(symbol).get_history(period=period, interval='1d')
+    except Exception as e:
+        print(f"WARNING: Dataset: no bars for {symbol}: {e}")
+        return pd.DataFrame()
+
+
+def _dataset_id(name: str, investment_period: str) -> str:
+    return f"{name}-{investment_period.replace('+', 'plus')}"
+
+
+def _paths(dataset_id: str, build: str = None) -> Dict[str, str]:
+    base = os.path.join(DATASET_DIR, f"{dataset_id}.v{FEATURE_SCHEMA}")
+    if build is None:
+        return {'meta': f"{base}.json"}
+    return {part: f"{base}.{build}.{part}" for part in ('X', 'y', 't', 'sym')}
+
+
+def _write_array(path: str, array: np.ndarray):
+    out = np.memmap(path, dtype=array.dtype, mode='w+', shape=array.shape)
+    out[:] = array
+    out.flush()
+    del out
+
+
+def build(symbols: List[str] = None, name: str = 'universe', period: str = None,
+          investment_period: str = DEFAULT_INVESTMENT_PERIOD) -> Optional[Dict]:
+    """
+    Build and persist the cross-sectional dataset.
+
+    Args:
+        symbols: Tickers (default: the universe file)
+        name: Dataset name
+        period: History per symbol (default DATASET_PERIOD)
+        investment_period: Period whose vertical barrier the labels use
+
+    Returns:
+        The opened dataset (see load()), or None if no symbol produced rows
+    """
+    symbols = symbols or load_universe()
+    period = period or DATASET_PERIOD
+    dataset_id = _dataset_id(name, investment_period)
+    horizon = label_horizon(investment_period)
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=min(5, len(symbols)) or 1) as executor:
+        frames = list(executor.map(lambda s: load_bars(s, period), symbols))
+
+    X_parts, y_parts, t_parts, sym_parts, used = [], [], [], [], []
+    for symbol, bars in zip(symbols, frames):
+        if bars is None or len(bars) < WARMUP_BARS + horizon + 1:
+            continue
+        features, labels = training_rows(bars, investment_period)
+        if features.empty:
+            continue
+        X_parts.append(features.to_numpy(dtype=np.float32))
+        y_parts.append(labels.to_numpy(dtype=np.int8))
+        times = pd.DatetimeIndex(features.index)
+        if times.tz is not None:
+            times = times.tz_convert('UTC').tz_localize(None)
+        t_parts.append(times.asi8.astype(np.int64))
+        sym_parts.append(np.full(len(features), len(used), dtype=np.int16))
+        used.append(symbol)
+
+    if not used:
+        print(f"WARNING: Dataset {dataset_id}: no usable history for {len(symbols)} symbols")
+        return None
+
+    build_id = uuid.uuid4().hex[:12]
+    paths = _paths(dataset_id, build_id)
+    arrays = {
+        'X': np.concatenate(X_parts),
+        'y': np.concatenate(y_parts),
+        't': np.concatenate(t_parts),
+        'sym': np.concatenate(sym_parts),
+    }
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    for part, array in arrays.items():
+        _write_array(paths[part], array)
+
+    meta = {
+        'name': name,
+        'schema': FEATURE_SCHEMA,
+        'build': build_id,
+        'built_at': time.time(),
+        'rows': int(arrays['X'].shape[0]),
+        'features': FEATURE_COLUMNS,
+        'symbols': used,
+        'period': period,
+        'investment_period': investment_period,
+        'label_horizon': horizon,
+        'label_barriers': [triple_barrier.PROFIT_TARGET_MULT, triple_barrier.STOP_LOSS_MULT],
+    }
+    meta_path = _paths(dataset_id)['meta']
+    previous = _read_meta(dataset_id)
+    tmp_meta = f"{meta_path}.{build_id}.tmp"
+    with open(tmp_meta, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_meta, meta_path)
+
+    # Old build files are unreferenced now
+    if previous and previous.get('build') != build_id:
+        for path in _paths(dataset_id, previous['build']).values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    print(f"DATASET: {dataset_id} built: {meta['rows']} rows x {len(FEATURE_COLUMNS)} features "
+          f"(label horizon {horizon} bars) from {len(used)}/{len(symbols)} symbols in {time.time() - start:.1f}s")
+    return load(name, max_age_hours=float('inf'), investment_period=investment_period)
+
+
+def _read_meta(dataset_id: str) -> Optional[Dict]:
+    try:
+        with open(_paths(dataset_id)['meta'], 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load(name: str = 'universe', max_age_hours: float = None,
+         investment_period: str = DEFAULT_INVESTMENT_PERIOD) -> Optional[Dict]:
+    """
+    Open a built dataset as read-only memory maps.
+
+    Returns:
+        Dict with X (rows x features, float32), y (int8), t (bar time, ns),
+        sym (symbol id per row), symbols, features and meta; None if the
+        dataset is missing, stale or built with another feature schema or label horizon
+    """
+    dataset_id = _dataset_id(name, investment_period)
+    meta = _read_meta(dataset_id)
+    if not meta or meta.get('schema') != FEATURE_SCHEMA or meta.get('features') != FEATURE_COLUMNS:
+        return None
+    if meta.get('label_horizon') != label_horizon(investment_period):
+        return None
+    max_age = DATASET_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    if time.time() - meta.get('built_at', 0) > max_age * 3600:
+        return None
+
+    rows, cols = meta['rows'], len(meta['features'])
+    paths = _paths(dataset_id, meta['build'])
+    try:
+        return {
+            'X': np.memmap(paths['X'], dtype=np.float32, mode='r', shape=(rows, cols)),
+            'y': np.memmap(paths['y'], dtype=np.int8, mode='r', shape=(rows,)),
+            't': np.memmap(paths['t'], dtype=np.int64, mode='r', shape=(rows,)),
+            'sym': np.memmap(paths['sym'], dtype=np.int16, mode='r', shape=(rows,)),
+            'symbols': meta['symbols'],
+            'features': meta['features'],
+            'meta': meta,
+        }
+    except (OSError, ValueError) as e:
+        logger.warning(f"Dataset {dataset_id}: could not open build {meta['build']}: {e}")
+        return None
+
+
+def load_or_build(name: str = 'universe', symbols: List[str] = None,
+                  investment_period: str = DEFAULT_INVESTMENT_PERIOD) -> Optional[Dict]:
+    """Reuse the persisted dataset while it is fresh; otherwise rebuild it (one builder at a time)."""
+    dataset = load(name, investment_period=investment_period)
+    if dataset is not None:
+        return dataset
+    with _build_lock:
+        dataset = load(name, investment_period=investment_period)
+        if dataset is not None:
+            return dataset
+        return build(symbols, name, investment_period=investment_period)
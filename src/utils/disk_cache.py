@@ -0,0 +1,82 @@
+"""
+Disk Cache - Small persistent JSON key/value cache with per-entry expiry.
+
+Features:
+- One JSON file per key under CACHE_DIR/<namespace> (default ./data/cache)
+- Expiry chosen by the caller at write time (fixed TTL or calendar-based)
+- Atomic writes (temp file + os.replace), safe across threads and restarts
+- Unreadable or corrupt entries are treated as misses
+- Bypassed while FINAGENT_REPLAY is recording or replaying
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from dotenv import load_dotenv
+from . import replay
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join('data', 'cache'))
+
+
+class DiskCache:
+    """Persistent JSON cache for one namespace."""
+
+    def __init__(self, namespace: str, directory: str = None):
+        self.directory = os.path.join(directory or CACHE_DIR, namespace)
+
+    def _path(self, key) -> str:
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        """Return (value, expires_at) for a live entry, or None if missing or expired."""
+        if replay.is_active():
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get('expires_at', 0) <= time.time():
+                return None
+            return entry.get('value'), entry['expires_at']
+        except Exception as e:
+            logger.debug(f"Disk cache: unreadable entry {path}: {e}")
+            return None
+
+    def set(self, key, value, expires_at: float):
+        """Store a JSON-serializable value until expires_at (epoch seconds)."""
+        if replay.is_active():
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'key': repr(key),
+                    'stored_at': time.time(),
+                    'expires_at': expires_at,
+                    'value': value,
+                }, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Disk cache: could not write {path}: {e}")
+
+    def set_with_ttl(self, key, value, ttl: float):
+        """Store a value for ttl seconds."""
+        self.set(key, value, time.time() + ttl)
@@ -0,0 +1,104 @@
+"""
+Fundamentals Cache - Snapshot cache for yfinance Ticker.info.
+
+Features:
+- In-memory LRU (FUNDAMENTALS_CACHE_SIZE symbols) in front of a persistent DiskCache
+- Configurable TTL (FUNDAMENTALS_CACHE_TTL seconds, default 6 hours)
+- Single-flight per symbol: concurrent requests share one quoteSummary call
+- Empty snapshots are never cached
+
+yfinance keeps a single session/cookie/crumb in its YfData singleton (guarded by
+its own lock), so every Ticker created here reuses the same negotiated crumb.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from .disk_cache import DiskCache
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+FUNDAMENTALS_CACHE_TTL = int(os.getenv('FUNDAMENTALS_CACHE_TTL', str(6 * 3600)))
+FUNDAMENTALS_CACHE_SIZE = int(os.getenv('FUNDAMENTALS_CACHE_SIZE', '256'))
+
+_memory = OrderedDict()  # symbol -> (expires_at, info)
+_memory_lock = threading.Lock()
+_inflight = {}  # symbol -> threading.Event
+_disk = DiskCache('fundamentals')
+
+
+def _memory_get(symbol: str):
+    with _memory_lock:
+        entry = _memory.get(symbol)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del _memory[symbol]
+            return None
+        _memory.move_to_end(symbol)
+        return entry[1]
+
+
+def _memory_put(symbol: str, info: dict, expires_at: float):
+    with _memory_lock:
+        _memory[symbol] = (expires_at, info)
+        _memory.move_to_end(symbol)
+        while len(_memory) > FUNDAMENTALS_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def get_info(symbol: str, loader) -> dict:
+    """
+    Get a fundamentals snapshot for a symbol.
+
+    Args:
+        symbol: Stock ticker
+        loader: Zero-arg callable returning the live info dict (e.g. yf.Ticker(symbol).info)
+
+    Returns:
+        Info dict (memory -> disk -> live, in that order)
+    """
+    symbol = symbol.upper()
+    while True:
+        info = _memory_get(symbol)
+        if info is not None:
+            return info
+
+        entry = _disk.get_entry(symbol)
+        if entry is not None and entry[0] is not None:
+            # Promote with the disk entry's own expiry, not a fresh TTL
+            info, expires_at = entry
+            _memory_put(symbol, info, expires_at)
+            return info
+
+        with _memory_lock:
+            event = _inflight.get(symbol)
+            if event is None:
+                event = threading.Event()
+                _inflight[symbol] = event
+                break
+        # Another thread is fetching this symbol; wait for it, then re-check the caches
+        if not event.wait(timeout=60):
+            return loader()
+        if _memory_get(symbol) is None:
+            return loader()
+
+    try:
+        start = time.time()
+        info = loader()
+        if info:
+            expires_at = time.time() + FUNDAMENTALS_CACHE_TTL
+            _memory_put(symbol, info, expires_at)
+            _disk.set(symbol, info, expires_at)
+            logger.debug(f"Fundamentals cache: fetched {symbol} in {time.time() - start:.1f}s")
+        return info
+    finally:
+        with _memory_lock:
+            _inflight.pop(symbol, None)
+        event.set()
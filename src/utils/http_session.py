@@ -0,0 +1,82 @@
+"""
+HTTP Session Pool - Shared keep-alive connection pools for outbound data fetchers.
+
+Features:
+- One requests.Session per host, created lazily and shared by all threads
+- Per-host connection pool sizes (POOL_SIZES)
+- Keep-alive: the TCP+TLS handshake is paid once per pooled connection
+- http_get() is a drop-in replacement for requests.get(), rate-limited per host
+  with adaptive backoff and retries on 429/5xx (see rate_limiter.py)
+- Honors FINAGENT_REPLAY record/replay cassettes (see replay.py)
+
+requests/urllib3 only speak HTTP/1.1, so there is no HTTP/2 multiplexing;
+connection reuse is what removes the per-call handshake.
+"""
+
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from . import rate_limiter
+from . import replay
+
+# Max pooled connections per host (sized for a 5-ticker batch)
+POOL_SIZES = {
+    'query1.finance.yahoo.com': 16,
+    'query2.finance.yahoo.com': 16,
+    'api.worldbank.org': 8,
+    'www.reddit.com': 4,
+}
+DEFAULT_POOL_SIZE = 8
+
+_sessions = {}  # host -> requests.Session
+_sessions_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Get the shared session for the URL's host.
+
+    Args:
+        url: Any URL on the target host
+
+    Returns:
+        requests.Session with a keep-alive pool sized for that host
+    """
+    host = urlsplit(url).netloc.lower()
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        if host not in _sessions:
+            pool_size = POOL_SIZES.get(host, DEFAULT_POOL_SIZE)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return _sessions[host]
+
+
+def http_get(url: str, params: dict = None, headers: dict = None, timeout: float = 30) -> requests.Response:
+    """GET through the host's pooled session (same semantics as requests.get)."""
+    if replay.is_replaying():
+        return replay.load_http(url, params)
+    session = get_session(url)
+    for attempt in range(rate_limiter.MAX_ATTEMPTS):
+        rate_limiter.acquire(url)
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+        if not rate_limiter.observe(url, response, attempt):
+            break
+    if replay.is_recording():
+        replay.save_http(url, params, response)
+    return response
+
+
+def close_all():
+    """Close all pooled sessions."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
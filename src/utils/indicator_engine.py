@@ -0,0 +1,503 @@
+"""
+Indicator Engine - Vectorized technical indicators over OHLCV NumPy arrays.
+
+Features:
+- One pass per OHLCV frame computes every indicator in INDICATOR_SPEC
+  (the union of what TechnicalAnalyst and QuantAgent need)
+- Shared building blocks: one diff, cumulative-sum rolling windows, one EMA kernel
+  (EMA-10, MACD 12/26/9 and its signal line all use ema())
+- Kernels accept 1-D arrays or 2-D (time x symbol) arrays and work along axis 0;
+  NaN rows (e.g. before a symbol's first bar) propagate like pandas rolling windows
+- compute() memoizes results per OHLCV content, so Technical and Quant analysis
+  of the same bars share one computation
+- compute_panel() right-aligns several symbols' bars into (time x symbol) arrays,
+  computes them column-wise in one pass and seeds the memo for each symbol
+- Swing-point detection (strided centered max/min) and ATR-tolerance level
+  clustering for support/resistance
+
+Indicator definitions match the previous pandas code: RSI and ADX use simple
+rolling means (not Wilder smoothing), standard deviations use ddof=1, and EMAs
+follow pandas ewm(span, adjust=False).
+"""
+
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict
+
+# Indicators computed by default for every OHLCV frame
+INDICATOR_SPEC = {
+    'sma': (20, 50, 100),
+    'ema': (10,),
+    'rsi': (14, 36),
+    'bbands': (36,),
+    'macd': ((12, 26, 9),),
+    'vwap': True,
+    'atr': (14,),
+    'adx': (14,),
+    'volatility': (20,),
+    'volume_sma': (10, 20, 50),
+    'volume_std': (20,),
+}
+
+MEMO_SIZE = 64
+EMA_MAX_BLOCK = 256  # rows per closed-form EMA block
+
+_memo = OrderedDict()  # fingerprint -> DataFrame of indicator columns
+_memo_lock = threading.Lock()
+
+
+def column(name: str, *params) -> str:
+    """Column name for an indicator, e.g. column('SMA', 50) -> 'SMA_50'."""
+    return '_'.join([name] + [str(p) for p in params])
+
+
+# ============================================================================
+# KERNELS (1-D or 2-D, along axis 0)
+# ============================================================================
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        return x[:, None], True
+    return x, False
+
+
+def _restore(x, squeeze: bool):
+    return x[:, 0] if squeeze else x
+
+
+def _first_valid(valid: np.ndarray) -> np.ndarray:
+    """Row of the first True per column (n if the column has none)."""
+    first = np.argmax(valid, axis=0)
+    first[~valid.any(axis=0)] = valid.shape[0]
+    return first
+
+
+def shift(x, periods: int = 1):
+    """Shift rows down by `periods`, filling with NaN."""
+    x2, squeeze = _as_2d(x)
+    out = np.full(x2.shape, np.nan)
+    if periods < x2.shape[0]:
+        out[periods:] = x2[:-periods]
+    return _restore(out, squeeze)
+
+
+def rolling_sum(x, window: int):
+    """Rolling sum via cumulative sums; NaN if any value in the window is NaN."""
+    x2, squeeze = _as_2d(x)
+    n = x2.shape[0]
+    out = np.full(x2.shape, np.nan)
+    if window <= 0 or n < window:
+        return _restore(out, squeeze)
+
+    nan = np.isnan(x2)
+    csum = np.zeros((n + 1, x2.shape[1]))
+    np.cumsum(np.where(nan, 0.0, x2), axis=0, out=csum[1:])
+    cnan = np.zeros((n + 1, x2.shape[1]), dtype=np.int64)
+    np.cumsum(nan, axis=0, out=cnan[1:])
+
+    sums = csum[window:] - csum[:-window]
+    sums[(cnan[window:] - cnan[:-window]) > 0] = np.nan
+    out[window - 1:] = sums
+    return _restore(out, squeeze)
+
+
+def rolling_mean(x, window: int):
+    """Simple moving average (pandas rolling(window).mean())."""
+    return rolling_sum(x, window) / window
+
+
+def rolling_std(x, window: int, ddof: int = 1):
+    """Rolling standard deviation from windowed sums of x and x^2."""
+    x2, squeeze = _as_2d(x)
+    if window - ddof <= 0:
+        return _restore(np.full(x2.shape, np.nan), squeeze)
+    # Centering on the column mean keeps the sum-of-squares difference well conditioned
+    with np.errstate(invalid='ignore'):
+        center = np.nanmean(x2, axis=0) if np.isfinite(x2).any() else np.zeros(x2.shape[1])
+    centered = x2 - np.nan_to_num(center)
+    s1 = rolling_sum(centered, window)
+    s2 = rolling_sum(centered * centered, window)
+    var = (s2 - s1 * s1 / window) / (window - ddof)
+    return _restore(np.sqrt(np.maximum(var, 0.0)), squeeze)
+
+
+def ema(x, span: int):
+    """
+    Exponential moving average (pandas ewm(span, adjust=False).mean()).
+
+    Evaluated in closed form over blocks of rows:
+        y[i] = d^(i+1) * y_prev + a * d^i * cumsum(x[k] * d^-k)
+    with a = 2 / (span + 1), d = 1 - a. Blocks are sized so d^-k stays finite.
+    Output is NaN before each column's first valid value; interior NaNs carry
+    the previous value forward.
+    """
+    x2, squeeze = _as_2d(x)
+    n, cols = x2.shape
+    out = np.full(x2.shape, np.nan)
+    if n == 0:
+        return _restore(out, squeeze)
+
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+
+    # Forward-fill interior NaNs, back-fill the leading ones with the first value
+    valid = ~np.isnan(x2)
+    first = _first_valid(valid)
+    rows = np.arange(n)[:, None]
+    idx = np.maximum.accumulate(np.where(valid, rows, 0), axis=0)
+    filled = np.take_along_axis(x2, idx, axis=0)
+    seed = x2[np.minimum(first, n - 1), np.arange(cols)]
+    filled = np.where(rows < first, seed, filled)
+
+    if decay <= 0.0:
+        out = filled.copy()
+    else:
+        block = int(max(1, min(EMA_MAX_BLOCK, 300.0 / -np.log(decay))))
+        prev = filled[0]
+        for start in range(0, n, block):
+            seg = filled[start:start + block]
+            k = np.arange(seg.shape[0])[:, None]
+            pw = decay ** k
+            acc = alpha * pw * np.cumsum(seg / pw, axis=0)
+            y = acc + decay * pw * prev
+            out[start:start + seg.shape[0]] = y
+            prev = y[-1]
+
+    out[rows < first] = np.nan
+    return _restore(out, squeeze)
+
+
+def rsi(close, period: int = 14, delta=None):
+    """RSI from simple rolling means of gains and losses."""
+    close2, squeeze = _as_2d(close)
+    if delta is None:
+        delta = close2 - shift(close2)
+    else:
+        delta, _ = _as_2d(delta)
+    # pandas where(delta > 0, 0) turns the first diff into 0 rather than NaN
+    first = _first_valid(~np.isnan(close2))
+    delta = delta.copy()
+    has_first = first < close2.shape[0]
+    delta[first[has_first], np.nonzero(has_first)[0]] = 0.0
+
+    gain = rolling_mean(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    loss = rolling_mean(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + gain / loss)
+    return _restore(out, squeeze)
+
+
+def true_range(high, low, close):
+    """True range; the first bar uses high - low."""
+    high2, squeeze = _as_2d(high)
+    low2, _ = _as_2d(low)
+    prev_close = shift(_as_2d(close)[0])
+    tr = np.fmax(high2 - low2, np.fmax(np.abs(high2 - prev_close), np.abs(low2 - prev_close)))
+    return _restore(tr, squeeze)
+
+
+def adx(high, low, close, period: int = 14, tr=None):
+    """ADX, +DI and -DI from simple rolling means. Returns (adx, plus_di, minus_di)."""
+    high2, squeeze = _as_2d(high)
+    low2, _ = _as_2d(low)
+    if tr is None:
+        tr = true_range(high2, low2, close)
+    else:
+        tr, _ = _as_2d(tr)
+
+    up_move = high2 - shift(high2)
+    down_move = shift(low2) - low2
+    with np.errstate(invalid='ignore'):
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    plus_dm[np.isnan(high2)] = np.nan
+    minus_dm[np.isnan(low2)] = np.nan
+
+    atr_smooth = rolling_mean(tr, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * rolling_mean(plus_dm, period) / atr_smooth
+        minus_di = 100.0 * rolling_mean(minus_dm, period) / atr_smooth
+        dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx_values = rolling_mean(dx, period)
+    return _restore(adx_values, squeeze), _restore(plus_di, squeeze), _restore(minus_di, squeeze)
+
+
+def vwap(high, low, close, volume):
+    """Cumulative volume-weighted average price."""
+    high2, squeeze = _as_2d(high)
+    typical = (high2 + _as_2d(low)[0] + _as_2d(close)[0]) / 3.0
+    volume2, _ = _as_2d(volume)
+    pv = np.nancumsum(typical * volume2, axis=0)
+    cv = np.nancumsum(np.where(np.isnan(typical), np.nan, volume2), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = pv / cv
+    out[np.isnan(typical)] = np.nan
+    return _restore(out, squeeze)
+
+
+def centered_extrema(x, lookback: int):
+    """
+    Max and min over the centered window [i - lookback, i + lookback].
+
+    Uses a strided sliding-window view, so there is no Python loop over bars.
+    The first and last `lookback` rows (incomplete windows) are NaN.
+    Returns (max, min).
+    """
+    x2, squeeze = _as_2d(x)
+    width = 2 * lookback + 1
+    hi = np.full(x2.shape, np.nan)
+    lo = np.full(x2.shape, np.nan)
+    if x2.shape[0] >= width:
+        windows = np.lib.stride_tricks.sliding_window_view(x2, width, axis=0)
+        end = x2.shape[0] - lookback
+        hi[lookback:end] = windows.max(axis=-1)
+        lo[lookback:end] = windows.min(axis=-1)
+    return _restore(hi, squeeze), _restore(lo, squeeze)
+
+
+def swing_points(high, low, lookback: int = 5):
+    """
+    Swing highs/lows: bars whose high (low) is the extreme of the centered window.
+
+    Returns boolean masks (is_swing_high, is_swing_low) shaped like the inputs.
+    """
+    window_high, _ = centered_extrema(high, lookback)
+    _, window_low = centered_extrema(low, lookback)
+    with np.errstate(invalid='ignore'):
+        return (np.asarray(high, dtype=np.float64) == window_high,
+                np.asarray(low, dtype=np.float64) == window_low)
+
+
+def cluster_levels(levels, tolerance: float):
+    """
+    Merge price levels that lie within `tolerance` of their neighbour.
+
+    Levels are sorted and split wherever the gap to the next level exceeds the
+    tolerance; each cluster becomes its mean. Returns (centers, touches), both
+    sorted by price ascending.
+    """
+    levels = np.sort(np.asarray(levels, dtype=np.float64).ravel())
+    levels = levels[np.isfinite(levels)]
+    if levels.size == 0:
+        return levels, np.zeros(0, dtype=np.int64)
+    starts = np.r_[0, np.nonzero(np.diff(levels) > tolerance)[0] + 1]
+    touches = np.diff(np.r_[starts, levels.size])
+    centers = np.add.reduceat(levels, starts) / touches
+    return centers, touches
+
+
+# ============================================================================
+# ONE-PASS COMPUTATION
+# ============================================================================
+
+def _iter(spec: dict, key: str):
+    value = spec.get(key) or ()
+    return value if isinstance(value, (tuple, list)) else ()
+
+
+def compute_arrays(high, low, close, volume, spec: dict = None) -> Dict[str, np.ndarray]:
+    """
+    Compute every indicator in spec from OHLCV arrays in one pass.
+
+    Args:
+        high, low, close, volume: 1-D arrays, or 2-D (time x symbol) arrays
+        spec: Indicator spec (default INDICATOR_SPEC)
+
+    Returns:
+        Dict of column name (see column()) -> array shaped like close
+    """
+    spec = INDICATOR_SPEC if spec is None else spec
+    close = np.asarray(close, dtype=np.float64)
+    out = {}
+
+    # Shared intermediates
+    prev_close = shift(close)
+    delta = close - prev_close
+    tr = true_range(high, low, close) if (_iter(spec, 'atr') or _iter(spec, 'adx')) else None
+    ema_cache = {}
+
+    def _ema(span):
+        if span not in ema_cache:
+            ema_cache[span] = ema(close, span)
+        return ema_cache[span]
+
+    for period in _iter(spec, 'sma'):
+        out[column('SMA', period)] = rolling_mean(close, period)
+    for span in _iter(spec, 'ema'):
+        out[column('EMA', span)] = _ema(span)
+    for period in _iter(spec, 'rsi'):
+        out[column('RSI', period)] = rsi(close, period, delta=delta)
+    for period in _iter(spec, 'bbands'):
+        mid = out.get(column('SMA', period))
+        if mid is None:
+            mid = rolling_mean(close, period)
+        std = rolling_std(close, period)
+        out[column('BB_UPPER', period)] = mid + 2 * std
+        out[column('BB_LOWER', period)] = mid - 2 * std
+    for fast, slow, signal in _iter(spec, 'macd'):
+        macd = _ema(fast) - _ema(slow)
+        signal_line = ema(macd, signal)
+        out[column('MACD', fast, slow, signal)] = macd
+        out[column('MACD_SIGNAL', fast, slow, signal)] = signal_line
+        out[column('MACD_HIST', fast, slow, signal)] = macd - signal_line
+    if spec.get('vwap'):
+        out['VWAP'] = vwap(high, low, close, volume)
+    for period in _iter(spec, 'atr'):
+        out[column('ATR', period)] = rolling_mean(tr, period)
+    for period in _iter(spec, 'adx'):
+        adx_values, plus_di, minus_di = adx(high, low, close, period, tr=tr)
+        out[column('ADX', period)] = adx_values
+        out[column('PLUS_DI', period)] = plus_di
+        out[column('MINUS_DI', period)] = minus_di
+    if _iter(spec, 'volatility'):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = close / prev_close - 1.0
+        for period in _iter(spec, 'volatility'):
+            out[column('VOLATILITY', period)] = rolling_std(returns, period) * np.sqrt(252)
+    for period in _iter(spec, 'volume_sma'):
+        out[column('VOLUME_SMA', period)] = rolling_mean(volume, period)
+    for period in _iter(spec, 'volume_std'):
+        out[column('VOLUME_STD', period)] = rolling_std(volume, period)
+    return out
+
+
+def _ohlcv_arrays(df: pd.DataFrame) -> tuple:
+    """(high, low, close, volume) float arrays; Close stands in for missing High/Low."""
+    close = df['Close'].to_numpy(dtype=np.float64)
+    high = df['High'].to_numpy(dtype=np.float64) if 'High' in df else close
+    low = df['Low'].to_numpy(dtype=np.float64) if 'Low' in df else close
+    volume = df['Volume'].to_numpy(dtype=np.float64) if 'Volume' in df else np.full(len(df), np.nan)
+    return high, low, close, volume
+
+
+def _fingerprint(df: pd.DataFrame, arrays: tuple) -> str:
+    digest = hashlib.sha1()
+    digest.update(np.asarray(df.index.asi8 if hasattr(df.index, 'asi8') else df.index).tobytes())
+    for values in arrays:
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def _extra_spec(spec: dict) -> dict:
+    """Entries of spec that INDICATOR_SPEC does not already cover."""
+    extra = {}
+    for key, value in spec.items():
+        if isinstance(value, (tuple, list)):
+            missing = tuple(v for v in value if v not in _iter(INDICATOR_SPEC, key))
+            if missing:
+                extra[key] = missing
+        elif value and not INDICATOR_SPEC.get(key):
+            extra[key] = value
+    return extra
+
+
+def compute(df: pd.DataFrame, spec: dict = None) -> pd.DataFrame:
+    """
+    Compute indicators for an OHLCV DataFrame (memoized per OHLCV content).
+
+    Args:
+        df: DataFrame with a Close column (High, Low, Volume used when present)
+        spec: Extra indicators beyond INDICATOR_SPEC (e.g. {'sma': (36,)})
+
+    Returns:
+        DataFrame of indicator columns aligned to df.index
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(index=df.index if df is not None else None)
+
+    arrays = _ohlcv_arrays(df)
+    key = _fingerprint(df, arrays)
+    extra = _extra_spec(spec or {})
+    with _memo_lock:
+        frame = _memo.get(key)
+        if frame is not None:
+            _memo.move_to_end(key)
+
+    if frame is None:
+        frame = pd.DataFrame(compute_arrays(*arrays), index=df.index)
+    if extra:
+        needed = {k: v for k, v in compute_arrays(*arrays, spec=extra).items() if k not in frame.columns}
+        if needed:
+            frame = pd.concat([frame, pd.DataFrame(needed, index=df.index)], axis=1)
+
+    with _memo_lock:
+        _memo[key] = frame
+        _memo.move_to_end(key)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return frame.copy()
+
+
+def compute_panel(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Compute INDICATOR_SPEC for several symbols in one vectorized pass.
+
+    Each symbol's bars are right-aligned (its last bar on the last row, NaN before
+    its first bar), so every column gives exactly what compute() would for that
+    symbol alone, even when histories differ in length or trading calendar.
+    Results are stored in the memo, so later compute(df) calls for the same bars are hits.
+
+    Args:
+        frames: Dict of symbol -> OHLCV DataFrame
+
+    Returns:
+        Dict of symbol -> DataFrame of indicator columns aligned to that symbol's index
+    """
+    frames = {s: df for s, df in frames.items() if df is not None and not df.empty and 'Close' in df}
+    if not frames:
+        return {}
+
+    symbols = list(frames)
+    rows = max(len(df) for df in frames.values())
+    inputs = {s: _ohlcv_arrays(frames[s]) for s in symbols}
+    panel = [np.full((rows, len(symbols)), np.nan) for _ in range(4)]
+    for j, s in enumerate(symbols):
+        length = len(frames[s])
+        for k in range(4):
+            panel[k][rows - length:, j] = inputs[s][k]
+
+    arrays = compute_arrays(*panel)
+    results = {}
+    for j, s in enumerate(symbols):
+        length = len(frames[s])
+        frame = pd.DataFrame({name: values[rows - length:, j] for name, values in arrays.items()},
+                             index=frames[s].index)
+        with _memo_lock:
+            key = _fingerprint(frames[s], inputs[s])
+            _memo[key] = frame
+            _memo.move_to_end(key)
+            while len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+        results[s] = frame.copy()
+    return results
+
+
+def get(df: pd.DataFrame, name: str, *params) -> pd.Series:
+    """
+    Get one indicator series, e.g. get(df, 'SMA', 50) or get(df, 'MACD', 12, 26, 9).
+
+    Indicators outside INDICATOR_SPEC are computed on demand and memoized.
+    """
+    spec_key = {
+        'SMA': 'sma', 'EMA': 'ema', 'RSI': 'rsi', 'BB_UPPER': 'bbands', 'BB_LOWER': 'bbands',
+        'MACD': 'macd', 'MACD_SIGNAL': 'macd', 'MACD_HIST': 'macd', 'ATR': 'atr',
+        'ADX': 'adx', 'PLUS_DI': 'adx', 'MINUS_DI': 'adx', 'VOLATILITY': 'volatility',
+        'VOLUME_SMA': 'volume_sma', 'VOLUME_STD': 'volume_std',
+    }.get(name)
+    if name == 'VWAP':
+        spec = {'vwap': True}
+    elif spec_key == 'macd':
+        spec = {'macd': (tuple(params),)}
+    else:
+        spec = {spec_key: (params[0],)}
+    return compute(df, spec)[column(name, *params)]
+
+
+def clear():
+    """Clear the memoized results."""
+    with _memo_lock:
+        _memo.clear()
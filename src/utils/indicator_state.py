@@ -0,0 +1,444 @@
+"""
+Indicator State - Incremental (streaming) indicators checkpointed per (symbol, interval).
+
+Features:
+- Stateful indicators that update in O(1) per appended bar:
+  ring-buffer rolling sums (SMA, RSI, ATR, ADX, volume averages),
+  windowed Welford variance (Bollinger Bands, volatility, volume std) and EMA state (EMA, MACD)
+- Same column names and definitions as indicator_engine (INDICATOR_SPEC)
+- Checkpoints in memory and on disk under INDICATOR_STATE_DIR (default ./data/indicator_state)
+- Only closed bars advance the checkpoint; the last (possibly still forming) bar
+  is applied to a copy, so intraday re-analysis never corrupts the state
+- The checkpoint is rebuilt when the stored history no longer matches the bars
+  (e.g. after a split adjustment)
+
+EMA-based values are seeded at the first bar the checkpoint ever saw, so they are
+fully warmed up; VWAP is anchored at the start of the requested bars. VWAP prefix
+sums older than that anchor are dropped, so a checkpoint stays O(requested bars).
+"""
+
+import os
+import copy
+import math
+import pickle
+import bisect
+import logging
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from . import replay
+from .indicator_engine import INDICATOR_SPEC, column
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+INDICATOR_STATE_DIR = os.getenv('INDICATOR_STATE_DIR', os.path.join('data', 'indicator_state'))
+HISTORY_ROWS = int(os.getenv('INDICATOR_HISTORY_ROWS', '260'))  # recent output rows kept per state
+STATE_VERSION = 1
+
+_states = {}  # (symbol, interval) -> IndicatorState
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+# ============================================================================
+# PRIMITIVES
+# ============================================================================
+
+class RollingMean:
+    """Windowed mean from a ring buffer and a running sum (NaN while any value is NaN)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.nan_count = 0
+        self.updates = 0
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+        self.values.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self.total += x
+        self.updates += 1
+        if self.updates % self.window == 0:
+            # Re-sum periodically so floating-point drift never accumulates
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+        if len(self.values) < self.window or self.nan_count:
+            return float('nan')
+        return self.total / self.window
+
+
+class RollingVariance:
+    """Windowed Welford mean/variance (sample, ddof=1); NaN while any value is NaN."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.count = 0  # finite values in the window
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.nan_count = 0
+        self.updates = 0
+
+    def _add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float):
+        if self.count == 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (x - self.mean)
+
+    def update(self, x: float):
+        """Add a value. Returns (mean, std) of the window."""
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self._remove(old)
+        self.values.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self._add(x)
+        self.updates += 1
+        if self.updates % (4 * self.window) == 0:
+            finite = [v for v in self.values if not math.isnan(v)]
+            self.count = len(finite)
+            self.mean = math.fsum(finite) / self.count if finite else 0.0
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in finite)
+        if len(self.values) < self.window or self.nan_count or self.window < 2:
+            return float('nan'), float('nan')
+        return self.mean, math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class EMA:
+    """Exponential moving average (pandas ewm(span, adjust=False))."""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = float('nan')
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+# ============================================================================
+# COMPOSITE STATE
+# ============================================================================
+
+def _periods(spec: dict, key: str):
+    value = spec.get(key) or ()
+    return value if isinstance(value, (tuple, list)) else ()
+
+
+class IndicatorState:
+    """All INDICATOR_SPEC indicators for one (symbol, interval), updated bar by bar."""
+
+    def __init__(self, spec: dict = None):
+        self.spec = spec or INDICATOR_SPEC
+        self.version = STATE_VERSION
+        self.last_ts = None
+        self.last_close = float('nan')
+        self.prev_high = float('nan')
+        self.prev_low = float('nan')
+        self.rows = 0
+
+        self.sma = {p: RollingMean(p) for p in _periods(self.spec, 'sma')}
+        self.ema = {s: EMA(s) for s in _periods(self.spec, 'ema')}
+        self.rsi = {p: (RollingMean(p), RollingMean(p)) for p in _periods(self.spec, 'rsi')}
+        self.bbands = {p: RollingVariance(p) for p in _periods(self.spec, 'bbands')}
+        self.macd = {m: (EMA(m[0]), EMA(m[1]), EMA(m[2])) for m in _periods(self.spec, 'macd')}
+        self.atr = {p: RollingMean(p) for p in _periods(self.spec, 'atr')}
+        self.adx = {p: tuple(RollingMean(p) for _ in range(4)) for p in _periods(self.spec, 'adx')}
+        self.volatility = {p: RollingVariance(p) for p in _periods(self.spec, 'volatility')}
+        self.volume_sma = {p: RollingMean(p) for p in _periods(self.spec, 'volume_sma')}
+        self.volume_std = {p: RollingVariance(p) for p in _periods(self.spec, 'volume_std')}
+
+        # Cumulative price*volume and volume per bar, for VWAP from any tracked anchor bar
+        # (trimmed to the bar before the latest anchor, see trim_vwap)
+        self.cum_ts = []
+        self.cum_pv = []
+        self.cum_v = []
+        self.history = deque(maxlen=HISTORY_ROWS)  # (timestamp, {column: value})
+
+    def update(self, ts, high: float, low: float, close: float, volume: float, record: bool = True) -> dict:
+        """Apply one bar. Returns the indicator values after it (kept in history if record)."""
+        out = {}
+        prev_close = self.last_close
+        delta = 0.0 if self.rows == 0 else close - prev_close
+
+        for p, window in self.sma.items():
+            out[column('SMA', p)] = window.update(close)
+        for s, state in self.ema.items():
+            out[column('EMA', s)] = state.update(close)
+        for p, (gains, losses) in self.rsi.items():
+            gain = gains.update(delta if delta > 0 else 0.0)
+            loss = losses.update(-delta if delta < 0 else 0.0)
+            if math.isnan(gain) or math.isnan(loss) or (gain == 0 and loss == 0):
+                out[column('RSI', p)] = float('nan')
+            elif loss == 0:
+                out[column('RSI', p)] = 100.0
+            else:
+                out[column('RSI', p)] = 100.0 - 100.0 / (1.0 + gain / loss)
+        for p, window in self.bbands.items():
+            mean, std = window.update(close)
+            out[column('BB_UPPER', p)] = mean + 2 * std
+            out[column('BB_LOWER', p)] = mean - 2 * std
+        for (fast, slow, signal), (ema_fast, ema_slow, ema_signal) in self.macd.items():
+            macd = ema_fast.update(close) - ema_slow.update(close)
+            signal_value = ema_signal.update(macd)
+            out[column('MACD', fast, slow, signal)] = macd
+            out[column('MACD_SIGNAL', fast, slow, signal)] = signal_value
+            out[column('MACD_HIST', fast, slow, signal)] = macd - signal_value
+
+        if self.rows == 0:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        for p, window in self.atr.items():
+            out[column('ATR', p)] = window.update(tr)
+        for p, (tr_window, plus_window, minus_window, dx_window) in self.adx.items():
+            up_move = high - self.prev_high
+            down_move = self.prev_low - low
+            plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+            minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+            atr_smooth = tr_window.update(tr)
+            plus_mean = plus_window.update(plus_dm)
+            minus_mean = minus_window.update(minus_dm)
+            if math.isnan(atr_smooth) or atr_smooth == 0:
+                plus_di = minus_di = float('nan')
+            else:
+                plus_di = 100.0 * plus_mean / atr_smooth
+                minus_di = 100.0 * minus_mean / atr_smooth
+            di_sum = plus_di + minus_di
+            dx = 100.0 * abs(plus_di - minus_di) / di_sum if di_sum else float('nan')
+            out[column('ADX', p)] = dx_window.update(dx)
+            out[column('PLUS_DI', p)] = plus_di
+            out[column('MINUS_DI', p)] = minus_di
+
+        ret = float('nan') if self.rows == 0 or not prev_close else close / prev_close - 1.0
+        for p, window in self.volatility.items():
+            out[column('VOLATILITY', p)] = window.update(ret)[1] * math.sqrt(252)
+        for p, window in self.volume_sma.items():
+            out[column('VOLUME_SMA', p)] = window.update(volume)
+        for p, window in self.volume_std.items():
+            out[column('VOLUME_STD', p)] = window.update(volume)[1]
+
+        self.last_ts = ts
+        self.last_close = close
+        self.prev_high = high
+        self.prev_low = low
+        self.rows += 1
+        if record:
+            typical = (high + low + close) / 3.0
+            self.cum_ts.append(ts)
+            self.cum_pv.append((self.cum_pv[-1] if self.cum_pv else 0.0) + typical * volume)
+            self.cum_v.append((self.cum_v[-1] if self.cum_v else 0.0) + volume)
+            self.history.append((ts, out))
+        return out
+
+    def preview(self, ts, high: float, low: float, close: float, volume: float) -> dict:
+        """Indicator values if this bar were applied, leaving the state untouched."""
+        detached = (self.cum_ts, self.cum_pv, self.cum_v, self.history)
+        self.cum_ts, self.cum_pv, self.cum_v, self.history = [], [], [], deque()
+        try:
+            view = copy.deepcopy(self)  # only window buffers and scalars are copied
+        finally:
+            self.cum_ts, self.cum_pv, self.cum_v, self.history = detached
+        return view.update(ts, high, low, close, volume, record=False)
+
+    def trim_vwap(self, anchor_ts):
+        """Drop prefix sums before anchor_ts, keeping the preceding bar as the VWAP base."""
+        drop = bisect.bisect_left(self.cum_ts, anchor_ts) - 1
+        if drop > 0:
+            del self.cum_ts[:drop]
+            del self.cum_pv[:drop]
+            del self.cum_v[:drop]
+
+    def vwap_since(self, anchor_ts, through: int = None) -> float:
+        """VWAP from the bar at anchor_ts through the bar at position `through` (default last)."""
+        end = len(self.cum_ts) - 1 if through is None else through
+        start = bisect.bisect_left(self.cum_ts, anchor_ts)
+        if start > end:
+            return float('nan')
+        base_pv = self.cum_pv[start - 1] if start > 0 else 0.0
+        base_v = self.cum_v[start - 1] if start > 0 else 0.0
+        volume = self.cum_v[end] - base_v
+        return (self.cum_pv[end] - base_pv) / volume if volume else float('nan')
+
+    def frame(self, anchor_ts=None, forming: tuple = None) -> pd.DataFrame:
+        """
+        Recent indicator rows (up to HISTORY_ROWS) with VWAP anchored at anchor_ts.
+
+        Args:
+            anchor_ts: First bar of the VWAP window (default: first bar still tracked)
+            forming: Optional (ts, high, low, close, volume) of a not-yet-closed bar to append
+        """
+        rows = list(self.history)
+        vwaps = []
+        if self.spec.get('vwap') and self.cum_ts:
+            anchor_ts = anchor_ts if anchor_ts is not None else self.cum_ts[0]
+            offset = len(self.cum_ts) - len(rows)
+            # Rows older than the tracked prefix sums precede the anchor: no VWAP yet
+            vwaps = [self.vwap_since(anchor_ts, offset + i) if offset + i >= 0 else float('nan')
+                     for i in range(len(rows))]
+        if forming is not None:
+            ts, high, low, close, volume = forming
+            rows.append((ts, self.preview(ts, high, low, close, volume)))
+            if self.spec.get('vwap'):
+                start = bisect.bisect_left(self.cum_ts, anchor_ts) if anchor_ts is not None else 0
+                base_pv = self.cum_pv[start - 1] if start > 0 else 0.0
+                base_v = self.cum_v[start - 1] if start > 0 else 0.0
+                pv = (self.cum_pv[-1] if self.cum_pv else 0.0) - base_pv + (high + low + close) / 3.0 * volume
+                v = (self.cum_v[-1] if self.cum_v else 0.0) - base_v + volume
+                vwaps.append(pv / v if v else float('nan'))
+        if not rows:
+            return pd.DataFrame()
+        index = pd.DatetimeIndex([ts for ts, _ in rows], name='Date')
+        frame = pd.DataFrame([row for _, row in rows], index=index)
+        if vwaps:
+            frame['VWAP'] = vwaps
+        return frame
+
+
+# ============================================================================
+# CHECKPOINTS
+# ============================================================================
+
+def _path(symbol: str, interval: str) -> str:
+    safe_symbol = ''.join(c if c.isalnum() or c in '.-' else '_' for c in symbol.upper())
+    return os.path.join(INDICATOR_STATE_DIR, f"{safe_symbol}_{interval}.pkl")
+
+
+def _get_lock(key) -> threading.Lock:
+    with _locks_lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def _load(symbol: str, interval: str):
+    state = _states.get((symbol, interval))
+    if state is not None or replay.is_active():
+        return state
+    path = _path(symbol, interval)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if getattr(state, 'version', None) != STATE_VERSION or state.spec != INDICATOR_SPEC:
+            return None
+        return state
+    except Exception as e:
+        logger.debug(f"Indicator state: unreadable checkpoint {path}: {e}")
+        return None
+
+
+def _save(symbol: str, interval: str, state: IndicatorState):
+    _states[(symbol, interval)] = state
+    if replay.is_active():
+        return
+    path = _path(symbol, interval)
+    try:
+        os.makedirs(INDICATOR_STATE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Indicator state: could not write {path}: {e}")
+
+
+def _matches(state: IndicatorState, df: pd.DataFrame) -> bool:
+    """Check that the checkpoint's last closed bar is still present and unrevised."""
+    if state is None or state.last_ts is None or state.last_ts not in df.index:
+        return False
+    if df.index[0] < state.cum_ts[0]:
+        return False  # caller wants history from before the checkpoint started
+    close = float(df['Close'].loc[state.last_ts])
+    return math.isclose(close, state.last_close, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def _apply(state: IndicatorState, rows: pd.DataFrame):
+    volume = rows['Volume'] if 'Volume' in rows else pd.Series(np.nan, index=rows.index)
+    for ts, high, low, close, vol in zip(rows.index, rows['High'], rows['Low'], rows['Close'], volume):
+        state.update(ts, float(high), float(low), float(close), float(vol))
+
+
+def get_frame(symbol: str, interval: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get recent indicator rows for a symbol's bars, updating its checkpoint incrementally.
+
+    Args:
+        symbol: Stock ticker
+        interval: Bar interval the bars were fetched with
+        df: OHLCV DataFrame indexed by bar time; its last bar may still be forming
+
+    Returns:
+        DataFrame of up to HISTORY_ROWS rows (the last one includes the forming bar),
+        same columns as indicator_engine.compute()
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    symbol = symbol.upper()
+    closed, forming = df.iloc[:-1], df.iloc[-1:]
+
+    with _get_lock((symbol, interval)):
+        state = _load(symbol, interval)
+        if _matches(state, df):
+            new_rows = closed[closed.index > state.last_ts]
+            if len(new_rows):
+                _apply(state, new_rows)
+                state.trim_vwap(df.index[0])
+                _save(symbol, interval, state)
+        else:
+            # No usable checkpoint: rebuild from the bars we have
+            state = IndicatorState()
+            _apply(state, closed)
+            state.trim_vwap(df.index[0])
+            _save(symbol, interval, state)
+            logger.debug(f"Indicator state: rebuilt {symbol} {interval} from {len(closed)} bars")
+
+        # The forming bar only touches a copy, so the next refresh can replace it
+        bar = forming.iloc[0]
+        volume = float(bar['Volume']) if 'Volume' in forming else float('nan')
+        return state.frame(anchor_ts=df.index[0], forming=(
+            forming.index[0], float(bar['High']), float(bar['Low']), float(bar['Close']), volume))
+
+
+def latest(symbol: str, interval: str, df: pd.DataFrame) -> pd.Series:
+    """Latest indicator values (including the forming bar)."""
+    frame = get_frame(symbol, interval, df)
+    return frame.iloc[-1] if not frame.empty else pd.Series(dtype=float)
+
+
+def clear():
+    """Drop in-memory checkpoints."""
+    _states.clear()
@@ -0,0 +1,149 @@
+"""
+Indicator Summary - Compact, prompt-friendly digests of indicator series.
+
+Features:
+- Per-series digest: latest value, 1-bar change, slope over the last bars,
+  percentile of the latest value within the lookback window
+- Crossover detection between two series (state now, last cross, bars ago)
+- Renders a small markdown table instead of full pandas Series reprs
+- TECHNICAL_OUTPUT_MODE=summary (default) or full (previous Series dump)
+
+Config (config/.env):
+- SUMMARY_LOOKBACK: bars used for percentiles and crossover search (default 60)
+- SUMMARY_SLOPE_BARS: bars used for the least-squares slope (default 10)
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join('config', '.env'))
+
+TECHNICAL_OUTPUT_MODE = os.getenv('TECHNICAL_OUTPUT_MODE', 'summary').strip().lower()
+SUMMARY_LOOKBACK = int(os.getenv('SUMMARY_LOOKBACK', '60'))
+SUMMARY_SLOPE_BARS = int(os.getenv('SUMMARY_SLOPE_BARS', '10'))
+
+
+def is_summary_mode() -> bool:
+    """True unless TECHNICAL_OUTPUT_MODE=full."""
+    return TECHNICAL_OUTPUT_MODE != 'full'
+
+
+def describe(series: pd.Series, lookback: int = None, slope_bars: int = None) -> Optional[Dict]:
+    """
+    Digest one indicator series.
+
+    Returns:
+        Dict with latest, change, change_pct, slope (per bar), percentile (0-100),
+        or None if the series has no values
+    """
+    lookback = lookback or SUMMARY_LOOKBACK
+    slope_bars = slope_bars or SUMMARY_SLOPE_BARS
+    values = series.dropna()
+    if values.empty:
+        return None
+
+    latest = float(values.iloc[-1])
+    previous = float(values.iloc[-2]) if len(values) > 1 else latest
+    change = latest - previous
+    change_pct = change / abs(previous) * 100 if previous else 0.0
+
+    tail = values.iloc[-slope_bars:].to_numpy(dtype=float)
+    slope = float(np.polyfit(np.arange(len(tail)), tail, 1)[0]) if len(tail) > 1 else 0.0
+
+    window = values.iloc[-lookback:].to_numpy(dtype=float)
+    percentile = float((window <= latest).mean() * 100)
+
+    return {
+        'latest': latest,
+        'change': change,
+        'change_pct': change_pct,
+        'slope': slope,
+        'percentile': percentile,
+    }
+
+
+def crossover(fast: pd.Series, slow, lookback: int = None) -> Optional[Dict]:
+    """
+    Find where fast stands against slow (a series or a constant level) and its last cross.
+
+    Returns:
+        Dict with state ('above'/'below'), last_cross (timestamp or None),
+        direction ('up'/'down' or None) and bars_ago, or None if there is no overlap
+    """
+    lookback = lookback or SUMMARY_LOOKBACK
+    if not isinstance(slow, pd.Series):
+        slow = pd.Series(float(slow), index=fast.index)
+    both = pd.concat([fast, slow], axis=1, join='inner').dropna()
+    if both.empty:
+        return None
+
+    diff = np.sign((both.iloc[:, 0] - both.iloc[:, 1]).to_numpy(dtype=float))
+    diff = diff[-(lookback + 1):]
+    index = both.index[-len(diff):]
+    result = {
+        'state': 'above' if diff[-1] > 0 else 'below',
+        'last_cross': None,
+        'direction': None,
+        'bars_ago': None,
+    }
+    # Ignore exact ties by carrying the previous sign forward
+    signs = pd.Series(diff).replace(0, np.nan).ffill().to_numpy()
+    changes = np.nonzero(np.diff(signs) != 0)[0]
+    changes = [i for i in changes if not np.isnan(signs[i]) and not np.isnan(signs[i + 1])]
+    if changes:
+        at = changes[-1] + 1
+        result['last_cross'] = index[at]
+        result['direction'] = 'up' if signs[at] > 0 else 'down'
+        result['bars_ago'] = len(diff) - 1 - at
+    return result
+
+
+def format_timestamp(ts) -> str:
+    """Bar time as 'YYYY-MM-DD', or 'YYYY-MM-DD HH:MM' for intraday bars."""
+    if not hasattr(ts, 'strftime'):
+        return str(ts)
+    text = ts.strftime('%Y-%m-%d %H:%M')
+    return text[:-6] if text.endswith(' 00:00') else text
+
+
+def _fmt(value: float, decimals: int = 2, signed: bool = False) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "n/a"
+    if abs(value) >= 1e6:
+        return f"{value:+,.0f}" if signed else f"{value:,.0f}"
+    return f"{value:+.{decimals}f}" if signed else f"{value:.{decimals}f}"
+
+
+def render_table(rows: List[Tuple[str, Optional[Dict]]], decimals: int = 2) -> str:
+    """Render (label, describe() result) rows as a markdown table."""
+    lookback, slope_bars = SUMMARY_LOOKBACK, SUMMARY_SLOPE_BARS
+    lines = [
+        f"| Indicator | Latest | Chg (1 bar) | Slope/bar ({slope_bars}) | Pctl ({lookback}) |",
+        "|---|---|---|---|---|",
+    ]
+    for label, info in rows:
+        if info is None:
+            lines.append(f"| {label} | n/a | n/a | n/a | n/a |")
+            continue
+        lines.append(
+            f"| {label} | {_fmt(info['latest'], decimals)} "
+            f"| {_fmt(info['change'], decimals, signed=True)} ({info['change_pct']:+.1f}%) "
+            f"| {_fmt(info['slope'], decimals + 1, signed=True)} "
+            f"| {info['percentile']:.0f} |"
+        )
+    return "\n".join(lines)
+
+
+def render_crossover(fast_label: str, slow_label: str, info: Optional[Dict]) -> str:
+    """One line describing a crossover() result."""
+    if info is None:
+        return f"- {fast_label} vs {slow_label}: n/a"
+    line = f"- {fast_label} {info['state']} {slow_label}"
+    if info['last_cross'] is not None:
+        line += f" (crossed {info['direction']} {format_timestamp(info['last_cross'])}, {info['bars_ago']} bars ago)"
+    else:
+        line += f" (no cross in last {SUMMARY_LOOKBACK} bars)"
+    return line
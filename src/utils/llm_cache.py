@@ -0,0 +1,173 @@
+"""
+LLM Cache - Opt-in, content-addressed cache of LLM responses in SQLite.
+
+Features:
+- Key: SHA-256 of (model, base_url, temperature, top_p, messages), so any change
+  to the prompt or sampling settings is a miss
+- Per-step TTLs (re-running a ticker within minutes reuses Bull/Bear/Debate/
+  Trading answers; Fund Holdings can live longer; Lesson Summary is never cached)
+- Persistent across restarts; LRU eviction beyond LLM_CACHE_MAX_ENTRIES
+- Stores the original token usage so cost_tracker can report the savings
+- Off unless LLM_CACHE=1; bypassed while FINAGENT_REPLAY is recording or replaying
+
+Config (config/.env):
+- LLM_CACHE: 1 to enable (default off)
+- LLM_CACHE_PATH: SQLite file (default data/llm_cache.sqlite)
+- LLM_CACHE_MAX_ENTRIES: LRU bound (default 2000)
+- LLM_CACHE_TTL: default TTL in seconds for steps not listed below (default 900)
+- LLM_CACHE_TTL_<STEP>: per-step override, e.g. LLM_CACHE_TTL_TRADING_PLAN=600
+  (0 disables caching for that step)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Optional, Dict
+from dotenv import load_dotenv
+from . import replay
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join('data', 'llm_cache.sqlite'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '2000'))
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', '900'))
+
+# Default TTL (seconds) per step; LLM_CACHE_TTL_<STEP> overrides
+STEP_TTLS = {
+    'Bull Analysis': 900,
+    'Bear Analysis': 900,
+    'Research Debate': 900,
+    'Trading Plan': 900,
+    'Fund Holdings': 6 * 3600,
+    'Lesson Summary': 0,
+}
+
+_conn = None
+_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    """True if LLM_CACHE=1 and no record/replay session is active."""
+    enabled = os.getenv('LLM_CACHE', '').strip().lower() in ('1', 'true', 'yes')
+    return enabled and not replay.is_active()
+
+
+def get_ttl(step_name: str) -> int:
+    """TTL in seconds for a step (0 = do not cache)."""
+    env_name = 'LLM_CACHE_TTL_' + ''.join(c if c.isalnum() else '_' for c in step_name.upper())
+    value = os.getenv(env_name)
+    if value is not None:
+        try:
+            return int(value)
+        except ValueError:
+            print(f"WARNING: Invalid {env_name}={value}, using default")
+    return STEP_TTLS.get(step_name, LLM_CACHE_TTL)
+
+
+def make_key(llm, messages) -> str:
+    """Content hash of everything that determines the response."""
+    payload = {
+        'model': getattr(llm, 'model_name', None) or getattr(llm, 'model', None),
+        'base_url': str(getattr(llm, 'openai_api_base', None) or getattr(llm, 'base_url', None) or ''),
+        'temperature': getattr(llm, 'temperature', None),
+        'top_p': getattr(llm, 'top_p', None),
+        'messages': [[getattr(m, 'type', ''), getattr(m, 'content', str(m))] for m in messages],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        directory = os.path.dirname(LLM_CACHE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _conn = sqlite3.connect(LLM_CACHE_PATH, check_same_thread=False, timeout=10)
+        _conn.execute('PRAGMA journal_mode=WAL')
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                step TEXT,
+                model TEXT,
+                content TEXT,
+                input_tokens INTEGER,
+                output_tokens INTEGER,
+                created_at REAL,
+                expires_at REAL,
+                last_access REAL
+            )
+        """)
+        _conn.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)')
+        _conn.commit()
+    return _conn
+
+
+def get(key: str) -> Optional[Dict]:
+    """Cached entry (content, model, input_tokens, output_tokens) or None."""
+    now = time.time()
+    try:
+        with _lock:
+            conn = _connect()
+            row = conn.execute(
+                'SELECT content, model, input_tokens, output_tokens, expires_at FROM responses WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[4] <= now:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                conn.commit()
+                return None
+            conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"LLM cache: read failed: {e}")
+        return None
+    return {'content': row[0], 'model': row[1], 'input_tokens': row[2], 'output_tokens': row[3]}
+
+
+def set(key: str, step_name: str, model: str, content: str,
+        input_tokens: int, output_tokens: int, ttl: int):
+    """Store a response and evict least-recently-used entries beyond the bound."""
+    now = time.time()
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, step_name, model, content, input_tokens, output_tokens, now, now + ttl, now)
+            )
+            conn.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+            conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (LLM_CACHE_MAX_ENTRIES,))
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"LLM cache: write failed: {e}")
+
+
+def clear():
+    """Delete every cached response."""
+    with _lock:
+        conn = _connect()
+        conn.execute('DELETE FROM responses')
+        conn.commit()
+
+
+def close():
+    """Close the SQLite connection (reopened on next use)."""
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
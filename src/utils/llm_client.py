@@ -9,15 +9,45 @@ Features:
 - Temperature parameter optional (some models don't support it)
 - Provider support for API key selection
 - Retry mechanism for connection errors
+- Record/replay of responses under FINAGENT_REPLAY (see replay.py)
+- Opt-in response cache with per-step TTLs (LLM_CACHE=1, see llm_cache.py)
+- Streaming inside analysis jobs: partial text is pushed to the job's "streams"
+  (served by /analyze-status) and a stream that stops producing tokens is cut early
+- Async path (ainvoke_llm_with_retry) on one shared event loop (run_async)
+- One pooled httpx client pair (sync + async) per provider base URL, shared by
+  every step's ChatOpenAI instance
+- Per-provider concurrency / tokens-per-minute limits with fair queueing across
+  jobs (see llm_scheduler.py)
+- Opt-in hedged requests for streamed calls: if the primary has produced no token
+  after LLM_HEDGE_AFTER seconds, the same request is raced on LLM_BACKUP_MODEL;
+  the first stream to produce a token wins and the other is cancelled (its
+  estimated usage is still billed)
+
+Config (config/.env):
+- LLM_STREAMING: 0 to always use blocking invoke (default 1)
+- LLM_STREAM_STALL_TIMEOUT: seconds without a token before a stream is abandoned (default 60)
+- LLM_ASYNC: 1 to run the pipeline's LLM phases on the shared event loop (default 0)
+- LLM_POOL_MAX_CONNECTIONS: connections per provider base URL (default 20)
+- LLM_POOL_MAX_KEEPALIVE: idle keep-alive connections per base URL (default 10)
+- LLM_HEDGE_AFTER: first-token deadline in seconds before hedging to the backup
+  (default 0 = off; only streamed calls, i.e. inside a job with LLM_STREAMING on, are hedged)
 """
 
 import os
 import time
+import asyncio
 import logging
+import threading
+import contextlib
+import contextvars
+import concurrent.futures
+import httpx
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from .api_key_selector import get_api_key_for_url
 from .cost_tracker import cost_tracker
+from . import replay, llm_cache, llm_scheduler
+from .. import job_store
 
 load_dotenv(os.path.join('config', '.env'))
 
@@ -28,11 +58,76 @@ DEFAULT_MODEL_NAME = 'x-ai/grok-beta'
 
 # Global cache for LLM clients
 _llm_cache = {}
+_backup_cache = {}  # (model, url, temperature, top_p) -> backup ChatOpenAI for hedging
+_backup_lock = threading.Lock()
 
 # Retry configuration
 MAX_RETRIES = 2
 RETRY_DELAY = 2  # seconds
 
+# Streaming configuration
+LLM_STREAMING = os.getenv('LLM_STREAMING', '1').strip().lower() not in ('0', 'false', 'no')
+LLM_STREAM_STALL_TIMEOUT = float(os.getenv('LLM_STREAM_STALL_TIMEOUT', '60'))
+
+# Async path and connection pooling
+LLM_ASYNC = os.getenv('LLM_ASYNC', '0').strip().lower() in ('1', 'true', 'yes')
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv('LLM_POOL_MAX_CONNECTIONS', '20'))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv('LLM_POOL_MAX_KEEPALIVE', '10'))
+LLM_REQUEST_TIMEOUT = 120.0
+
+_http_clients = {}  # base_url -> (httpx.Client, httpx.AsyncClient)
+_http_lock = threading.Lock()
+_loop = None
+_loop_lock = threading.Lock()
+
+# Hedged requests: seconds without a first token before the backup provider is raced (0 = off)
+LLM_HEDGE_AFTER = float(os.getenv('LLM_HEDGE_AFTER', '0'))
+
+
+class StreamStalledError(TimeoutError):
+    """A streaming response produced no token within the stall timeout."""
+
+
+def get_http_clients(base_url: str) -> tuple:
+    """
+    Pooled (httpx.Client, httpx.AsyncClient) for a provider base URL.
+
+    Every ChatOpenAI instance pointing at the same provider shares these, so
+    concurrent steps reuse keep-alive connections instead of opening their own.
+    """
+    key = base_url or ''
+    with _http_lock:
+        clients = _http_clients.get(key)
+        if clients is None:
+            limits = httpx.Limits(max_connections=LLM_POOL_MAX_CONNECTIONS,
+                                  max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE)
+            clients = (
+                httpx.Client(limits=limits, timeout=LLM_REQUEST_TIMEOUT),
+                httpx.AsyncClient(limits=limits, timeout=LLM_REQUEST_TIMEOUT),
+            )
+            _http_clients[key] = clients
+    return clients
+
+
+def _client_kwargs(model_name, api_key, url, temp, tp_p=None) -> dict:
+    """Build kwargs for ChatOpenAI."""
+    http_client, http_async_client = get_http_clients(url)
+    kwargs = {
+        "model": model_name,
+        "api_key": api_key,
+        "base_url": url,
+        "timeout": LLM_REQUEST_TIMEOUT,
+        "max_retries": 2,
+        "http_client": http_client,
+        "http_async_client": http_async_client,
+    }
+    # Only add temperature if explicitly provided
+    if temp is not None:
+        kwargs["temperature"] = temp
+    if tp_p is not None:
+        kwargs["top_p"] = tp_p
+    return kwargs
+
 
 def get_llm_client(model_env_var: str, url_env_var: str, step_name: str, temperature: float = None, top_p: float = None, provider_env_var: str = None) -> ChatOpenAI:
     """
@@ -63,28 +158,14 @@ def get_llm_client(model_env_var: str, url_env_var: str, step_name: str, tempera
     backup_url = os.getenv('LLM_BACKUP_URL')
     backup_key = os.getenv("FINAGENT_ZENMUX_API_KEY") or os.getenv("ZENMUX_API_KEY")  # Backup always uses ZenMux
 
-    # Build kwargs for ChatOpenAI
-    def _build_kwargs(model_name, api_key, url, temp, tp_p=None):
-        kwargs = {
-            "model": model_name,
-            "api_key": api_key,
-            "base_url": url,
-            "timeout": 120.0,
-            "max_retries": 2,
-        }
-        # Only add temperature if explicitly provided
-        if temp is not None:
-            kwargs["temperature"] = temp
-        if tp_p is not None:
-            kwargs["top_p"] = tp_p
-        return kwargs
-
     # Try primary LLM
     try:
         primary_key = get_api_key_for_url(base_url)
+        if not primary_key and replay.is_replaying():
+            primary_key = 'replay'  # responses come from cassettes; the key is never sent
         provider_info = f" (provider: {provider})" if provider else ""
         print(f"DEBUG: {step_name} - Creating LLM client: {model} @ {base_url}{provider_info}")
-        llm = ChatOpenAI(**_build_kwargs(model, primary_key, base_url, temperature, top_p))
+        llm = ChatOpenAI(**_client_kwargs(model, primary_key, base_url, temperature, top_p))
         # Cache and return (no test call - fails naturally on first use)
         _llm_cache[cache_key] = llm
         print(f"DEBUG: {step_name} - Primary LLM client created")
@@ -95,7 +176,7 @@ def get_llm_client(model_env_var: str, url_env_var: str, step_name: str, tempera
         # Try backup LLM
         try:
             print(f"DEBUG: {step_name} - Trying backup LLM: {backup_model} @ {backup_url}")
-            llm = ChatOpenAI(**_build_kwargs(backup_model, backup_key, backup_url, temperature, top_p))
+            llm = ChatOpenAI(**_client_kwargs(backup_model, backup_key, backup_url, temperature, top_p))
             # Cache and return (no test call)
             _llm_cache[cache_key] = llm
             print(f"DEBUG: {step_name} - Backup LLM client created")
@@ -105,10 +186,254 @@ def get_llm_client(model_env_var: str, url_env_var: str, step_name: str, tempera
             raise Exception(f"Both LLM providers failed for {step_name}. Primary: {e}, Backup: {e2}")
 
 
+def get_backup_llm(llm):
+    """
+    Backup-provider client with the same sampling settings as llm, for hedged requests.
+
+    Returns None when no backup is configured or llm already is the backup.
+    """
+    backup_model = os.getenv('LLM_BACKUP_MODEL', DEFAULT_MODEL_NAME)
+    backup_url = os.getenv('LLM_BACKUP_URL')
+    if not backup_url:
+        return None
+    if getattr(llm, 'model_name', None) == backup_model and str(getattr(llm, 'openai_api_base', '')) == backup_url:
+        return None
+    temperature, top_p = getattr(llm, 'temperature', None), getattr(llm, 'top_p', None)
+    key = (backup_model, backup_url, temperature, top_p)
+    with _backup_lock:
+        backup = _backup_cache.get(key)
+        if backup is None:
+            backup_key = os.getenv("FINAGENT_ZENMUX_API_KEY") or os.getenv("ZENMUX_API_KEY")  # Backup always uses ZenMux
+            try:
+                backup = ChatOpenAI(**_client_kwargs(backup_model, backup_key, backup_url, temperature, top_p))
+            except Exception as e:
+                logger.warning(f"Backup LLM client for hedging unavailable: {e}")
+                return None
+            _backup_cache[key] = backup
+    return backup
+
+
+def _track_usage(llm, response, step_name: str) -> tuple:
+    """
+    Track token usage from a response for cost calculation.
+
+    Returns:
+        (input_tokens, output_tokens), zeros if the provider reported no usage
+    """
+    input_tokens, output_tokens = 0, 0
+    try:
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            input_tokens = usage.get('input_tokens', 0)
+            output_tokens = usage.get('output_tokens', 0)
+        else:
+            # Fallback: check response_metadata for usage info
+            meta = getattr(response, 'response_metadata', {})
+            if 'token_usage' not in meta:
+                return 0, 0
+            tu = meta['token_usage']
+            input_tokens = tu.get('prompt_tokens', 0)
+            output_tokens = tu.get('completion_tokens', 0)
+        model = getattr(llm, 'model', 'unknown')
+        cost_tracker.track(model=model, input_tokens=input_tokens, output_tokens=output_tokens)
+    except Exception as tracking_error:
+        # Don't fail the request if tracking fails
+        logger.debug(f"Cost tracking failed for {step_name}: {tracking_error}")
+    return input_tokens, output_tokens
+
+
+def _track_cancelled(client, messages, partial, step_name: str) -> int:
+    """
+    Bill a stream that was cancelled mid-request (a hedge loser or a stall).
+
+    The provider still charges for the prompt and whatever it generated before
+    the cancel, but a cancelled stream never reports usage, so it is estimated
+    at 4 characters per token.
+
+    Returns:
+        Tokens billed
+    """
+    usage = getattr(partial, 'usage_metadata', None)
+    if usage:
+        _track_usage(client, partial, step_name)
+        return usage.get('total_tokens') or (usage.get('input_tokens', 0) + usage.get('output_tokens', 0))
+    input_tokens = sum(len(str(getattr(m, 'content', m))) for m in messages) // 4
+    output_tokens = len(getattr(partial, 'content', '') or '') // 4
+    cost_tracker.track(model=getattr(client, 'model', 'unknown'), input_tokens=input_tokens, output_tokens=output_tokens)
+    return input_tokens + output_tokens
+
+
+class _Race:
+    """
+    First-token race between a primary stream and an optional hedged backup stream.
+
+    Producers feed (tag, kind, item) events; the race decides when to start the
+    hedge, which stream wins (first content token, or first to finish) and when
+    the whole call has stalled.
+    """
+
+    def __init__(self, step_name: str, llm, backup=None, hedge_after: float = None, stall_timeout: float = None):
+        now = time.time()
+        self.step_name = step_name
+        self.clients = {'primary': llm}
+        self.backup = backup
+        self.stall_timeout = stall_timeout or LLM_STREAM_STALL_TIMEOUT
+        self.hedge_at = now + hedge_after if backup is not None and hedge_after else None
+        self.hedge_after = hedge_after
+        self.last_event = now
+        self.responses = {}  # tag -> aggregated chunks
+        self.failed = {}  # tag -> exception
+        self.winner = None
+
+    def timeout(self) -> float:
+        """Seconds until the next deadline (hedge or stall)."""
+        deadline = self.last_event + self.stall_timeout
+        if self.hedge_at is not None:
+            deadline = min(deadline, self.hedge_at)
+        return max(deadline - time.time(), 0.0)
+
+    def on_timeout(self) -> bool:
+        """True if the hedge should start now; raises StreamStalledError if the call stalled."""
+        if self.hedge_at is not None and time.time() >= self.hedge_at:
+            self.hedge_at = None
+            self.last_event = time.time()  # the backup gets a full stall window
+            self.clients['backup'] = self.backup
+            logger.warning(f" [{self.step_name}] No first token after {self.hedge_after:g}s, "
+                           f"hedging to backup {getattr(self.backup, 'model_name', 'LLM')}")
+            return True
+        raise StreamStalledError(f"Stream timeout: no tokens for {self.stall_timeout:.0f}s")
+
+    def _win(self, tag: str):
+        self.winner = tag
+        self.hedge_at = None
+        if tag == 'backup':
+            logger.info(f" [{self.step_name}] Backup LLM answered first, cancelling primary")
+        elif 'backup' in self.clients:
+            logger.info(f" [{self.step_name}] Primary LLM answered first, cancelling backup")
+        text = getattr(self.responses.get(tag), 'content', '')
+        if text:
+            job_store.append_stream(self.step_name, text)
+
+    def losers(self) -> list:
+        return [tag for tag in self.clients if self.winner is not None and tag != self.winner]
+
+    def on_event(self, tag: str, kind: str, item) -> bool:
+        """Apply a producer event; True once the winning stream has completed."""
+        if self.winner is not None and tag != self.winner:
+            return False
+        self.last_event = time.time()
+        if kind == 'error':
+            self.failed[tag] = item
+            if self.winner is None and len(self.failed) < len(self.clients):
+                logger.warning(f" [{self.step_name}] {tag} stream failed, waiting for the other: {item}")
+                return False
+            raise item
+        if kind == 'done':
+            if self.winner is None:
+                self._win(tag)
+            if tag not in self.responses:
+                raise StreamStalledError("Stream timeout: provider closed the stream without output")
+            return True
+        previous = self.responses.get(tag)
+        self.responses[tag] = item if previous is None else previous + item
+        if self.winner is None:
+            if item.content:
+                self._win(tag)
+        elif item.content:
+            job_store.append_stream(self.step_name, item.content)
+        return False
+
+    def result(self) -> tuple:
+        return self.responses[self.winner], self.clients[self.winner]
+
+
+def _stream_llm(llm, messages, step_name: str, stall_timeout: float = None,
+                backup=None, hedge_after: float = None) -> tuple:
+    """
+    Stream a completion, publishing partial text to the current job as it arrives.
+
+    Runs _astream_llm() on the shared event loop: a stream that stalls or loses
+    the hedge is cancelled there, which closes its HTTP request at once. (Closing
+    a blocking iterator from another thread does not wake a read in progress, so
+    the connection would stay open until the client's full request timeout.)
+
+    Returns:
+        (aggregated message chunk like llm.invoke(), client that produced it)
+    """
+    return run_async(_astream_llm(llm, messages, step_name, stall_timeout, backup, hedge_after))
+
+
+def _publish(step_name: str, content: str):
+    """Push a complete (replayed or cached) response to the job stream in one piece."""
+    job_store.start_stream(step_name)
+    job_store.append_stream(step_name, content)
+    job_store.finish_stream(step_name)
+
+
+def _lookup(llm, messages, step_name: str) -> tuple:
+    """
+    Replay cassette / response cache lookup shared by the sync and async paths.
+
+    Returns:
+        (content or None, cache key to store the live response under or None)
+    """
+    if replay.is_replaying():
+        recorded = replay.load_llm(llm, messages)
+        cost_tracker.track(
+            model=getattr(llm, 'model', 'unknown'),
+            input_tokens=recorded.get('input_tokens', 0),
+            output_tokens=recorded.get('output_tokens', 0),
+        )
+        _publish(step_name, recorded['content'])
+        return recorded['content'], None
+
+    cache_key = None
+    if llm_cache.is_enabled() and llm_cache.get_ttl(step_name) > 0:
+        cache_key = llm_cache.make_key(llm, messages)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f" [{step_name}] LLM cache hit")
+            cost_tracker.track_cache_hit(
+                model=cached['model'] or getattr(llm, 'model', 'unknown'),
+                input_tokens=cached['input_tokens'],
+                output_tokens=cached['output_tokens'],
+            )
+            _publish(step_name, cached['content'])
+            return cached['content'], None
+    return None, cache_key
+
+
+def _complete(llm, messages, step_name: str, response, cache_key, responder=None) -> str:
+    """
+    Track usage, record the cassette and fill the cache for a live response.
+
+    responder is the client that actually answered (the backup after a won hedge);
+    usage is billed to it, while cassettes and cache stay keyed by the requested llm.
+    """
+    input_tokens, output_tokens = _track_usage(responder or llm, response, step_name)
+    if replay.is_recording():
+        replay.save_llm(llm, messages, response.content, input_tokens, output_tokens)
+    if cache_key is not None and response.content:
+        llm_cache.set(cache_key, step_name, getattr(llm, 'model', 'unknown'), response.content,
+                      input_tokens, output_tokens, llm_cache.get_ttl(step_name))
+    return response.content
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, llm_scheduler.QueueTimeoutError):
+        return False  # the step's budget is spent; retrying would only queue again
+    error_msg = str(error).lower()
+    return any(err in error_msg for err in ['broken pipe', 'connection reset', 'connection aborted', 'timeout'])
+
+
 def invoke_llm_with_retry(llm, messages, step_name: str, max_retries: int = MAX_RETRIES) -> str:
     """
     Invoke LLM with retry logic for connection errors.
     Tracks token usage for cost calculation.
+    With LLM_CACHE=1, identical requests within the step's TTL are served from cache.
+    Inside an analysis job (see job_store.set_stream_target) the response is streamed.
+    A streamed call whose primary produces no token within LLM_HEDGE_AFTER is raced against the backup LLM.
+    Under FINAGENT_REPLAY the response is recorded to / replayed from a cassette.
 
     Args:
         llm: ChatOpenAI instance
@@ -119,51 +444,216 @@ def invoke_llm_with_retry(llm, messages, step_name: str, max_retries: int = MAX_
     Returns:
         Response content string
     """
+    content, cache_key = _lookup(llm, messages, step_name)
+    if content is not None:
+        return content
+
+    streaming = LLM_STREAMING and job_store.has_stream_target() and hasattr(llm, 'astream')
+    # Hedging needs a first-token signal, so only streamed calls are hedged
+    backup = get_backup_llm(llm) if streaming and LLM_HEDGE_AFTER > 0 else None
     for attempt in range(max_retries + 1):
         try:
-            response = llm.invoke(messages)
-
-            # Track token usage from response metadata
-            try:
-                usage = getattr(response, 'usage_metadata', None)
-                if usage:
-                    model = getattr(llm, 'model', 'unknown')
-                    cost_tracker.track(
-                        model=model,
-                        input_tokens=usage.get('input_tokens', 0),
-                        output_tokens=usage.get('output_tokens', 0),
-                    )
-                else:
-                    # Fallback: check response_metadata for usage info
-                    meta = getattr(response, 'response_metadata', {})
-                    if 'token_usage' in meta:
-                        tu = meta['token_usage']
-                        model = getattr(llm, 'model', 'unknown')
-                        cost_tracker.track(
-                            model=model,
-                            input_tokens=tu.get('prompt_tokens', 0),
-                            output_tokens=tu.get('completion_tokens', 0),
-                        )
-            except Exception as tracking_error:
-                # Don't fail the request if tracking fails
-                logger.debug(f"Cost tracking failed for {step_name}: {tracking_error}")
-
-            return response.content
+            responder = llm
+            if streaming:
+                # The streams hold their own provider slots (see _astream_llm)
+                job_store.start_stream(step_name)
+                response, responder = _stream_llm(llm, messages, step_name,
+                                                  backup=backup, hedge_after=LLM_HEDGE_AFTER)
+                job_store.finish_stream(step_name)
+            else:
+                # Wait for a provider slot (concurrency / TPM); queue time is reported separately
+                with llm_scheduler.slot(llm, messages, step_name) as slot:
+                    response = llm.invoke(messages)
+                    slot.record(response)
+            return _complete(llm, messages, step_name, response, cache_key, responder)
         except Exception as e:
-            error_msg = str(e).lower()
+            if streaming:
+                job_store.finish_stream(step_name, "failed")
             # Check if it's a retryable error (connection issues)
-            if any(err in error_msg for err in ['broken pipe', 'connection reset', 'connection aborted', 'timeout']):
-                if attempt < max_retries:
-                    logger.warning(f" [{step_name}] Connection error (attempt {attempt + 1}/{max_retries + 1}): {e}")
-                    time.sleep(RETRY_DELAY * (attempt + 1))  # Exponential backoff
-                    continue
+            if _is_retryable(e) and attempt < max_retries:
+                logger.warning(f" [{step_name}] Connection error (attempt {attempt + 1}/{max_retries + 1}): {e}")
+                time.sleep(RETRY_DELAY * (attempt + 1))  # Exponential backoff
+                continue
             # Non-retryable error or max retries exceeded
             raise
 
 
+async def _astream_llm(llm, messages, step_name: str, stall_timeout: float = None,
+                       backup=None, hedge_after: float = None) -> tuple:
+    """
+    Stream a completion on the event loop, publishing partial text to the current job.
+
+    Each provider stream is a producer task so one that goes quiet can be cancelled
+    after stall_timeout seconds instead of waiting for the client's full request
+    timeout. With a backup client and hedge_after, the backup is raced once the
+    primary has produced no token for hedge_after seconds; the losing task is
+    cancelled.
+
+    Returns:
+        (aggregated message chunk like llm.invoke(), client that produced it)
+    """
+    # The primary's slot is taken before the race clock starts
+    primary_slot = contextlib.AsyncExitStack()
+    primary = await primary_slot.enter_async_context(llm_scheduler.aslot(llm, messages, step_name))
+    race = _Race(step_name, llm, backup, hedge_after, stall_timeout)
+    events = asyncio.Queue()
+    tasks = {}
+    # Each stream holds a slot on its own provider and gives it back the moment it
+    # ends, so a cancelled primary stops blocking its provider while the backup
+    # finishes. A backup on the primary's provider replaces the primary's request
+    # rather than adding one: both run under the primary's slot, held for the race.
+    shared = backup is not None and llm_scheduler.provider_of(backup) == llm_scheduler.provider_of(llm)
+
+    async def _produce(tag, client, slot, holder):
+        # holder releases the stream's slot when it exits (slot None: wait for one first)
+        partial = None
+        try:
+            async with holder:
+                if slot is None:
+                    slot = await holder.enter_async_context(llm_scheduler.aslot(client, messages, step_name))
+                try:
+                    async for chunk in client.astream(messages, stream_usage=True):
+                        partial = chunk if partial is None else partial + chunk
+                        events.put_nowait((tag, 'chunk', chunk))
+                except asyncio.CancelledError:
+                    # Charged to the provider's token window before the slot is released
+                    slot.charge(_track_cancelled(client, messages, partial, step_name))
+                    raise
+                slot.record(partial)
+            events.put_nowait((tag, 'done', None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            events.put_nowait((tag, 'error', e))
+
+    def _start(tag):
+        if tag == 'primary':
+            slot, holder = primary, contextlib.AsyncExitStack() if shared else primary_slot
+        else:
+            slot, holder = primary if shared else None, contextlib.AsyncExitStack()
+        tasks[tag] = asyncio.ensure_future(_produce(tag, race.clients[tag], slot, holder))
+
+    try:
+        _start('primary')
+        while True:
+            try:
+                tag, kind, item = await asyncio.wait_for(events.get(), race.timeout())
+            except asyncio.TimeoutError:
+                if race.on_timeout():
+                    _start('backup')
+                continue
+            if race.on_event(tag, kind, item):
+                return race.result()
+            for loser in race.losers():
+                tasks[loser].cancel()
+    finally:
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        # Let cancelled streams bill themselves and free their slots before returning
+        await asyncio.gather(*pending, return_exceptions=True)
+        await primary_slot.aclose()  # no-op unless the race itself still holds it
+
+
+async def ainvoke_llm_with_retry(llm, messages, step_name: str, max_retries: int = MAX_RETRIES) -> str:
+    """
+    Async invoke_llm_with_retry(): same cache, replay, streaming and retry rules,
+    awaiting llm.ainvoke / llm.astream instead of holding a thread.
+
+    Run it on the shared loop (run_async) so the pooled async HTTP clients are
+    always used from the loop they were first bound to.
+    """
+    content, cache_key = _lookup(llm, messages, step_name)
+    if content is not None:
+        return content
+
+    streaming = LLM_STREAMING and job_store.has_stream_target() and hasattr(llm, 'astream')
+    backup = get_backup_llm(llm) if streaming and LLM_HEDGE_AFTER > 0 else None
+    for attempt in range(max_retries + 1):
+        try:
+            responder = llm
+            if streaming:
+                job_store.start_stream(step_name)
+                response, responder = await _astream_llm(llm, messages, step_name,
+                                                         backup=backup, hedge_after=LLM_HEDGE_AFTER)
+                job_store.finish_stream(step_name)
+            else:
+                async with llm_scheduler.aslot(llm, messages, step_name) as slot:
+                    response = await llm.ainvoke(messages)
+                    slot.record(response)
+            return _complete(llm, messages, step_name, response, cache_key, responder)
+        except Exception as e:
+            if streaming:
+                job_store.finish_stream(step_name, "failed")
+            if _is_retryable(e) and attempt < max_retries:
+                logger.warning(f" [{step_name}] Connection error (attempt {attempt + 1}/{max_retries + 1}): {e}")
+                await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+                continue
+            raise
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """The shared event loop for async LLM calls (started on first use in a daemon thread)."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True, name="llm-event-loop").start()
+            _loop = loop
+    return _loop
+
+
+def run_async(coro, timeout: float = None):
+    """
+    Run a coroutine on the shared event loop and block for its result.
+
+    The caller's context variables (e.g. the job stream target) are copied into
+    the task, so streamed output still reaches the right job. If timeout expires
+    the task is cancelled (closing its HTTP requests) and TimeoutError is raised.
+    Must not be called from the loop's own thread; await the coroutine there.
+    """
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_async() called on the shared event loop; await the coroutine instead")
+    context = contextvars.copy_context()
+    done = concurrent.futures.Future()
+    tasks = []
+
+    def _start():
+        task = loop.create_task(coro, context=context)
+        tasks.append(task)
+
+        def _finish(t):
+            if t.cancelled():
+                done.cancel()
+            elif t.exception() is not None:
+                done.set_exception(t.exception())
+            else:
+                done.set_result(t.result())
+        task.add_done_callback(_finish)
+
+    def _cancel():
+        for task in tasks:
+            task.cancel()
+
+    loop.call_soon_threadsafe(_start)
+    try:
+        return done.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        # _start was scheduled first, so the task exists by the time _cancel runs
+        loop.call_soon_threadsafe(_cancel)
+        raise
+
+
 def clear_llm_cache():
     """Clear the LLM client cache."""
     global _llm_cache
     _llm_cache.clear()
+    _backup_cache.clear()
     cost_tracker.reset()
     print("DEBUG: LLM cache and cost tracker cleared")
@@ -0,0 +1,345 @@
+"""
+LLM Scheduler - Per-provider concurrency and tokens-per-minute limits for LLM calls.
+
+Features:
+- One scheduler per provider (URL prefix from api_key_selector), so Bull/Bear/
+  Debate/Trading on ZenMux share ZenMux capacity while Agnes steps do not wait on it
+- Max in-flight requests and a rolling 60s token budget per provider
+- Fair queueing: waiting calls are granted round-robin across jobs, FIFO within
+  a job, so one 5-ticker batch cannot starve another job's calls
+- Works for blocking (slot) and async (aslot) callers; async waiters do not hold a thread
+- Queueing counts against the pipeline step's budget: a blocking call still queued at
+  its step deadline (set_deadline) is dequeued and never sent; async waiters are
+  dequeued when the step's timeout cancels them
+- Queue wait and model latency are measured separately and reported to cost_tracker
+
+Token budgets are enforced on an estimate (prompt chars / 4 + LLM_TPM_OUTPUT_RESERVE)
+at grant time and corrected with the provider's reported usage when the call ends.
+
+Config (config/.env):
+- LLM_MAX_CONCURRENCY: in-flight calls per provider (default 0 = unlimited)
+- LLM_TPM: tokens per minute per provider (default 0 = unlimited)
+- LLM_MAX_CONCURRENCY_<PROVIDER> / LLM_TPM_<PROVIDER>: overrides, e.g. LLM_TPM_ZENMUX=200000
+- LLM_TPM_OUTPUT_RESERVE: output tokens assumed per call before usage is known (default 1500)
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict
+from dotenv import load_dotenv
+from .api_key_selector import get_provider_for_url
+from .cost_tracker import cost_tracker
+from .. import job_store
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '0'))
+LLM_TPM = int(os.getenv('LLM_TPM', '0'))
+LLM_TPM_OUTPUT_RESERVE = int(os.getenv('LLM_TPM_OUTPUT_RESERVE', '1500'))
+TPM_WINDOW = 60.0  # seconds
+WAIT_LOG_THRESHOLD = 1.0  # seconds of queueing worth a log line
+
+_schedulers = {}  # provider -> ProviderScheduler
+_schedulers_lock = threading.Lock()
+
+# time.time() deadline of the pipeline step this context runs in; copied into worker threads
+_deadline = contextvars.ContextVar('finagent_step_deadline', default=None)
+
+
+class QueueTimeoutError(TimeoutError):
+    """A call was still waiting for a provider slot when its step's deadline passed."""
+
+
+def set_deadline(deadline: float) -> contextvars.Token:
+    """Stop waiting for slots in this context at deadline (time.time()); reset with the token."""
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token: contextvars.Token):
+    _deadline.reset(token)
+
+
+def _remaining() -> float:
+    """Seconds left before the current step's deadline (None without one)."""
+    deadline = _deadline.get()
+    return None if deadline is None else max(deadline - time.time(), 0.0)
+
+
+def _provider_limit(name: str, provider: str, default: int) -> int:
+    env_name = f"{name}_{''.join(c if c.isalnum() else '_' for c in provider.upper())}"
+    value = os.getenv(env_name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"WARNING: Invalid {env_name}={value}, using default")
+        return default
+
+
+def estimate_tokens(messages) -> int:
+    """Rough token estimate for a request (4 chars per token plus the output reserve)."""
+    chars = sum(len(str(getattr(m, 'content', m))) for m in messages)
+    return chars // 4 + LLM_TPM_OUTPUT_RESERVE
+
+
+class Slot:
+    """A granted (or pending) request: timing and token accounting for one call."""
+
+    def __init__(self, provider: str, job: str, step_name: str, tokens: int):
+        self.provider = provider
+        self.job = job
+        self.step_name = step_name
+        self.tokens = tokens
+        self.queued_at = time.time()
+        self.granted_at = None
+        self.used_tokens = None
+        self._wake = None  # callable run (under the scheduler lock) when granted
+
+    @property
+    def queue_wait(self) -> float:
+        return (self.granted_at or time.time()) - self.queued_at
+
+    def record(self, response):
+        """Count the provider-reported usage of the response against the token budget."""
+        usage = getattr(response, 'usage_metadata', None) or {}
+        total = usage.get('total_tokens') or (usage.get('input_tokens', 0) + usage.get('output_tokens', 0))
+        if total:
+            self.charge(total)
+
+    def charge(self, tokens: int):
+        """Count tokens used under this slot (replacing the up-front estimate)."""
+        self.used_tokens = (self.used_tokens or 0) + tokens
+
+
+class ProviderScheduler:
+    """Concurrency + rolling token budget for one provider, with round-robin queues per job."""
+
+    def __init__(self, provider: str, max_concurrency: int, tpm: int):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.tpm = tpm
+        self.in_flight = 0
+        self._queues = OrderedDict()  # job -> deque[Slot], rotated for round-robin
+        self._window = deque()  # (granted_at, slot) charged against the token budget
+        self._lock = threading.Lock()
+        self._timer = None
+
+    # -- budget -----------------------------------------------------------------
+
+    def _window_tokens(self, now: float) -> int:
+        while self._window and self._window[0][0] <= now - TPM_WINDOW:
+            self._window.popleft()
+        return sum(s.used_tokens or s.tokens for _, s in self._window)
+
+    def _fits(self, slot: Slot, now: float) -> bool:
+        if self.max_concurrency > 0 and self.in_flight >= self.max_concurrency:
+            return False
+        if self.tpm > 0:
+            used = self._window_tokens(now)  # prunes expired entries first
+            # An oversized request still runs once the window is empty
+            return not self._window or used + slot.tokens <= self.tpm
+        return True
+
+    # -- queueing ---------------------------------------------------------------
+
+    def _dispatch(self):
+        """Grant queued slots round-robin across jobs while capacity allows (lock held)."""
+        now = time.time()
+        while self._queues:
+            job, queue = next(iter(self._queues.items()))
+            slot = queue[0]
+            if not self._fits(slot, now):
+                if self.tpm > 0 and self._window and (self.max_concurrency <= 0 or self.in_flight < self.max_concurrency):
+                    self._schedule_retry(self._window[0][0] + TPM_WINDOW - now)
+                return
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(job)
+            else:
+                del self._queues[job]
+            self._grant(slot, now)
+
+    def _grant(self, slot: Slot, now: float):
+        slot.granted_at = now
+        self.in_flight += 1
+        if self.tpm > 0:
+            self._window.append((now, slot))
+        if slot._wake is not None:
+            slot._wake()
+
+    def _schedule_retry(self, delay: float):
+        """Re-run dispatch when the oldest budget entry leaves the window."""
+        if self._timer is not None and self._timer.is_alive():
+            return
+        self._timer = threading.Timer(max(delay, 0.01), self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _enqueue(self, slot: Slot):
+        self._queues.setdefault(slot.job, deque()).append(slot)
+        self._dispatch()
+
+    def _cancel(self, slot: Slot):
+        queue = self._queues.get(slot.job)
+        if queue is not None and slot in queue:
+            queue.remove(slot)
+            if not queue:
+                del self._queues[slot.job]
+
+    # -- public -----------------------------------------------------------------
+
+    def acquire(self, slot: Slot, timeout: float = None) -> Slot:
+        """
+        Block until the slot is granted.
+
+        With a timeout, a slot still queued when it expires is dequeued and
+        QueueTimeoutError is raised, so the call is never sent.
+        """
+        granted = threading.Event()
+        slot._wake = granted.set
+        with self._lock:
+            self._enqueue(slot)
+        if granted.wait(timeout):
+            return slot
+        with self._lock:
+            if slot.granted_at is None:
+                self._cancel(slot)
+                raise QueueTimeoutError(
+                    f"no {self.provider} slot before the step deadline (queued {slot.queue_wait:.1f}s)")
+        return slot  # granted just as the wait expired
+
+    async def aacquire(self, slot: Slot) -> Slot:
+        """Await until the slot is granted (no thread is held while queued)."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def _wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+        slot._wake = _wake
+        with self._lock:
+            self._enqueue(slot)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if slot.granted_at is None:
+                    self._cancel(slot)
+                else:
+                    self._release(slot)
+            raise
+        return slot
+
+    def _release(self, slot: Slot):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def release(self, slot: Slot):
+        with self._lock:
+            self._release(slot)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "queued": sum(len(q) for q in self._queues.values()),
+                "jobs_waiting": len(self._queues),
+                "window_tokens": self._window_tokens(time.time()) if self.tpm > 0 else None,
+                "max_concurrency": self.max_concurrency,
+                "tpm": self.tpm,
+            }
+
+
+def get_scheduler(base_url: str) -> ProviderScheduler:
+    """Scheduler for the provider serving base_url (created on first use)."""
+    provider = get_provider_for_url(base_url)
+    with _schedulers_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            scheduler = ProviderScheduler(
+                provider,
+                _provider_limit('LLM_MAX_CONCURRENCY', provider, LLM_MAX_CONCURRENCY),
+                _provider_limit('LLM_TPM', provider, LLM_TPM),
+            )
+            _schedulers[provider] = scheduler
+    return scheduler
+
+
+def _base_url(llm) -> str:
+    return str(getattr(llm, 'openai_api_base', None) or getattr(llm, 'base_url', None) or '')
+
+
+def provider_of(llm) -> str:
+    """Provider id of the scheduler an LLM client's calls queue on."""
+    return get_provider_for_url(_base_url(llm))
+
+
+def _new_slot(scheduler: ProviderScheduler, messages, step_name: str) -> Slot:
+    return Slot(scheduler.provider, job_store.current_job_id() or 'default', step_name, estimate_tokens(messages))
+
+
+def _report(slot: Slot):
+    latency = time.time() - slot.granted_at
+    cost_tracker.track_latency(slot.step_name, slot.provider, slot.queue_wait, latency)
+    if slot.queue_wait >= WAIT_LOG_THRESHOLD:
+        logger.info(f" [{slot.step_name}] Queued {slot.queue_wait:.1f}s for {slot.provider}, model {latency:.1f}s")
+
+
+@contextmanager
+def slot(llm, messages, step_name: str):
+    """Hold a provider slot for one blocking LLM call (queueing at most until the step deadline)."""
+    scheduler = get_scheduler(_base_url(llm))
+    granted = scheduler.acquire(_new_slot(scheduler, messages, step_name), timeout=_remaining())
+    try:
+        yield granted
+    finally:
+        scheduler.release(granted)
+        _report(granted)
+
+
+@asynccontextmanager
+async def aslot(llm, messages, step_name: str):
+    """Hold a provider slot for one async LLM call (queueing at most until the step deadline)."""
+    scheduler = get_scheduler(_base_url(llm))
+    slot = _new_slot(scheduler, messages, step_name)
+    remaining = _remaining()
+    if remaining is None:
+        granted = await scheduler.aacquire(slot)
+    else:
+        try:
+            granted = await asyncio.wait_for(scheduler.aacquire(slot), remaining)
+        except asyncio.TimeoutError:
+            raise QueueTimeoutError(
+                f"no {scheduler.provider} slot before the step deadline (queued {slot.queue_wait:.1f}s)") from None
+    try:
+        yield granted
+    finally:
+        scheduler.release(granted)
+        _report(granted)
+
+
+def stats() -> Dict[str, Dict]:
+    """Current in-flight / queued counts per provider."""
+    with _schedulers_lock:
+        schedulers = dict(_schedulers)
+    return {provider: s.stats() for provider, s in schedulers.items()}
+
+
+def reset():
+    """Forget all schedulers (limits are re-read from the environment on next use)."""
+    with _schedulers_lock:
+        _schedulers.clear()
@@ -0,0 +1,191 @@
+"""
+Model Registry - Versioned on-disk store for trained models.
+
+Features:
+- Models keyed by (name, scope, schema): scope is a symbol or a universe name,
+  schema is the feature-schema version the model was trained on
+- Atomic writes (temp file + os.replace), so readers never see a torn pickle
+- In-memory cache of loaded models; joblib.load only runs when the file changes
+- Single-flight training: one trainer per key inside the process, plus an
+  advisory file lock (fcntl, where available) across processes
+- Staleness check from the stored trained_at timestamp
+
+Layout: {MODEL_DIR}/{name}/{scope}.v{schema}.joblib
+
+Config (config/.env):
+- MODEL_DIR: registry root (default models/trained)
+- MODEL_MAX_AGE_DAYS: age after which a model is stale (default 7)
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process single-flight only
+    fcntl = None
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+MODEL_DIR = os.getenv('MODEL_DIR', os.path.join('models', 'trained'))
+MODEL_MAX_AGE_DAYS = float(os.getenv('MODEL_MAX_AGE_DAYS', '7'))
+
+_models = {}  # (name, scope, schema) -> (mtime, entry)
+_models_lock = threading.Lock()
+_inflight = {}  # (name, scope, schema) -> threading.Event
+
+
+def _key(name: str, scope: str, schema) -> tuple:
+    return (name, str(scope).upper(), str(schema))
+
+
+def model_path(name: str, scope: str, schema) -> str:
+    """Path of the model file for (name, scope, schema)."""
+    _, scope, schema = _key(name, scope, schema)
+    safe_scope = "".join(c if c.isalnum() or c in '-_.^' else '_' for c in scope)
+    return os.path.join(MODEL_DIR, name, f"{safe_scope}.v{schema}.joblib")
+
+
+def load(name: str, scope: str, schema) -> Optional[Dict[str, Any]]:
+    """
+    Load the latest model entry for (name, scope, schema).
+
+    Returns:
+        Dict with model, trained_at, scope, schema and metrics, or None if no
+        model has been saved
+    """
+    key = _key(name, scope, schema)
+    path = model_path(name, scope, schema)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _models_lock:
+        cached = _models.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        import joblib
+        entry = joblib.load(path)
+    except Exception as e:
+        logger.warning(f"Model registry: could not load {path}: {e}")
+        return None
+    with _models_lock:
+        _models[key] = (mtime, entry)
+    return entry
+
+
+def save(name: str, scope: str, schema, model, metrics: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Atomically write a trained model and make it the latest for its key."""
+    import joblib
+
+    key = _key(name, scope, schema)
+    path = model_path(name, scope, schema)
+    entry = {
+        'model': model,
+        'trained_at': time.time(),
+        'scope': key[1],
+        'schema': key[2],
+        'metrics': metrics or {},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with _models_lock:
+        _models[key] = (os.path.getmtime(path), entry)
+    logger.info(f"Model registry: saved {path}")
+    return entry
+
+
+def age_days(entry: Optional[Dict[str, Any]]) -> float:
+    """Age of a model entry in days (inf if there is none)."""
+    if not entry:
+        return float('inf')
+    return (time.time() - entry.get('trained_at', 0)) / 86400
+
+
+def is_stale(entry: Optional[Dict[str, Any]], max_age_days: float = None) -> bool:
+    """True if there is no model or it is older than max_age_days."""
+    max_age = MODEL_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    return age_days(entry) > max_age
+
+
+def is_training(name: str, scope: str, schema) -> bool:
+    """True while a trainer for this key is running in this process."""
+    with _models_lock:
+        return _key(name, scope, schema) in _inflight
+
+
+def train(name: str, scope: str, schema, trainer: Callable[[], Optional[tuple]],
+          wait: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Train and save a model unless another trainer for the same key is running.
+
+    Args:
+        trainer: Zero-arg callable returning (model, metrics), or None on failure
+        wait: If another trainer holds the key, wait for it (True) or return the
+              current entry immediately (False)
+
+    Returns:
+        The newest entry for the key (possibly trained by someone else), or None
+    """
+    key = _key(name, scope, schema)
+    with _models_lock:
+        event = _inflight.get(key)
+        owner = event is None
+        if owner:
+            event = threading.Event()
+            _inflight[key] = event
+
+    if not owner:
+        if wait:
+            event.wait()
+        return load(name, scope, schema)
+
+    lock_file = None
+    try:
+        if fcntl is not None:
+            lock_path = model_path(name, scope, schema) + '.lock'
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            lock_file = open(lock_path, 'w')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+            except BlockingIOError:
+                logger.info(f"Model registry: {name}/{key[1]} is being trained by another process")
+                return load(name, scope, schema)
+            # Another process may have finished while we waited for the lock
+            entry = load(name, scope, schema)
+            if entry is not None and not is_stale(entry):
+                return entry
+
+        result = trainer()
+        if result is None:
+            return load(name, scope, schema)
+        model, metrics = result
+        return save(name, scope, schema, model, metrics)
+    finally:
+        if lock_file is not None:
+            lock_file.close()
+        with _models_lock:
+            _inflight.pop(key, None)
+        event.set()
+
+
+def clear():
+    """Drop the in-memory model cache."""
+    with _models_lock:
+        _models.clear()
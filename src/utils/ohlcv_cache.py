@@ -0,0 +1,129 @@
+"""
+OHLCV Cache - Process-wide cache for Yahoo Finance chart history.
+
+Features:
+- Keyed by (symbol, range, interval)
+- Interval-aware TTLs (intraday bars expire quickly, monthly bars last hours)
+- Single-flight: concurrent callers for the same key wait on one in-flight request
+- Returns copies so callers can add indicator columns without mutating cached data
+- Empty results are shared with waiters but never cached (next call retries)
+"""
+
+import time
+import logging
+import threading
+import pandas as pd
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+# TTL (seconds) per bar interval
+INTERVAL_TTL = {
+    '1m': 30,
+    '2m': 60,
+    '5m': 120,
+    '15m': 300,
+    '30m': 300,
+    '60m': 600,
+    '90m': 600,
+    '1h': 600,
+    '1d': 900,
+    '5d': 1800,
+    '1wk': 3600,
+    '1mo': 4 * 3600,
+    '3mo': 4 * 3600,
+}
+DEFAULT_TTL = 900
+MAX_ENTRIES = 512
+INFLIGHT_WAIT = 60  # seconds a waiter blocks before fetching on its own
+
+_cache = {}     # key -> (expires_at, DataFrame)
+_inflight = {}  # key -> _Flight
+_lock = threading.Lock()
+
+
+class _Flight:
+    """A single in-flight fetch that other threads can wait on."""
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+def get_ttl(interval: str) -> int:
+    """Get cache TTL in seconds for a bar interval."""
+    return INTERVAL_TTL.get(interval, DEFAULT_TTL)
+
+
+def _evict_locked(now: float):
+    """Drop expired entries, then the soonest-to-expire ones if still over capacity."""
+    for key in [k for k, (expires_at, _) in _cache.items() if expires_at <= now]:
+        del _cache[key]
+    if len(_cache) >= MAX_ENTRIES:
+        for key in sorted(_cache, key=lambda k: _cache[k][0])[:len(_cache) - MAX_ENTRIES + 1]:
+            del _cache[key]
+
+
+def peek(key) -> pd.DataFrame:
+    """Return a copy of a fresh cached entry, or None."""
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1].copy()
+    return None
+
+
+def put(key, interval: str, df: pd.DataFrame):
+    """Store a non-empty DataFrame under key with the interval's TTL."""
+    if df is None or df.empty:
+        return
+    now = time.time()
+    with _lock:
+        _evict_locked(now)
+        _cache[key] = (now + get_ttl(interval), df.copy())
+
+
+def get_or_fetch(key, interval: str, loader) -> pd.DataFrame:
+    """
+    Get a cached DataFrame or load it once for all concurrent callers.
+
+    Args:
+        key: Cache key, typically (symbol, range, interval)
+        interval: Bar interval (selects the TTL)
+        loader: Zero-arg callable returning a DataFrame
+
+    Returns:
+        A copy of the cached or freshly loaded DataFrame
+    """
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1].copy()
+        flight = _inflight.get(key)
+        owner = flight is None
+        if owner:
+            flight = _Flight()
+            _inflight[key] = flight
+
+    if not owner:
+        logger.debug(f"OHLCV cache: waiting on in-flight fetch for {key}")
+        if flight.event.wait(timeout=INFLIGHT_WAIT) and flight.result is not None:
+            return flight.result.copy()
+        return loader()
+
+    try:
+        df = loader()
+        if df is None:
+            df = pd.DataFrame()
+        flight.result = df
+        put(key, interval, df)
+        return df.copy()
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        flight.event.set()
+
+
+def clear():
+    """Clear all cached entries."""
+    with _lock:
+        _cache.clear()
@@ -8,6 +8,7 @@ from qdrant_client import QdrantClient, models
 from qdrant_client.http.models import Distance, VectorParams, Filter, FieldCondition, MatchValue, OrderBy
 from langchain_openai import OpenAIEmbeddings
 import uuid
+from . import replay
 
 # Thread lock for local Qdrant client (file-based storage doesn't support concurrent access)
 _qdrant_lock = threading.Lock()
@@ -97,7 +98,8 @@ def init_collection():
 
 def store_entry(symbol: str, report_type: str, content: str, analysis_datetime: str, metadata: Dict[str, Any] = None):
     """Store an entry in Qdrant with embedding for semantic search."""
-    if not qrant_server_health_status:
+    if not qrant_server_health_status or replay.is_active():
+        # Recorded/replayed runs must not change what later runs read back
         return
     if not embeddings:
         print("WARNING: Embeddings not available, skipping store_entry")
@@ -155,7 +157,10 @@ def get_last_report(symbol: str) -> Optional[Dict[str, Any]]:
         return None
 
 def get_past_lessons(symbol: str) -> List[str]:
-    """Get past lessons learned for a symbol from Qdrant."""
+    """Get past lessons learned for a symbol from Qdrant (recorded/replayed under FINAGENT_REPLAY)."""
+    return replay.call('qdrant', {'call': 'lessons', 'symbol': symbol}, lambda: _query_past_lessons(symbol))
+
+def _query_past_lessons(symbol: str) -> List[str]:
     if not qrant_server_health_status:
         return []
     with _qdrant_lock:
@@ -0,0 +1,141 @@
+"""
+Rate Limiter - Shared per-host token buckets with adaptive backoff.
+
+Features:
+- One token bucket per host (HOST_LIMITS: requests/second and burst size)
+- Reservation-based: threads and the async loop share the same buckets
+- Adaptive (AIMD) rate: halved on 429/5xx, recovers gradually on success
+- Honors Retry-After (seconds or HTTP date); the whole host pauses until then
+- Exponential backoff with jitter when the server gives no Retry-After
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+# host -> (max requests per second, burst)
+HOST_LIMITS = {
+    'query1.finance.yahoo.com': (5.0, 10),
+    'query2.finance.yahoo.com': (5.0, 10),
+    'www.reddit.com': (1.0, 3),
+    'api.worldbank.org': (10.0, 20),
+}
+DEFAULT_LIMIT = (5.0, 10)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 3          # total tries per request, including the first
+MAX_RETRY_AFTER = 60      # never pause a host longer than this (seconds)
+MIN_RATE_FRACTION = 0.1   # adaptive rate never drops below 10% of the max
+RECOVERY_FRACTION = 0.05  # each success restores 5% of the max rate
+
+
+class HostBucket:
+    """Token bucket for one host with adaptive rate."""
+
+    def __init__(self, max_rate: float, burst: int):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve one request slot. Returns seconds the caller must wait before sending."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def on_throttled(self, retry_after: float):
+        """Halve the rate and pause the host after a 429/5xx."""
+        with self.lock:
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def on_success(self):
+        """Recover the rate gradually towards the configured maximum."""
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(url: str) -> HostBucket:
+    """Get the shared bucket for the URL's host."""
+    host = urlsplit(url).netloc.lower()
+    bucket = _buckets.get(host)
+    if bucket is None:
+        with _buckets_lock:
+            if host not in _buckets:
+                _buckets[host] = HostBucket(*HOST_LIMITS.get(host, DEFAULT_LIMIT))
+            bucket = _buckets[host]
+    return bucket
+
+
+def parse_retry_after(value) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP date). Returns None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def backoff_delay(response, attempt: int) -> float:
+    """Delay before retrying: Retry-After if given, else exponential backoff with jitter."""
+    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+    if retry_after is None:
+        retry_after = (2 ** attempt) + random.uniform(0, 0.5)
+    return min(retry_after, MAX_RETRY_AFTER)
+
+
+def acquire(url: str):
+    """Block until the host's bucket allows another request."""
+    wait = get_bucket(url).reserve()
+    if wait > 0:
+        time.sleep(wait)
+
+
+async def acquire_async(url: str):
+    """Await until the host's bucket allows another request."""
+    wait = get_bucket(url).reserve()
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+
+def observe(url: str, response, attempt: int) -> bool:
+    """
+    Feed a response back into the host's bucket.
+
+    Returns:
+        True if the request should be retried (throttled and attempts remain)
+    """
+    bucket = get_bucket(url)
+    if response.status_code in RETRY_STATUS:
+        delay = backoff_delay(response, attempt)
+        bucket.on_throttled(delay)
+        logger.warning(f"Rate limiter: {urlsplit(url).netloc} returned HTTP {response.status_code}, "
+                       f"backing off {delay:.1f}s (rate now {bucket.rate:.2f}/s)")
+        return attempt + 1 < MAX_ATTEMPTS
+    bucket.on_success()
+    return False
@@ -0,0 +1,180 @@
+"""
+Record/Replay - Cassette files for offline, repeatable pipeline runs.
+
+Features:
+- FINAGENT_REPLAY=record: call live services and write every response to a cassette
+- FINAGENT_REPLAY=1 (or 'replay'): serve responses from cassettes only, never touching the network
+- Covers pooled/async HTTP (Yahoo, Reddit, World Bank), yfinance library calls and LLM calls
+- One JSON file per request under FINAGENT_CASSETTE_DIR (default ./test/cassettes),
+  named by a hash of the request, so replay does not depend on call order or thread timing
+- Time-dependent query params (VOLATILE_PARAMS) are left out of the request key
+- A request with no cassette raises ReplayMissError instead of silently going live
+
+While recording or replaying, persistent caches (bar store, disk cache, Qdrant writes)
+are bypassed so every run sees exactly the recorded cold-path requests.
+
+Usage:
+    FINAGENT_REPLAY=record python test/test_regression.py   # capture once (live)
+    FINAGENT_REPLAY=1 python test/test_regression.py        # replay offline
+"""
+
+import os
+import json
+import base64
+import hashlib
+import logging
+import threading
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+CASSETTE_DIR = os.getenv('FINAGENT_CASSETTE_DIR', os.path.join('test', 'cassettes'))
+
+# Query params that change on every run (e.g. "now" as the end of a chart window)
+VOLATILE_PARAMS = {'period2', '_', 'crumb'}
+
+_write_lock = threading.Lock()
+
+
+class ReplayMissError(RuntimeError):
+    """Raised in replay mode when a request has no recorded cassette."""
+
+
+class CassetteResponse:
+    """Recorded HTTP response (the subset of requests/httpx Response the fetchers use)."""
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code} for {self.url} (replayed)")
+
+
+def get_mode() -> str:
+    """Return 'replay', 'record' or '' (live), read from FINAGENT_REPLAY."""
+    value = os.getenv('FINAGENT_REPLAY', '').strip().lower()
+    if value in ('1', 'true', 'replay'):
+        return 'replay'
+    if value == 'record':
+        return 'record'
+    return ''
+
+
+def is_active() -> bool:
+    """True while recording or replaying."""
+    return get_mode() != ''
+
+
+def is_replaying() -> bool:
+    return get_mode() == 'replay'
+
+
+def is_recording() -> bool:
+    return get_mode() == 'record'
+
+
+def _path(kind: str, request: dict) -> str:
+    digest = hashlib.sha1(json.dumps(request, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return os.path.join(CASSETTE_DIR, kind, f"{digest}.json")
+
+
+def _load(kind: str, request: dict) -> dict:
+    path = _path(kind, request)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['response']
+    except FileNotFoundError:
+        raise ReplayMissError(f"No {kind} cassette for {json.dumps(request, default=str)[:200]} ({path})")
+
+
+def _save(kind: str, request: dict, response):
+    path = _path(kind, request)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with _write_lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'request': request, 'response': response}, f, indent=1, default=str)
+            os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Replay: could not write cassette {path}: {e}")
+
+
+def _http_request(url: str, params: dict = None) -> dict:
+    params = {k: v for k, v in (params or {}).items() if k not in VOLATILE_PARAMS}
+    return {'url': url, 'params': params}
+
+
+def load_http(url: str, params: dict = None) -> CassetteResponse:
+    """Replay a recorded GET."""
+    recorded = _load('http', _http_request(url, params))
+    return CassetteResponse(url, recorded['status_code'], recorded['headers'],
+                            base64.b64decode(recorded['content']))
+
+
+def save_http(url: str, params: dict, response):
+    """Record a live GET response (requests or httpx)."""
+    if response.status_code >= 500 or response.status_code == 429:
+        return  # never pin a transient failure into a cassette
+    headers = {k: v for k, v in response.headers.items() if k.lower() == 'content-type'}
+    _save('http', _http_request(url, params), {
+        'status_code': response.status_code,
+        'headers': headers,
+        'content': base64.b64encode(response.content).decode('ascii'),
+    })
+
+
+def call(kind: str, request: dict, loader):
+    """
+    Record or replay a JSON-serializable library call (e.g. yfinance Ticker.info).
+
+    Args:
+        kind: Cassette namespace ('yfinance', 'qdrant', ...)
+        request: Dict identifying the call
+        loader: Zero-arg callable doing the live call
+
+    Returns:
+        The live or recorded value
+    """
+    mode = get_mode()
+    if mode == 'replay':
+        return _load(kind, request)
+    value = loader()
+    if mode == 'record':
+        _save(kind, request, value)
+    return value
+
+
+def _llm_request(llm, messages) -> dict:
+    return {
+        'model': getattr(llm, 'model_name', None) or getattr(llm, 'model', 'unknown'),
+        'messages': [[getattr(m, 'type', type(m).__name__), getattr(m, 'content', str(m))] for m in messages],
+    }
+
+
+def load_llm(llm, messages) -> dict:
+    """Replay a recorded LLM call. Returns {'content', 'input_tokens', 'output_tokens'}."""
+    return _load('llm', _llm_request(llm, messages))
+
+
+def save_llm(llm, messages, content: str, input_tokens: int = 0, output_tokens: int = 0):
+    """Record an LLM response and its token usage."""
+    _save('llm', _llm_request(llm, messages), {
+        'content': content,
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+    })
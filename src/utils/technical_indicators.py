@@ -1,20 +1,15 @@
 import pandas as pd
 import numpy as np
+from . import indicator_engine
 
 def calculate_macd(hist: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
-    # Calculate MACD, Signal Line, and Histogram.
-    exp1 = hist['Close'].ewm(span=fast, adjust=False).mean()
-    exp2 = hist['Close'].ewm(span=slow, adjust=False).mean()
-    macd = exp1 - exp2
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    histogram = macd - signal_line
-    hist['MACD'] = macd
-    hist['MACD_signal'] = signal_line
-    hist['MACD_histogram'] = histogram
+    # Calculate MACD, Signal Line, and Histogram (shared indicator engine).
+    hist['MACD'] = indicator_engine.get(hist, 'MACD', fast, slow, signal)
+    hist['MACD_signal'] = indicator_engine.get(hist, 'MACD_SIGNAL', fast, slow, signal)
+    hist['MACD_histogram'] = indicator_engine.get(hist, 'MACD_HIST', fast, slow, signal)
     return hist
 
 def calculate_vwap(hist: pd.DataFrame) -> pd.DataFrame:
-    # Calculate Volume Weighted Average Price.
-    typical_price = (hist['High'] + hist['Low'] + hist['Close']) / 3
-    hist['VWAP'] = (typical_price * hist['Volume']).cumsum() / hist['Volume'].cumsum()
+    # Calculate Volume Weighted Average Price (shared indicator engine).
+    hist['VWAP'] = indicator_engine.get(hist, 'VWAP')
     return hist
@@ -0,0 +1,263 @@
+"""
+Training Scheduler - Background meta-label model training off the request path.
+
+Features:
+- Each job trains in its own spawned worker process (at most TRAINING_WORKERS at
+  a time), so TabPFN fitting never holds the GIL or a STEP_TIMEOUT slot of the
+  analysis pipeline
+- request(symbol, df, period) queues a refresh and returns immediately; models are
+  kept per (scope, investment period) since the label horizon follows the period.
+  A scope is never queued twice while its job is pending, nor re-queued within
+  TRAINING_RETRY_MINUTES of a failed job
+- Periodic refresh thread (every TRAINING_REFRESH_HOURS) re-queues the stale
+  models of TRAINING_SYMBOLS and of scopes requested in the last
+  TRAINING_KEEP_DAYS; older one-off scopes drop out of the sweep
+- Finished models land in the model registry; the request path picks them up
+  on its next load (the registry reloads on file change)
+- Interpreter exit does not wait for in-flight training: queued jobs are
+  dropped and the worker processes terminated
+
+Config (config/.env):
+- TRAINING_WORKERS: training processes (default 1)
+- TRAINING_REFRESH_HOURS: period of the refresh sweep (default 24)
+- TRAINING_RETRY_MINUTES: cool-down before a failed scope is queued again (default 30)
+- TRAINING_KEEP_DAYS: days a requested scope stays in the refresh sweep (default 7)
+- TRAINING_SYMBOLS: comma-separated symbols to keep warm from startup, for the
+  default investment period (optional)
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from . import model_registry
+from .dataset_builder import DEFAULT_INVESTMENT_PERIOD
+
+load_dotenv(os.path.join('config', '.env'))
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+TRAINING_WORKERS = int(os.getenv('TRAINING_WORKERS', '1'))
+TRAINING_REFRESH_HOURS = float(os.getenv('TRAINING_REFRESH_HOURS', '24'))
+TRAINING_RETRY_MINUTES = float(os.getenv('TRAINING_RETRY_MINUTES', '30'))
+TRAINING_KEEP_DAYS = float(os.getenv('TRAINING_KEEP_DAYS', '7'))
+TRAINING_SYMBOLS = [s.strip().upper() for s in os.getenv('TRAINING_SYMBOLS', '').split(',') if s.strip()]
+
+# spawn: forking a threaded server process is not safe
+_mp = multiprocessing.get_context('spawn')
+_slots = threading.BoundedSemaphore(max(1, TRAINING_WORKERS))
+_pending = {}  # (scope, investment_period) -> job thread (queued or running)
+_processes = {}  # (scope, investment_period) -> running worker process
+_failed = {}  # (scope, investment_period) -> time its last job failed (cool-down before re-queueing)
+_pinned = {(s, DEFAULT_INVESTMENT_PERIOD) for s in TRAINING_SYMBOLS}  # always kept fresh by the refresh sweep
+_last_requested = {}  # (scope, investment_period) -> time of the last request (refresh sweep candidates)
+_lock = threading.Lock()
+_refresh_thread = None
+_stopping = False
+_exit_hook = False
+
+
+def _train_scope(scope: str, investment_period: str, df=None) -> Dict:
+    """Worker entry point (runs in a child process): fetch bars if needed, train, save."""
+    from ..agents.quant_agent import QuantAgent, META_LABEL_MODEL, META_LABEL_UNIVERSE, meta_label_schema
+
+    agent = QuantAgent()
+    start = time.time()
+    if scope == META_LABEL_UNIVERSE.upper():
+        # Cross-sectional model: trained from the memory-mapped universe dataset
+        trainer = lambda: agent._train_universe_model(investment_period)
+    else:
+        if df is None:
+            df = agent._fetch_ohlcv(scope)
+        if df is None or len(df) < 50:
+            return {'scope': scope, 'success': False, 'error': 'insufficient OHLCV data'}
+        trainer = lambda: agent._train_tabpfn_model(df, investment_period)
+
+    entry = model_registry.train(META_LABEL_MODEL, scope, meta_label_schema(investment_period), trainer)
+    fresh = entry is not None and entry.get('trained_at', 0) >= start
+    return {
+        'scope': scope,
+        'success': fresh,
+        'metrics': entry.get('metrics', {}) if entry else {},
+        'duration': time.time() - start,
+    }
+
+
+def _worker_main(conn, train, scope: str, investment_period: str, df):
+    """Child process: run one training job and send its result back to the parent."""
+    try:
+        result = train(scope, investment_period, df)
+    except Exception as e:
+        result = {'scope': scope, 'success': False, 'error': f"{type(e).__name__}: {e}"}
+    conn.send(result)
+    conn.close()
+
+
+def _run_job(key: tuple, df):
+    """Job thread: wait for a worker slot, train in a fresh process, report the result."""
+    with _slots:
+        try:
+            result = _train_in_process(key, df)
+        except Exception as e:
+            result = {'success': False, 'error': f"worker failed: {e}"}
+    _on_done(key, result)
+
+
+def _train_in_process(key: tuple, df) -> Dict:
+    """Run _train_scope for key in a spawned process we hold a handle on (for exit)."""
+    global _exit_hook
+    with _lock:
+        if _stopping:
+            return {'success': False, 'error': 'training scheduler stopped'}
+        receiver, sender = _mp.Pipe(duplex=False)
+        process = _mp.Process(target=_worker_main, args=(sender, _train_scope, key[0], key[1], df),
+                              name=f"training-{key[0]}")
+        process.start()
+        _processes[key] = process
+        if not _exit_hook:
+            # multiprocessing registers its exit handler (which joins non-daemon
+            # children) when the first process starts; registered after it, this
+            # one runs first and terminates the workers so that join returns at once
+            atexit.register(_stop_at_exit)
+            _exit_hook = True
+    sender.close()
+    try:
+        return receiver.recv()
+    except EOFError:
+        # The worker died (or was terminated) without sending a result
+        process.join()
+        return {'success': False, 'error': f"worker exited with code {process.exitcode}"}
+    finally:
+        receiver.close()
+        process.join()
+        with _lock:
+            _processes.pop(key, None)
+
+
+def _stop_at_exit():
+    """Interpreter exit: drop queued jobs and terminate running workers instead of joining them."""
+    shutdown(wait=False, terminate=True)
+
+
+def _on_done(key: tuple, result: Dict):
+    with _lock:
+        _pending.pop(key, None)
+        if _stopping:
+            return
+        if result.get('success'):
+            _failed.pop(key, None)
+        else:
+            _failed[key] = time.time()  # not re-queued until the cool-down has passed
+    label = f"{key[0]} ({key[1]})"
+    if result.get('success'):
+        print(f"TRAINING: {label} model ready in {result['duration']:.1f}s {result.get('metrics', {})}")
+    else:
+        print(f"WARNING: TRAINING: {label} not trained: {result.get('error', 'see worker log')}")
+
+
+def request(scope: str, df=None, investment_period: str = DEFAULT_INVESTMENT_PERIOD) -> bool:
+    """
+    Queue a background training job for a scope (symbol or universe).
+
+    Args:
+        scope: Symbol or universe name
+        df: OHLCV bars already in hand (the worker fetches them otherwise)
+        investment_period: Period whose label horizon the model is trained for
+
+    Returns:
+        True if a job was queued, False if one is already pending or the
+        scope's last job failed less than TRAINING_RETRY_MINUTES ago
+    """
+    key = (scope.upper(), investment_period)
+    with _lock:
+        _last_requested[key] = time.time()
+    return _submit(key, df)
+
+
+def _submit(key: tuple, df=None) -> bool:
+    """Start a job thread for key unless one is pending or the scope is cooling down."""
+    with _lock:
+        if _stopping or key in _pending:
+            return False
+        failed_at = _failed.get(key)
+        if failed_at is not None and time.time() - failed_at < TRAINING_RETRY_MINUTES * 60:
+            return False
+        thread = threading.Thread(target=_run_job, args=(key, df), daemon=True, name=f"training-job-{key[0]}")
+        _pending[key] = thread
+        thread.start()
+    logger.info(f"Training scheduler: queued {key[0]} ({key[1]})")
+    return True
+
+
+def is_training(scope: str, investment_period: str = DEFAULT_INVESTMENT_PERIOD) -> bool:
+    """True while a background job for the scope is queued or running."""
+    with _lock:
+        return (scope.upper(), investment_period) in _pending
+
+
+def _sweep_targets() -> List[tuple]:
+    """TRAINING_SYMBOLS plus scopes requested within TRAINING_KEEP_DAYS (older ones are forgotten)."""
+    cutoff = time.time() - TRAINING_KEEP_DAYS * 86400
+    with _lock:
+        for key in [k for k, t in _last_requested.items() if t < cutoff]:
+            del _last_requested[key]
+            _failed.pop(key, None)
+        return sorted(_pinned | set(_last_requested))
+
+
+def refresh_stale(scopes: Optional[List[tuple]] = None) -> int:
+    """Queue every recently used (or given) (scope, investment_period) whose model is missing or stale."""
+    from ..agents.quant_agent import META_LABEL_MODEL, meta_label_schema
+
+    targets = list(scopes) if scopes is not None else _sweep_targets()
+    queued = 0
+    for scope, investment_period in targets:
+        entry = model_registry.load(META_LABEL_MODEL, scope, meta_label_schema(investment_period))
+        # Not request(): a sweep must not extend how long a scope stays in the sweep
+        if model_registry.is_stale(entry) and _submit((scope.upper(), investment_period)):
+            queued += 1
+    return queued
+
+
+def _refresh_loop():
+    while True:
+        try:
+            queued = refresh_stale()
+            if queued:
+                print(f"TRAINING: refresh sweep queued {queued} model(s)")
+        except Exception as e:
+            print(f"WARNING: TRAINING: refresh sweep failed: {e}")
+        time.sleep(TRAINING_REFRESH_HOURS * 3600)
+
+
+def start():
+    """Start the periodic refresh thread (idempotent; no-op inside worker processes)."""
+    global _refresh_thread
+    if multiprocessing.parent_process() is not None:
+        # Spawned workers re-import the server's main module
+        return
+    with _lock:
+        if _refresh_thread is not None:
+            return
+        _refresh_thread = threading.Thread(target=_refresh_loop, daemon=True, name='training-refresh')
+        _refresh_thread.start()
+
+
+def shutdown(wait: bool = False, terminate: bool = False):
+    """Stop training: queued jobs are dropped; terminate also kills running workers, wait joins them."""
+    global _stopping
+    with _lock:
+        _stopping = True
+        threads = list(_pending.values())
+        processes = list(_processes.values()) if terminate else []
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    if wait:
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,113 @@
+"""
+Triple Barrier - Vectorized first-touch labeling (Lopez de Prado, AFML ch. 3).
+
+Features:
+- Volatility-scaled horizontal barriers: entry +/- multiples of ATR at each event
+- Vertical (time) barrier from the investment period's holding days
+- First-touch semantics: whichever barrier the path crosses first decides the
+  label; a bar whose range spans both barriers counts as a stop (conservative)
+- No Python loop over events: future highs/lows are a strided (events x horizon)
+  window view and the first crossing is an argmax along the horizon axis
+- Events whose horizon runs past the data and touched nothing stay unlabeled
+
+Labels follow the meta-label classes: 2 = profit target first (buy),
+0 = stop loss first (sell), 1 = vertical barrier (hold).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+# Holding period (calendar days) of the vertical barrier per investment period
+PERIOD_DAYS = {
+    'short+': 7,
+    'short': 21,
+    'medium': 45,
+    'long': 90
+}
+PROFIT_TARGET_MULT = 3.0  # x ATR above entry
+STOP_LOSS_MULT = 1.5      # x ATR below entry
+
+
+def horizon_bars(days: int, bars_per_week: int = 5) -> int:
+    """Daily bars spanned by a holding period given in calendar days."""
+    return max(1, int(np.ceil(days * bars_per_week / 7)))
+
+
+def future_window(x: np.ndarray, horizon: int) -> np.ndarray:
+    """(n x horizon) view whose row i holds x[i+1 .. i+horizon] (NaN past the end)."""
+    padded = np.concatenate([x[1:], np.full(horizon, np.nan)])
+    return np.lib.stride_tricks.sliding_window_view(padded, horizon)[:len(x)]
+
+
+def first_touch(high, low, close, scale, horizon: int,
+                profit_mult: float = PROFIT_TARGET_MULT,
+                stop_mult: float = STOP_LOSS_MULT) -> Dict[str, np.ndarray]:
+    """
+    First-touch triple-barrier outcome for a long entry at every bar's close.
+
+    Args:
+        high, low, close: Bar arrays
+        scale: Volatility unit per bar (e.g. ATR), same length as close
+        horizon: Vertical barrier in bars
+        profit_mult, stop_mult: Barrier distances in units of scale
+
+    Returns:
+        Dict of arrays (one entry per bar):
+        - label: 2 / 0 / 1 as above, NaN if undetermined
+        - barrier: +1 (profit), -1 (stop), 0 (time), NaN if undetermined
+        - bars: bars until the touch (horizon for the vertical barrier)
+        - ret: exit return (barrier price, or close at the vertical barrier)
+        - upper, lower: barrier prices
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+    n = len(close)
+
+    upper = close + profit_mult * scale
+    lower = close - stop_mult * scale
+
+    with np.errstate(invalid='ignore'):
+        hit_up = future_window(high, horizon) >= upper[:, None]
+        hit_down = future_window(low, horizon) <= lower[:, None]
+    up_any, down_any = hit_up.any(axis=1), hit_down.any(axis=1)
+    up_at = np.where(up_any, hit_up.argmax(axis=1), horizon)
+    down_at = np.where(down_any, hit_down.argmax(axis=1), horizon)
+
+    # Ties (both crossed within the same bar) resolve to the stop
+    stop_first = down_any & (down_at <= up_at)
+    profit_first = up_any & ~stop_first
+    complete = np.arange(n) + horizon <= n - 1
+    touched = profit_first | stop_first
+    valid = (touched | complete) & np.isfinite(scale) & np.isfinite(close)
+
+    bars = np.where(stop_first, down_at, np.where(profit_first, up_at, horizon)) + 1
+    bars = np.minimum(bars, horizon)
+    exit_close = close[np.minimum(np.arange(n) + horizon, n - 1)]
+    exit_price = np.where(profit_first, upper, np.where(stop_first, lower, exit_close))
+
+    label = np.where(profit_first, 2.0, np.where(stop_first, 0.0, 1.0))
+    barrier = np.where(profit_first, 1.0, np.where(stop_first, -1.0, 0.0))
+    label[~valid] = np.nan
+    barrier[~valid] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret = np.where(valid, exit_price / close - 1.0, np.nan)
+
+    return {
+        'label': label,
+        'barrier': barrier,
+        'bars': np.where(valid, bars, -1),
+        'ret': ret,
+        'upper': upper,
+        'lower': lower,
+    }
+
+
+def label_frame(df: pd.DataFrame, atr: pd.Series, horizon: int,
+                profit_mult: float = PROFIT_TARGET_MULT,
+                stop_mult: float = STOP_LOSS_MULT) -> pd.DataFrame:
+    """first_touch() for an OHLCV frame, as a DataFrame indexed like df."""
+    result = first_touch(df['High'], df['Low'], df['Close'], atr, horizon, profit_mult, stop_mult)
+    return pd.DataFrame(result, index=df.index)
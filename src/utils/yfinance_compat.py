@@ -5,9 +5,21 @@ This module provides a wrapper around yfinance to handle compatibility issues
 with Python 3.13 and newer versions of yfinance.
 """
 
-import requests
+import time
+import logging
 import pandas as pd
+from typing import Dict, List
 from datetime import datetime, timedelta
+from . import ohlcv_cache
+from . import bar_store
+from .http_session import http_get
+
+# Get logger for this module
+logger = logging.getLogger('finagent')
+
+
+SPARK_URL = 'https://query1.finance.yahoo.com/v8/finance/spark'
+SPARK_MAX_SYMBOLS = 20  # spark endpoint limit per request
 
 
 class YahooFinanceCompat:
@@ -18,11 +30,52 @@ class YahooFinanceCompat:
         self.headers = {'User-Agent': 'Mozilla/5.0'}
 
     def get_history(self, period: str = '1mo', interval: str = '1d') -> pd.DataFrame:
-        """Get historical price data using direct API."""
+        """Get historical price data (shared cache, one request per symbol/range/interval)."""
+        return ohlcv_cache.get_or_fetch(
+            (self.symbol, period, interval),
+            interval,
+            lambda: self._fetch_history(period, interval)
+        )
+
+    def _fetch_history(self, period: str, interval: str) -> pd.DataFrame:
+        """Read bars from the local bar store and fetch only the missing tail from Yahoo."""
+        if not bar_store.is_stored_interval(interval):
+            return self._fetch_chart({'range': period, 'interval': interval})
+
+        start = bar_store.range_start(period)
+        with bar_store.get_lock(self.symbol, interval):
+            stored, meta = bar_store.load(self.symbol, interval)
+
+            if stored.empty or not bar_store.covers(meta, start):
+                # No usable history yet: fetch the full requested range once
+                fetched = self._fetch_chart({'range': period, 'interval': interval})
+                if fetched.empty:
+                    return fetched
+                merged = bar_store.merge_tail(stored, fetched)
+                bar_store.save(self.symbol, interval, merged, bar_store.make_meta(start))
+            elif time.time() - meta.get('updated_at', 0) < ohlcv_cache.get_ttl(interval):
+                merged = stored
+            else:
+                # Refresh only the tail (last stored bar may still have been forming)
+                tail_start = stored.index.max() - bar_store.get_tail_rewind(interval)
+                fetched = self._fetch_chart({
+                    'period1': int(tail_start.timestamp()),
+                    'period2': int(time.time()),
+                    'interval': interval,
+                })
+                merged = bar_store.merge_tail(stored, fetched)
+                if not fetched.empty:
+                    meta['updated_at'] = time.time()
+                    bar_store.save(self.symbol, interval, merged, meta)
+                logger.debug(f"Bar store {self.symbol} {interval}: {len(stored)} stored, {len(fetched)} tail bars fetched")
+
+        return merged[merged.index >= start] if start != datetime.min else merged
+
+    def _fetch_chart(self, params: dict) -> pd.DataFrame:
+        """Fetch chart bars using direct API, indexed by bar time (UTC)."""
         try:
             url = f'https://query1.finance.yahoo.com/v8/finance/chart/{self.symbol}'
-            params = {'range': period, 'interval': interval}
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            response = http_get(url, headers=self.headers, params=params, timeout=30)
 
             if response.status_code == 200:
                 data = response.json()
@@ -31,24 +84,110 @@ class YahooFinanceCompat:
                 quotes = chart.get('indicators', {}).get('quote', [{}])[0]
 
                 if timestamps and quotes:
-                    df = pd.DataFrame()
+                    df = pd.DataFrame(index=pd.to_datetime(timestamps, unit='s'))
+                    df.index.name = 'Date'
                     df['Open'] = quotes.get('open', [])
                     df['High'] = quotes.get('high', [])
                     df['Low'] = quotes.get('low', [])
                     df['Close'] = quotes.get('close', [])
                     df['Volume'] = quotes.get('volume', [])
+                    df = df[~df.index.duplicated(keep='last')]
                     return df.dropna()
             return pd.DataFrame()
         except Exception as e:
             print(f"Error fetching history for {self.symbol}: {e}")
             return pd.DataFrame()
 
+    @staticmethod
+    def get_history_batch(symbols: List[str], period: str = '1mo', interval: str = '1d') -> Dict[str, pd.DataFrame]:
+        """
+        Get closing-price history for many symbols using the multi-symbol spark endpoint.
+
+        Args:
+            symbols: Ticker symbols
+            period: Yahoo range string
+            interval: Bar interval
+
+        Returns:
+            Dict of symbol -> DataFrame with a 'Close' column (indexed by bar time).
+            Symbols the spark endpoint doesn't return fall back to get_history().
+        """
+        results = {}
+        missing = []
+        for symbol in symbols:
+            cached = ohlcv_cache.peek((symbol, period, interval, 'close'))
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+
+        for i in range(0, len(missing), SPARK_MAX_SYMBOLS):
+            chunk = tuple(missing[i:i + SPARK_MAX_SYMBOLS])
+            # Single-flight on the whole chunk: concurrent tickers share one request
+            combined = ohlcv_cache.get_or_fetch(
+                ('spark', chunk, period, interval),
+                interval,
+                lambda chunk=chunk: YahooFinanceCompat._fetch_spark(chunk, period, interval)
+            )
+            for symbol in chunk:
+                if symbol in combined.columns.get_level_values(0):
+                    df = combined[symbol].dropna()
+                    if not df.empty:
+                        results[symbol] = df
+                        ohlcv_cache.put((symbol, period, interval, 'close'), interval, df)
+
+        for symbol in symbols:
+            if symbol not in results:
+                results[symbol] = YahooFinanceCompat(symbol).get_history(period=period, interval=interval)
+        return results
+
+    @staticmethod
+    def _fetch_spark(symbols: tuple, period: str, interval: str) -> pd.DataFrame:
+        """Fetch closes for several symbols in one spark request (columns: symbol, 'Close')."""
+        try:
+            params = {'symbols': ','.join(symbols), 'range': period, 'interval': interval}
+            response = http_get(SPARK_URL, headers={'User-Agent': 'Mozilla/5.0'}, params=params, timeout=30)
+            if response.status_code != 200:
+                print(f"WARNING: Spark request for {len(symbols)} symbols returned HTTP {response.status_code}")
+                return pd.DataFrame()
+
+            data = response.json()
+            # v8 returns {symbol: {...}}; v7 returns {'spark': {'result': [{'symbol', 'response': [chart]}]}}
+            if 'spark' in data:
+                entries = {}
+                for item in (data['spark'].get('result') or []):
+                    chart = (item.get('response') or [{}])[0]
+                    entries[item.get('symbol')] = {
+                        'timestamp': chart.get('timestamp', []),
+                        'close': chart.get('indicators', {}).get('quote', [{}])[0].get('close', []),
+                    }
+            else:
+                entries = data
+
+            frames = {}
+            for symbol in symbols:
+                entry = entries.get(symbol) or {}
+                timestamps = entry.get('timestamp') or []
+                closes = entry.get('close') or []
+                if timestamps and len(timestamps) == len(closes):
+                    df = pd.DataFrame({'Close': closes}, index=pd.to_datetime(timestamps, unit='s'))
+                    df.index.name = 'Date'
+                    frames[symbol] = df[~df.index.duplicated(keep='last')]
+            if not frames:
+                return pd.DataFrame()
+            return pd.concat(frames, axis=1)
+        except Exception as e:
+            print(f"Error fetching spark history for {','.join(symbols)}: {e}")
+            return pd.DataFrame()
+
     def get_info(self) -> dict:
         """Get stock info using yfinance with fallback."""
         try:
             import yfinance as yf
-            ticker = yf.Ticker(self.symbol)
-            return ticker.info
+            from .fundamentals_cache import get_info
+            from . import replay
+            return get_info(self.symbol, lambda: replay.call(
+                'yfinance', {'call': 'info', 'symbol': self.symbol}, lambda: yf.Ticker(self.symbol).info))
         except Exception as e:
             print(f"Error fetching info for {self.symbol}: {e}")
             return {}
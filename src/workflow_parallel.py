@@ -3,12 +3,20 @@ Parallel Pipeline for FinAgent Analysis
 
 Architecture:
 - Outer parallelism: 1-5 stock tickets in 5 threads
+- Steps 4-5 (Market, Global Economy) depend only on the period: computed once
+  per batch in the background while the tickets run their own Phase 1 steps,
+  memoized for SHARED_STEP_TTL seconds and fanned out to every ticket
+- Technical/quant indicators for all tickets are computed in one (time x symbol)
+  panel pass alongside them; a ticket's technical step looks its indicators up
+  if the panel is ready by then and otherwise computes them itself
 - Inner parallelism per ticket:
   - Steps 1-7 run in parallel
   - Steps 8.1 (Bull) and 8.2 (Bear) run in parallel after steps 1-7
   - Step 8.3 (Debate) runs after 8.1 and 8.2
   - Step 9 (Trading) runs after 8.3
   - Step 10 (Lesson Summary) runs in BACKGROUND after Step 9 (non-blocking)
+- LLM_ASYNC=1: Steps 8.1-9 await on one shared event loop (llm_client.run_async)
+  instead of each holding a pipeline thread plus a timeout thread
 """
 
 import os
@@ -17,9 +25,11 @@ import time
 import signal
 import logging
 import threading
+import asyncio
 import traceback
+import contextvars
 from typing import Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from datetime import datetime
 
 # Get logger for this module
@@ -51,11 +61,26 @@ from .agents.lesson_summary_agent import LessonSummaryAgent
 from .agents.quant_agent import QuantAgent
 from .utils.qdrant_utils import get_past_lessons, store_entry
 from .utils.cost_tracker import cost_tracker
+from .utils import llm_client, llm_scheduler
+from . import job_store
 
 # Configuration
 STEP_TIMEOUT = 180  # seconds per step
 MAX_WORKERS_INNER = 3  # parallel steps 1-7
 MAX_WORKERS_BULL_BEAR = 2  # parallel bull/bear
+SHARED_STEP_TTL = int(os.getenv("SHARED_STEP_TTL", "900"))  # seconds symbol-independent steps are reused
+SHARED_STEPS = ("market", "global_economic")  # depend only on investment_period
+MAX_WORKERS_QUANT = 5  # async Phase 2: one quant step per concurrent ticket
+
+# Async Phase 2 helpers: quant and the progress callbacks run here, never on the
+# shared LLM loop or its default executor, so they cannot stall the LLM coroutines
+_quant_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS_QUANT, thread_name_prefix="phase2-quant")
+_report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="phase2-report")
+
+# Memo for symbol-independent steps: (step_name, investment_period) -> (computed_at, StepResult)
+_shared_step_cache = {}
+_shared_step_inflight = {}  # (step_name, investment_period) -> threading.Event
+_shared_step_lock = threading.Lock()
 
 
 class StepResult:
@@ -77,7 +102,11 @@ def _run_step_with_timeout(func, *args, timeout: int = STEP_TIMEOUT, **kwargs) -
     from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
     start = time.time()
     with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(func, *args, **kwargs)
+        # Carry the job stream target into the worker thread; LLM calls still queued
+        # for a provider slot when the step times out are dropped instead of sent
+        context = contextvars.copy_context()
+        context.run(llm_scheduler.set_deadline, start + timeout)
+        future = executor.submit(context.run, func, *args, **kwargs)
         try:
             result = future.result(timeout=timeout)
             duration = time.time() - start
@@ -114,25 +143,89 @@ def _step_2_sentiment(symbol: str) -> Tuple[str, StepResult]:
     return ("sentiment", _run_step_with_timeout(_run))
 
 
-def _step_3_technical(symbol: str, investment_period: str) -> Tuple[str, StepResult]:
-    """Step 3: Technical Analysis."""
+def _step_3_technical(symbol: str, investment_period: str, indicator_panel: Optional[Future] = None) -> Tuple[str, StepResult]:
+    """Step 3: Technical Analysis (reads the batch indicator panel if it is already done)."""
     def _run():
+        if indicator_panel is not None and not indicator_panel.done():
+            # Waiting would spend this step's budget and hold a Phase 1 worker
+            logger.info(f" [{symbol}] Indicator panel not ready, computing indicators per symbol")
         return TechnicalAnalyst.analyze(symbol, investment_period)
     return ("technical", _run_step_with_timeout(_run))
 
 
+def _run_shared_step(step_name: str, investment_period: str, func) -> StepResult:
+    """
+    Run a symbol-independent step at most once per TTL window.
+
+    Concurrent callers for the same (step, period) wait on the in-flight run.
+    Only successful results are memoized.
+    """
+    key = (step_name, investment_period)
+    while True:
+        with _shared_step_lock:
+            cached = _shared_step_cache.get(key)
+            if cached and time.time() - cached[0] < SHARED_STEP_TTL:
+                logger.info(f"♻️ Shared step '{step_name}' ({investment_period}) cache hit (age {time.time() - cached[0]:.0f}s)")
+                return cached[1]
+            event = _shared_step_inflight.get(key)
+            if event is None:
+                event = threading.Event()
+                _shared_step_inflight[key] = event
+                break
+        # Another ticker is computing it; wait, then re-check the memo
+        if not event.wait(timeout=STEP_TIMEOUT + 10):
+            return _run_step_with_timeout(func)
+        with _shared_step_lock:
+            cached = _shared_step_cache.get(key)
+        if not cached:
+            return _run_step_with_timeout(func)
+
+    try:
+        result = _run_step_with_timeout(func)
+        if result.success:
+            with _shared_step_lock:
+                _shared_step_cache[key] = (time.time(), result)
+        return result
+    finally:
+        with _shared_step_lock:
+            _shared_step_inflight.pop(key, None)
+        event.set()
+
+
 def _step_4_market(investment_period: str) -> Tuple[str, StepResult]:
-    """Step 4: Market Overview."""
+    """Step 4: Market Overview (shared across tickers)."""
     def _run():
         return MarketAnalyst.analyze(investment_period)
-    return ("market", _run_step_with_timeout(_run))
+    return ("market", _run_shared_step("market", investment_period, _run))
 
 
 def _step_5_global_economic(investment_period: str) -> Tuple[str, StepResult]:
-    """Step 5: Global Economy."""
+    """Step 5: Global Economy (shared across tickers)."""
     def _run():
         return get_global_economic_analysis(investment_period)
-    return ("global_economic", _run_step_with_timeout(_run))
+    return ("global_economic", _run_shared_step("global_economic", investment_period, _run))
+
+
+SHARED_STEP_RUNNERS = {"market": _step_4_market, "global_economic": _step_5_global_economic}
+SHARED_STEP_NAMES = {"market": "Market Overview", "global_economic": "Global Economy"}
+
+
+def _start_shared_steps(executor: ThreadPoolExecutor, investment_period: str) -> Dict[str, Future]:
+    """Start steps 4-5 once for a whole batch (they depend only on investment_period)."""
+    return {name: executor.submit(runner, investment_period) for name, runner in SHARED_STEP_RUNNERS.items()}
+
+
+def _await_shared_step(symbol: str, step_name: str, shared: Future, investment_period: str,
+                       step_logs: list) -> Tuple[str, StepResult]:
+    """Result of a batch-wide shared step; a failed one is retried (single-flight) for this ticker."""
+    try:
+        name, result = shared.result(timeout=STEP_TIMEOUT + 10)
+        if result.success:
+            step_logs.append(f"♻️ [{symbol}] {SHARED_STEP_NAMES[name]} reused (shared across batch)")
+            return name, result
+    except Exception as e:
+        logger.warning(f" [{symbol}] Shared step {step_name} unavailable: {e}")
+    return SHARED_STEP_RUNNERS[step_name](investment_period)
 
 
 def _step_6_fund_holding(symbol: str) -> Tuple[str, StepResult]:
@@ -182,8 +275,10 @@ def _step_quant(symbol: str, investment_period: str, phase1_data: Dict) -> Tuple
     return ("quant", _run_step_with_timeout(_run))
 
 
-def _run_steps_1_to_7(symbol: str, investment_period: str, step_logs: list) -> Dict[str, StepResult]:
-    """Run steps 1-7 in parallel."""
+def _run_steps_1_to_7(symbol: str, investment_period: str, step_logs: list,
+                      shared_steps: Optional[Dict[str, Future]] = None,
+                      indicator_panel: Optional[Future] = None) -> Dict[str, StepResult]:
+    """Run steps 1-7 in parallel (steps in shared_steps are awaited from the batch, not rerun)."""
     logger.debug(f" [{symbol}] Running steps 1-7 in parallel")
     start = time.time()
 
@@ -198,16 +293,25 @@ def _run_steps_1_to_7(symbol: str, investment_period: str, step_logs: list) -> D
     }
 
     results = {}
+    shared_steps = shared_steps or {}
+
     with ThreadPoolExecutor(max_workers=MAX_WORKERS_INNER) as executor:
         futures = {
-            executor.submit(_step_1_fundamentals, symbol, investment_period): "fundamentals",
-            executor.submit(_step_2_sentiment, symbol): "sentiment",
-            executor.submit(_step_3_technical, symbol, investment_period): "technical",
-            executor.submit(_step_4_market, investment_period): "market",
-            executor.submit(_step_5_global_economic, investment_period): "global_economic",
-            executor.submit(_step_6_fund_holding, symbol): "fund_holding",
-            executor.submit(_step_7_past_lessons, symbol): "past_lessons",
+            executor.submit(contextvars.copy_context().run, _step_1_fundamentals, symbol, investment_period): "fundamentals",
+            executor.submit(contextvars.copy_context().run, _step_2_sentiment, symbol): "sentiment",
+            executor.submit(contextvars.copy_context().run, _step_6_fund_holding, symbol): "fund_holding",
+            executor.submit(contextvars.copy_context().run, _step_7_past_lessons, symbol): "past_lessons",
+            # After the other per-symbol steps, so the batch panel has had the longest to finish
+            executor.submit(contextvars.copy_context().run, _step_3_technical, symbol, investment_period, indicator_panel): "technical",
         }
+        # Submitted last, so waiting on the batch never holds a worker the steps above need
+        for step_name, runner in SHARED_STEP_RUNNERS.items():
+            if step_name in shared_steps:
+                future = executor.submit(_await_shared_step, symbol, step_name, shared_steps[step_name],
+                                         investment_period, step_logs)
+            else:
+                future = executor.submit(runner, investment_period)
+            futures[future] = step_name
 
         for future in as_completed(futures):
             step_name = futures[future]
@@ -234,20 +338,19 @@ def _run_steps_1_to_7(symbol: str, investment_period: str, step_logs: list) -> D
     return results
 
 
-def _step_8_1_bull(symbol: str, investment_period: str, steps_1_to_7: Dict[str, StepResult]) -> Tuple[str, StepResult]:
-    """Step 8.1: Bullish Analysis."""
-    def _run():
-        # Extract individual step outputs
-        fundamentals = steps_1_to_7.get("fundamentals", StepResult()).result or ""
-        sentiment = steps_1_to_7.get("sentiment", StepResult()).result or ""
-        technical = steps_1_to_7.get("technical", StepResult()).result or ""
-        market = steps_1_to_7.get("market", StepResult()).result or ""
-        global_economic = steps_1_to_7.get("global_economic", StepResult()).result or ""
-        fund_holding = steps_1_to_7.get("fund_holding", StepResult()).result or ""
-        past_lessons = steps_1_to_7.get("past_lessons", StepResult()).result or ""
-
-        # Build memory context from all steps
-        memory = f"""=== GLOBAL ECONOMIC DATA ===
+def _research_inputs(steps_1_to_7: Dict[str, StepResult]) -> Tuple[str, str, str, str, str]:
+    """(fundamentals, sentiment, technical, market, memory) for the bull/bear researchers."""
+    # Extract individual step outputs
+    fundamentals = steps_1_to_7.get("fundamentals", StepResult()).result or ""
+    sentiment = steps_1_to_7.get("sentiment", StepResult()).result or ""
+    technical = steps_1_to_7.get("technical", StepResult()).result or ""
+    market = steps_1_to_7.get("market", StepResult()).result or ""
+    global_economic = steps_1_to_7.get("global_economic", StepResult()).result or ""
+    fund_holding = steps_1_to_7.get("fund_holding", StepResult()).result or ""
+    past_lessons = steps_1_to_7.get("past_lessons", StepResult()).result or ""
+
+    # Build memory context from all steps
+    memory = f"""=== GLOBAL ECONOMIC DATA ===
 {global_economic}
 
 === FUND HOLDING CHANGES ===
@@ -255,50 +358,20 @@ def _step_8_1_bull(symbol: str, investment_period: str, steps_1_to_7: Dict[str,
 
 === PAST LESSONS ===
 {past_lessons}"""
+    return fundamentals, sentiment, technical, market, memory
 
-        return BullishResearcher.analyze(
-            symbol,
-            investment_period,
-            fundamentals,
-            sentiment,
-            technical,
-            market,
-            memory
-        )
+
+def _step_8_1_bull(symbol: str, investment_period: str, steps_1_to_7: Dict[str, StepResult]) -> Tuple[str, StepResult]:
+    """Step 8.1: Bullish Analysis."""
+    def _run():
+        return BullishResearcher.analyze(symbol, investment_period, *_research_inputs(steps_1_to_7))
     return ("bull", _run_step_with_timeout(_run))
 
 
 def _step_8_2_bear(symbol: str, investment_period: str, steps_1_to_7: Dict[str, StepResult]) -> Tuple[str, StepResult]:
     """Step 8.2: Bearish Analysis."""
     def _run():
-        # Extract individual step outputs
-        fundamentals = steps_1_to_7.get("fundamentals", StepResult()).result or ""
-        sentiment = steps_1_to_7.get("sentiment", StepResult()).result or ""
-        technical = steps_1_to_7.get("technical", StepResult()).result or ""
-        market = steps_1_to_7.get("market", StepResult()).result or ""
-        global_economic = steps_1_to_7.get("global_economic", StepResult()).result or ""
-        fund_holding = steps_1_to_7.get("fund_holding", StepResult()).result or ""
-        past_lessons = steps_1_to_7.get("past_lessons", StepResult()).result or ""
-
-        # Build memory context from all steps
-        memory = f"""=== GLOBAL ECONOMIC DATA ===
-{global_economic}
-
-=== FUND HOLDING CHANGES ===
-{fund_holding}
-
-=== PAST LESSONS ===
-{past_lessons}"""
-
-        return BearishResearcher.analyze(
-            symbol,
-            investment_period,
-            fundamentals,
-            sentiment,
-            technical,
-            market,
-            memory
-        )
+        return BearishResearcher.analyze(symbol, investment_period, *_research_inputs(steps_1_to_7))
     return ("bear", _run_step_with_timeout(_run))
 
 
@@ -348,13 +421,8 @@ def _run_steps_8_1_and_8_2(symbol: str, investment_period: str, steps_1_to_7: Di
     return results
 
 
-def _step_8_3_debate(bull_result: str, bear_result: str, investment_period: str) -> Tuple[str, StepResult]:
-    """Step 8.3: Debate Summary."""
-    def _run():
-        # Append Warren Buffett's core thinkings for long-term analysis
-        buffett_context = ""
-        if investment_period == "long":
-            buffett_context = """
+# Appended to the bear case for long-term debates
+BUFFETT_CONTEXT = """
 
 ---
 
@@ -386,20 +454,30 @@ When evaluating this long-term investment, please consider Warren Buffett's foun
 
 ---
 Please incorporate these principles into your long-term investment debate summary."""
-        return DebateAgent.summarize(bull_result, bear_result + buffett_context, investment_period)
-    return ("debate", _run_step_with_timeout(_run))
 
 
-def _step_9_trading(symbol: str, investment_period: str, debate_result: str,
-                    quant_result: str = None, technical_result: str = None) -> Tuple[str, StepResult]:
-    """Step 9: Trading Plan (with optional quant and technical data)."""
+def _debate_bear_input(bear_result: str, investment_period: str) -> str:
+    """Bear case for the debate, with Warren Buffett's core thinkings for long-term analysis."""
+    if investment_period == "long":
+        return bear_result + BUFFETT_CONTEXT
+    return bear_result
+
+
+def _step_8_3_debate(bull_result: str, bear_result: str, investment_period: str) -> Tuple[str, StepResult]:
+    """Step 8.3: Debate Summary."""
     def _run():
-        # Combine debate, quant, and technical for comprehensive trading decision
-        combined_input = debate_result
+        return DebateAgent.summarize(bull_result, _debate_bear_input(bear_result, investment_period), investment_period)
+    return ("debate", _run_step_with_timeout(_run))
 
-        # Add quant signals if available
-        if quant_result and quant_result != "[ERROR] Quant analysis failed":
-            combined_input = f"""{debate_result}
+
+def _trading_input(debate_result: str, quant_result: str = None, technical_result: str = None) -> str:
+    """Trading plan input: debate summary plus quant signals and technical indicators when available."""
+    # Combine debate, quant, and technical for comprehensive trading decision
+    combined_input = debate_result
+
+    # Add quant signals if available
+    if quant_result and quant_result != "[ERROR] Quant analysis failed":
+        combined_input = f"""{debate_result}
 
 ---
 
@@ -418,9 +496,9 @@ Please incorporate the above quant signals into your trading decision. The quant
 
 Use this data to validate or adjust your qualitative analysis."""
 
-        # Add technical indicators if available
-        if technical_result and technical_result != "[ERROR] Technical analysis failed":
-            combined_input = f"""{combined_input}
+    # Add technical indicators if available
+    if technical_result and technical_result != "[ERROR] Technical analysis failed":
+        combined_input = f"""{combined_input}
 
 ---
 
@@ -442,10 +520,88 @@ Use these indicators to:
 3. Determine stop-loss based on ATR and Bollinger Bands
 4. Identify optimal entry timing using RSI and MACD"""
 
-        return TradingAgent.decide(symbol, investment_period, combined_input)
+    return combined_input
+
+
+def _step_9_trading(symbol: str, investment_period: str, debate_result: str,
+                    quant_result: str = None, technical_result: str = None) -> Tuple[str, StepResult]:
+    """Step 9: Trading Plan (with optional quant and technical data)."""
+    def _run():
+        return TradingAgent.decide(symbol, investment_period, _trading_input(debate_result, quant_result, technical_result))
     return ("trading", _run_step_with_timeout(_run))
 
 
+async def _arun_step_with_timeout(coro_func, *args, timeout: int = STEP_TIMEOUT, **kwargs) -> StepResult:
+    """_run_step_with_timeout() for a coroutine function on the shared LLM event loop."""
+    start = time.time()
+    try:
+        result = await asyncio.wait_for(coro_func(*args, **kwargs), timeout)
+        return StepResult(result=result, duration=time.time() - start)
+    except asyncio.TimeoutError:
+        duration = time.time() - start
+        error_msg = f"Timeout: Step did not complete within {timeout}s"
+        logger.error(f" Step timed out after {timeout}s")
+        return StepResult(error=error_msg, duration=duration)
+    except MemoryError:
+        duration = time.time() - start
+        error_msg = "MemoryError: Not enough memory to complete this step"
+        logger.error(f" Step failed (memory): {error_msg}")
+        return StepResult(error=error_msg, duration=duration)
+    except Exception as e:
+        duration = time.time() - start
+        error_msg = f"{type(e).__name__}: {str(e)}"
+        logger.error(f" Step failed after {duration:.1f}s: {error_msg}")
+        traceback.print_exc()
+        return StepResult(error=error_msg, duration=duration)
+
+
+async def _astep_8_1_bull(symbol: str, investment_period: str, steps_1_to_7: Dict[str, StepResult]) -> Tuple[str, StepResult]:
+    """Step 8.1 (async)."""
+    return ("bull", await _arun_step_with_timeout(
+        BullishResearcher.aanalyze, symbol, investment_period, *_research_inputs(steps_1_to_7)))
+
+
+async def _astep_8_2_bear(symbol: str, investment_period: str, steps_1_to_7: Dict[str, StepResult]) -> Tuple[str, StepResult]:
+    """Step 8.2 (async)."""
+    return ("bear", await _arun_step_with_timeout(
+        BearishResearcher.aanalyze, symbol, investment_period, *_research_inputs(steps_1_to_7)))
+
+
+async def _astep_8_3_debate(bull_result: str, bear_result: str, investment_period: str) -> Tuple[str, StepResult]:
+    """Step 8.3 (async)."""
+    return ("debate", await _arun_step_with_timeout(
+        DebateAgent.asummarize, bull_result, _debate_bear_input(bear_result, investment_period), investment_period))
+
+
+async def _astep_9_trading(symbol: str, investment_period: str, debate_result: str,
+                           quant_result: str = None, technical_result: str = None) -> Tuple[str, StepResult]:
+    """Step 9 (async)."""
+    return ("trading", await _arun_step_with_timeout(
+        TradingAgent.adecide, symbol, investment_period, _trading_input(debate_result, quant_result, technical_result)))
+
+
+async def _arun_phase_2(symbol: str, investment_period: str, steps_1_to_7: Dict[str, StepResult], on_done) -> None:
+    """
+    Bull and bear as coroutines plus quant on the dedicated quant executor;
+    on_done(name, StepResult) is called as each one finishes.
+
+    on_done takes the job store lock, so it runs on the report executor rather
+    than blocking the shared loop.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def _report(step):
+        name, step_result = await step
+        await loop.run_in_executor(_report_executor, contextvars.copy_context().run, on_done, name, step_result)
+
+    await asyncio.gather(
+        _report(_astep_8_1_bull(symbol, investment_period, steps_1_to_7)),
+        _report(_astep_8_2_bear(symbol, investment_period, steps_1_to_7)),
+        _report(loop.run_in_executor(_quant_executor, contextvars.copy_context().run,
+                                     _step_quant, symbol, investment_period, steps_1_to_7)),
+    )
+
+
 def _step_10_lesson_summary(
     symbol: str,
     investment_period: str,
@@ -481,13 +637,31 @@ def _step_10_lesson_summary(
     return ("lesson_summary", _run_step_with_timeout(_run))
 
 
-def run_single_ticket_pipeline(symbol: str, investment_period: str, job_id: str = None) -> Dict[str, Any]:
+def run_single_ticket_pipeline(symbol: str, investment_period: str, job_id: str = None,
+                               shared_steps: Optional[Dict[str, Future]] = None,
+                               indicator_panel: Optional[Future] = None) -> Dict[str, Any]:
     """
     Run the complete analysis pipeline for a single stock ticket.
 
+    Args:
+        shared_steps: Batch-wide symbol-independent steps (market, global_economic) being computed by the batch runner
+        indicator_panel: Batch indicator panel being computed by the batch runner
+
     Returns:
         Dict with all results including timing, errors, and step logs.
     """
+    # LLM calls made on behalf of this ticker stream their partial output to the job
+    stream_token = job_store.set_stream_target(job_id, symbol)
+    try:
+        return _run_single_ticket_pipeline(symbol, investment_period, job_id, shared_steps, indicator_panel)
+    finally:
+        job_store.reset_stream_target(stream_token)
+
+
+def _run_single_ticket_pipeline(symbol: str, investment_period: str, job_id: str = None,
+                                shared_steps: Optional[Dict[str, Future]] = None,
+                                indicator_panel: Optional[Future] = None) -> Dict[str, Any]:
+    """run_single_ticket_pipeline() body, run with the job stream target set."""
     pipeline_start = time.time()
     step_logs = []
     # Reset cost tracker for this analysis run
@@ -545,7 +719,7 @@ def run_single_ticket_pipeline(symbol: str, investment_period: str, job_id: str
     # Phase 1: Run steps 1-7 in parallel
     _report_progress("phase1", "running", f"🔄 [{symbol}] Starting Phase 1: Data Collection...")
     try:
-        steps_1_to_7 = _run_steps_1_to_7(symbol, investment_period, step_logs)
+        steps_1_to_7 = _run_steps_1_to_7(symbol, investment_period, step_logs, shared_steps, indicator_panel)
         result["steps"].update({k: v.result if v.success else f"[ERROR] {v.error}"
                                for k, v in steps_1_to_7.items()})
 
@@ -588,47 +762,49 @@ def run_single_ticket_pipeline(symbol: str, investment_period: str, job_id: str
     quant_result = StepResult(error="Not started")
 
     try:
-        # Run bull/bear and quant in parallel
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = {
-                executor.submit(_step_8_1_bull, symbol, investment_period, steps_1_to_7): "bull",
-                executor.submit(_step_8_2_bear, symbol, investment_period, steps_1_to_7): "bear",
-                executor.submit(_step_quant, symbol, investment_period, steps_1_to_7): "quant",
-            }
+        phase2_results = {}
 
-            for future in as_completed(futures):
-                step_name = futures[future]
-                try:
-                    name, step_result = future.result(timeout=STEP_TIMEOUT + 10)
-                    if step_name == "bull":
-                        bull_result = step_result
-                        result["steps"]["bull"] = step_result.result if step_result.success else f"[ERROR] {step_result.error}"
-                    elif step_name == "bear":
-                        bear_result = step_result
-                        result["steps"]["bear"] = step_result.result if step_result.success else f"[ERROR] {step_result.error}"
-                    elif step_name == "quant":
-                        quant_result = step_result
-                        result["steps"]["quant"] = step_result.result if step_result.success else f"[ERROR] {step_result.error}"
-
-                    # Report progress for each completed step
-                    display_name = step_display_names.get(step_name, step_name)
-                    if step_result.success:
-                        _report_progress(step_name, "completed", f"✅ [{symbol}] {display_name} completed ({round(step_result.duration / 60, 2)} min)")
-                    else:
-                        _report_progress(step_name, "failed", f"❌ [{symbol}] {display_name} failed: {step_result.error[:100]}")
-
-                    status = "✓" if step_result.success else "✗"
-                    logger.debug(f" [{symbol}] Step {step_name} {status} ({step_result.duration:.1f}s)")
-                except Exception as e:
-                    error_msg = f"Future error: {type(e).__name__}: {str(e)}"
-                    if step_name == "bull":
-                        bull_result = StepResult(error=error_msg)
-                    elif step_name == "bear":
-                        bear_result = StepResult(error=error_msg)
-                    elif step_name == "quant":
-                        quant_result = StepResult(error=error_msg)
-                    _report_progress(step_name, "failed", f"❌ [{symbol}] {step_display_names.get(step_name, step_name)} failed: {error_msg[:100]}")
-                    logger.debug(f" [{symbol}] Step {step_name} ✗ ({error_msg})")
+        def _on_phase2_done(step_name, step_result):
+            phase2_results[step_name] = step_result
+            result["steps"][step_name] = step_result.result if step_result.success else f"[ERROR] {step_result.error}"
+
+            # Report progress for each completed step
+            display_name = step_display_names.get(step_name, step_name)
+            if step_result.success:
+                _report_progress(step_name, "completed", f"✅ [{symbol}] {display_name} completed ({round(step_result.duration / 60, 2)} min)")
+            else:
+                _report_progress(step_name, "failed", f"❌ [{symbol}] {display_name} failed: {step_result.error[:100]}")
+
+            status = "✓" if step_result.success else "✗"
+            logger.debug(f" [{symbol}] Step {step_name} {status} ({step_result.duration:.1f}s)")
+
+        if llm_client.LLM_ASYNC:
+            # Bull/bear await on the shared event loop instead of holding two threads each
+            llm_client.run_async(_arun_phase_2(symbol, investment_period, steps_1_to_7, _on_phase2_done),
+                                 timeout=STEP_TIMEOUT + 10)
+        else:
+            # Run bull/bear and quant in parallel
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = {
+                    executor.submit(contextvars.copy_context().run, _step_8_1_bull, symbol, investment_period, steps_1_to_7): "bull",
+                    executor.submit(contextvars.copy_context().run, _step_8_2_bear, symbol, investment_period, steps_1_to_7): "bear",
+                    executor.submit(contextvars.copy_context().run, _step_quant, symbol, investment_period, steps_1_to_7): "quant",
+                }
+
+                for future in as_completed(futures):
+                    step_name = futures[future]
+                    try:
+                        name, step_result = future.result(timeout=STEP_TIMEOUT + 10)
+                        _on_phase2_done(step_name, step_result)
+                    except Exception as e:
+                        error_msg = f"Future error: {type(e).__name__}: {str(e)}"
+                        phase2_results[step_name] = StepResult(error=error_msg)
+                        _report_progress(step_name, "failed", f"❌ [{symbol}] {step_display_names.get(step_name, step_name)} failed: {error_msg[:100]}")
+                        logger.debug(f" [{symbol}] Step {step_name} ✗ ({error_msg})")
+
+        bull_result = phase2_results.get("bull", bull_result)
+        bear_result = phase2_results.get("bear", bear_result)
+        quant_result = phase2_results.get("quant", quant_result)
 
         # Log completion
         if bull_result.success:
@@ -674,9 +850,14 @@ def run_single_ticket_pipeline(symbol: str, investment_period: str, job_id: str
     debate_result = StepResult(error="Skipped")
     try:
         if bull_result.success and bear_result.success:
-            debate_name, debate_result = _step_8_3_debate(
-                bull_result.result, bear_result.result, investment_period
-            )
+            if llm_client.LLM_ASYNC:
+                debate_name, debate_result = llm_client.run_async(_astep_8_3_debate(
+                    bull_result.result, bear_result.result, investment_period
+                ))
+            else:
+                debate_name, debate_result = _step_8_3_debate(
+                    bull_result.result, bear_result.result, investment_period
+                )
             result["steps"]["debate"] = debate_result.result if debate_result.success else f"[ERROR] {debate_result.error}"
 
             if debate_result.success:
@@ -713,9 +894,14 @@ def run_single_ticket_pipeline(symbol: str, investment_period: str, job_id: str
             # Get quant and technical results (may have failed)
             quant_text = quant_result.result if quant_result.success else None
             technical_text = steps_1_to_7.get("technical", StepResult()).result if steps_1_to_7.get("technical", StepResult()).success else None
-            trading_name, trading_result = _step_9_trading(
-                symbol, investment_period, debate_result.result, quant_text, technical_text
-            )
+            if llm_client.LLM_ASYNC:
+                trading_name, trading_result = llm_client.run_async(_astep_9_trading(
+                    symbol, investment_period, debate_result.result, quant_text, technical_text
+                ))
+            else:
+                trading_name, trading_result = _step_9_trading(
+                    symbol, investment_period, debate_result.result, quant_text, technical_text
+                )
             result["steps"]["trading"] = trading_result.result if trading_result.success else f"[ERROR] {trading_result.error}"
 
             if trading_result.success:
@@ -823,11 +1009,40 @@ def run_batch_pipeline(symbols: list, investment_period: str, job_id: str = None
                 if log_msg:
                     _jobs[job_id]["step_logs"].append(log_msg)
 
+    # Batch-wide work runs in the background, overlapping every ticker's Phase 1:
+    # symbol-independent steps (market, global economy) and the indicator panel
+    batch_symbols = [s.strip().upper() for s in symbols]
+    prep_start = time.time()
+    prep_executor = ThreadPoolExecutor(max_workers=len(SHARED_STEPS) + 1, thread_name_prefix="batch-prep")
+    shared_steps = _start_shared_steps(prep_executor, investment_period)
+    indicator_panel = prep_executor.submit(TechnicalAnalyst.prime_batch, batch_symbols, investment_period)
+    prep_executor.shutdown(wait=False)
+
+    def _on_shared_step_done(future):
+        name, step_result = future.result()
+        # Failed shared steps are retried by each ticker in Phase 1 (see _await_shared_step)
+        if step_result.success:
+            print(f"BATCH: shared step {name} ready in {time.time() - prep_start:.1f}s for {len(symbols)} symbols")
+            _update_job_progress("ALL", f"shared_{name}", "completed",
+                                 f"♻️ {SHARED_STEP_NAMES[name]} computed once for {len(symbols)} symbol(s)")
+
+    def _on_panel_done(future):
+        try:
+            print(f"BATCH: indicator panel for {future.result()} symbols ready in {time.time() - prep_start:.1f}s")
+        except Exception as e:
+            # Not fatal: each ticker computes its own indicators in Phase 1
+            print(f"WARNING: Indicator panel failed, falling back to per-symbol: {e}")
+
+    for future in shared_steps.values():
+        future.add_done_callback(_on_shared_step_done)
+    indicator_panel.add_done_callback(_on_panel_done)
+
     # Outer parallelism: run each symbol in parallel
     try:
         with ThreadPoolExecutor(max_workers=5) as executor:
             futures = {
-                executor.submit(run_single_ticket_pipeline, symbol.strip().upper(), investment_period, job_id=job_id): symbol
+                executor.submit(run_single_ticket_pipeline, symbol.strip().upper(), investment_period,
+                                job_id=job_id, shared_steps=shared_steps, indicator_panel=indicator_panel): symbol
                 for symbol in symbols
             }
 
@@ -0,0 +1,100 @@
+"""
+Shared setup for the offline tests.
+
+The test files run as scripts (python test/test_x.py) and are also collected by
+pytest. Both ways, a test's temporary state is built from these helpers and
+undone afterwards, even when the test fails.
+
+Usage:
+    from _helpers import patched, patched_env, running_job, using
+
+    @contextmanager
+    def _store():
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory, \\
+                patched(bar_store, BAR_STORE_DIR=directory):
+            yield directory
+
+    @using(_store)
+    def test_something(directory):
+        ...
+"""
+
+import os
+from contextlib import contextmanager
+
+_MISSING = object()
+
+
+@contextmanager
+def patched(target, **attrs):
+    """Set attributes of a module (or object) for the block, restoring the old values after."""
+    old = {name: getattr(target, name, _MISSING) for name in attrs}
+    for name, value in attrs.items():
+        setattr(target, name, value)
+    try:
+        yield target
+    finally:
+        for name, value in old.items():
+            if value is _MISSING:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
+
+
+@contextmanager
+def patched_env(**values):
+    """
+    Set (str) or unset (None) environment variables for the block.
+
+    Every named variable is restored afterwards, including ones the test body
+    changed itself.
+    """
+    old = {name: os.environ.get(name) for name in values}
+    try:
+        for name, value in values.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        yield
+    finally:
+        for name, value in old.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@contextmanager
+def running_job(job_id: str, symbol: str = 'TEST'):
+    """A running job in the job store that this context streams to (removed afterwards)."""
+    from src import job_store
+    from src.job_store import _jobs, _jobs_lock
+
+    with _jobs_lock:
+        _jobs[job_id] = {"status": "running", "result": None, "error": None,
+                         "step_logs": [], "progress": {}, "streams": {}}
+    token = job_store.set_stream_target(job_id, symbol)
+    try:
+        yield job_id
+    finally:
+        job_store.reset_stream_target(token)
+        with _jobs_lock:
+            _jobs.pop(job_id, None)
+
+
+def using(setup):
+    """
+    Decorator running a test inside setup(), a context manager factory.
+
+    The test receives what setup yields (no argument if it yields None). The
+    wrapper itself takes no arguments, so pytest calls it like a plain test.
+    """
+    def decorator(test):
+        def wrapper():
+            with setup() as value:
+                return test() if value is None else test(value)
+        wrapper.__name__ = test.__name__
+        wrapper.__doc__ = test.__doc__
+        return wrapper
+    return decorator
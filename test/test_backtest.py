@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the walk-forward backtester (offline, synthetic bars in a temporary bar store).
+
+Usage:
+    python test/test_backtest.py
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from _helpers import patched
+from src import backtest
+from src.utils import bar_store, indicator_engine
+
+
+def _make_bars(n: int = 800, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, n)))
+    return pd.DataFrame({
+        'Open': close,
+        'High': close * (1 + rng.random(n) * 0.015),
+        'Low': close * (1 - rng.random(n) * 0.015),
+        'Close': close,
+        'Volume': rng.random(n) * 1e6 + 1,
+    }, index=pd.date_range('2021-01-01', periods=n, freq='B'))
+
+
+def _reference_r(high, low, close, atr, horizon, i):
+    """Per-trade loop of the 1R stop / 0.9R partial / target / time-stop rules."""
+    if not np.isfinite(atr[i]):
+        return None
+    risk = 1.5 * atr[i]
+    entry, target = close[i], close[i] + 3.0 * atr[i]
+    partial = False
+    for j in range(i + 1, i + horizon + 1):
+        if j >= len(close):
+            return None
+        if not partial:
+            if low[j] <= entry - risk:
+                return -1.0
+            if high[j] >= entry + 0.9 * risk:
+                partial = True
+                if high[j] >= target:
+                    return 0.45 + 0.5 * 2.0
+        else:
+            if low[j] <= entry:
+                return 0.45
+            if high[j] >= target:
+                return 0.45 + 0.5 * 2.0
+    time_r = (close[i + horizon] - entry) / risk
+    return 0.45 + 0.5 * time_r if partial else time_r
+
+
+def test_exits_match_loop():
+    df = _make_bars()
+    high, low, close = df['High'].values, df['Low'].values, df['Close'].values
+    atr = indicator_engine.compute(df)['ATR_14'].values
+    result = backtest.simulate_long(high, low, close, atr, horizon=15)
+    for i in range(len(df)):
+        expected = _reference_r(high, low, close, atr, 15, i)
+        if expected is None:
+            assert not result['valid'][i], f"bar {i} should be unresolved"
+        else:
+            assert result['valid'][i] and abs(result['r'][i] - expected) < 1e-9, f"bar {i} R differs"
+    print("✓ Vectorized exits match the per-trade loop")
+
+
+def test_run_backtest_offline():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as store_dir, \
+            patched(bar_store, BAR_STORE_DIR=store_dir):
+        for i, symbol in enumerate(['AAA', 'BBB']):
+            bars = _make_bars(seed=i)
+            bar_store.save(symbol, '1d', bars, bar_store.make_meta(bars.index[0].to_pydatetime()))
+        result = backtest.run_backtest(['AAA', 'BBB', 'MISSING'], 'short', '5y', offline=True)
+        assert result['symbols'] == 2
+        summary = result['summary']
+        assert list(summary.index) == list(backtest.STRATEGIES)
+        assert summary.loc['signal', 'trades'] >= summary.loc['signal+regime', 'trades']
+        assert 0 <= summary.loc['signal', 'hit_rate'] <= 1
+        report = backtest.format_report(result, 'short')
+        assert 'Expectancy (R) by Year' in report
+    print("✓ Offline backtest over the bar store")
+
+
+def main():
+    test_exits_match_loop()
+    test_run_backtest_offline()
+    print("\nAll backtest tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
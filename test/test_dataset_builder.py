@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the cross-sectional meta-label dataset builder (offline, synthetic bars
+written to a temporary bar store).
+
+Usage:
+    python test/test_dataset_builder.py
+"""
+
+import sys
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from _helpers import patched, using
+from src.utils import dataset_builder, bar_store
+
+SYMBOLS = ['AAA', 'BBB', 'CCC']
+
+
+def _make_bars(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.random(n) * 1e6 + 1,
+    }, index=pd.date_range('2020-01-01', periods=n))
+
+
+@contextmanager
+def _store():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as store_dir, \
+            tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as dataset_dir, \
+            patched(bar_store, BAR_STORE_DIR=store_dir), \
+            patched(dataset_builder, DATASET_DIR=dataset_dir, DATASET_OFFLINE=True):
+        for i, symbol in enumerate(SYMBOLS):
+            bars = _make_bars(600 + 100 * i, seed=i)
+            bar_store.save(symbol, '1d', bars, bar_store.make_meta(bars.index[0].to_pydatetime()))
+        yield
+
+
+@using(_store)
+def test_build_and_reuse():
+    dataset = dataset_builder.load_or_build(symbols=SYMBOLS)
+    expected_rows = sum(len(dataset_builder.training_rows(bar_store.load(s, '1d')[0])[0]) for s in SYMBOLS)
+    assert dataset['X'].shape == (expected_rows, len(dataset_builder.FEATURE_COLUMNS))
+    assert dataset['X'].dtype == np.float32 and isinstance(dataset['X'], np.memmap)
+    assert np.isfinite(dataset['X']).all()
+    assert set(np.unique(dataset['y'])) <= {0, 1, 2}
+    assert dataset['symbols'] == SYMBOLS
+
+    reused = dataset_builder.load_or_build(symbols=SYMBOLS)
+    assert reused['meta']['build'] == dataset['meta']['build'], "fresh dataset should be reused"
+    print("✓ Universe dataset is built once and reopened as memory maps")
+
+
+@using(_store)
+def test_features_match_inference_row():
+    bars = bar_store.load('AAA', '1d')[0]
+    features = dataset_builder.feature_frame(bars)
+    truncated = dataset_builder.feature_frame(bars.iloc[:400])
+    # Features at a bar only depend on bars up to it (no look-ahead)
+    assert np.allclose(features.iloc[399].to_numpy(), truncated.iloc[-1].to_numpy())
+    assert features['adx'].notna().all()
+    print("✓ Per-bar features have no look-ahead")
+
+
+@using(_store)
+def test_label_horizon_follows_period():
+    from src.utils import triple_barrier
+    short = dataset_builder.load_or_build(symbols=SYMBOLS, investment_period='short+')
+    long = dataset_builder.load_or_build(symbols=SYMBOLS, investment_period='long')
+    assert short['meta']['label_horizon'] == triple_barrier.horizon_bars(triple_barrier.PERIOD_DAYS['short+'])
+    assert long['meta']['label_horizon'] == triple_barrier.horizon_bars(triple_barrier.PERIOD_DAYS['long'])
+    assert short['meta']['build'] != long['meta']['build'], "each period keeps its own dataset"
+
+    bars = bar_store.load('AAA', '1d')[0]
+    _, labels = dataset_builder.training_rows(bars, 'long')
+    expected = dataset_builder.label_series(bars, long['meta']['label_horizon'])
+    assert (labels.to_numpy() == expected.loc[labels.index].to_numpy()).all()
+    print("✓ Labels use the investment period's vertical barrier")
+
+
+def main():
+    test_build_and_reuse()
+    test_features_match_inference_row()
+    test_label_horizon_follows_period()
+    print("\nAll dataset builder tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
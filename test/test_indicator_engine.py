@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized indicator engine against the reference pandas formulas (offline).
+
+Usage:
+    python test/test_indicator_engine.py
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import indicator_engine
+
+
+def _make_ohlcv(n: int = 400, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    index = pd.date_range('2023-01-02', periods=n, freq='B', name='Date')
+    return pd.DataFrame({
+        'Open': close,
+        'High': close * (1 + rng.uniform(0, 0.02, n)),
+        'Low': close * (1 - rng.uniform(0, 0.02, n)),
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 50_000_000, n).astype(float),
+    }, index=index)
+
+
+def _assert_close(actual, expected, name):
+    actual = np.asarray(actual, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    assert (np.isnan(actual) == np.isnan(expected)).all(), f"{name}: NaN layout differs"
+    assert np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True), f"{name}: values differ"
+
+
+def test_matches_pandas():
+    df = _make_ohlcv()
+    close = df['Close']
+    indicators = indicator_engine.compute(df)
+
+    _assert_close(indicators['SMA_50'], close.rolling(50).mean(), 'SMA-50')
+    _assert_close(indicators['EMA_10'], close.ewm(span=10, adjust=False).mean(), 'EMA-10')
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(36).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(36).mean()
+    _assert_close(indicators['RSI_36'], 100 - 100 / (1 + gain / loss), 'RSI-36')
+
+    _assert_close(indicators['BB_UPPER_36'], close.rolling(36).mean() + 2 * close.rolling(36).std(), 'BB upper')
+
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    _assert_close(indicators['MACD_12_26_9'], macd, 'MACD')
+    _assert_close(indicators['MACD_SIGNAL_12_26_9'], macd.ewm(span=9, adjust=False).mean(), 'MACD signal')
+
+    typical = (df['High'] + df['Low'] + close) / 3
+    _assert_close(indicators['VWAP'], (typical * df['Volume']).cumsum() / df['Volume'].cumsum(), 'VWAP')
+
+    tr = pd.concat([df['High'] - df['Low'], abs(df['High'] - close.shift()),
+                    abs(df['Low'] - close.shift())], axis=1).max(axis=1)
+    _assert_close(indicators['ATR_14'], tr.rolling(14).mean(), 'ATR-14')
+    _assert_close(indicators['VOLATILITY_20'], close.pct_change().rolling(20).std() * np.sqrt(252), 'Volatility-20')
+    _assert_close(indicators['VOLUME_STD_20'], df['Volume'].rolling(20).std(), 'Volume std')
+    print("✓ Engine matches pandas reference formulas")
+
+
+def test_panel_columns_match_single_symbol():
+    df = _make_ohlcv()
+    start = 150  # second symbol listed later: leading NaN rows
+    panel = {}
+    for name in ('High', 'Low', 'Close', 'Volume'):
+        values = np.full((len(df), 2), np.nan)
+        values[:, 0] = df[name].values
+        values[start:, 1] = df[name].values[start:]
+        panel[name] = values
+
+    arrays = indicator_engine.compute_arrays(panel['High'], panel['Low'], panel['Close'], panel['Volume'])
+    single = indicator_engine.compute(df.iloc[start:])
+    for name, values in arrays.items():
+        _assert_close(values[start:, 1], single[name], f"panel {name}")
+        assert np.isnan(values[:start, 1]).all(), f"panel {name}: values before first bar"
+    print("✓ 2-D panel columns match single-symbol results")
+
+
+def test_compute_panel_seeds_memo():
+    frames = {'AAA': _make_ohlcv(seed=1), 'BBB': _make_ohlcv(n=250, seed=2)}
+    indicator_engine.clear()
+    panel = indicator_engine.compute_panel(frames)
+
+    calls = []
+    original = indicator_engine.compute_arrays
+    indicator_engine.compute_arrays = lambda *a, **k: calls.append(1) or original(*a, **k)
+    try:
+        for symbol, df in frames.items():
+            single = indicator_engine.compute(df.copy())
+            for name in single.columns:
+                _assert_close(panel[symbol][name], single[name], f"{symbol} {name}")
+    finally:
+        indicator_engine.compute_arrays = original
+    assert not calls, "per-symbol compute() should be served from the panel memo"
+    print("✓ Panel pass seeds per-symbol results")
+
+
+def test_on_demand_indicator():
+    df = _make_ohlcv()
+    sma_36 = indicator_engine.get(df, 'SMA', 36)
+    _assert_close(sma_36, df['Close'].rolling(36).mean(), 'SMA-36 (on demand)')
+    print("✓ Indicators outside the default spec are computed on demand")
+
+
+def test_swing_points_and_clustering():
+    df = _make_ohlcv()
+    high, low = df['High'].values, df['Low'].values
+    is_high, is_low = indicator_engine.swing_points(high, low, 5)
+    expected_high = [i for i in range(5, len(df) - 5) if high[i] == max(high[i - 5:i + 6])]
+    expected_low = [i for i in range(5, len(df) - 5) if low[i] == min(low[i - 5:i + 6])]
+    assert list(np.nonzero(is_high)[0]) == expected_high, "swing highs differ from loop"
+    assert list(np.nonzero(is_low)[0]) == expected_low, "swing lows differ from loop"
+
+    centers, touches = indicator_engine.cluster_levels([10.0, 10.2, 10.3, 15.0, 15.1, 20.0], 0.25)
+    assert np.allclose(centers, [30.5 / 3, 15.05, 20.0])
+    assert list(touches) == [3, 2, 1]
+    print("✓ Swing points match the loop; nearby levels are clustered")
+
+
+def main():
+    test_matches_pandas()
+    test_panel_columns_match_single_symbol()
+    test_compute_panel_seeds_memo()
+    test_on_demand_indicator()
+    test_swing_points_and_clustering()
+    print("\nAll indicator engine tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test incremental indicator state against the vectorized indicator engine (offline).
+
+Usage:
+    python test/test_indicator_state.py
+"""
+
+import sys
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from _helpers import patched, using
+from src.utils import indicator_engine
+from src.utils import indicator_state
+
+
+def _make_ohlcv(n: int = 700, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    index = pd.date_range('2023-01-02 14:30', periods=n, freq='30min', name='Date')
+    return pd.DataFrame({
+        'Open': close,
+        'High': close * (1 + rng.uniform(0, 0.01, n)),
+        'Low': close * (1 - rng.uniform(0, 0.01, n)),
+        'Close': close,
+        'Volume': rng.integers(10_000, 5_000_000, n).astype(float),
+    }, index=index)
+
+
+def _assert_matches_engine(df: pd.DataFrame, label: str):
+    frame = indicator_state.get_frame('TEST', '30m', df)
+    expected = indicator_engine.compute(df).loc[frame.index]
+    for name in expected.columns:
+        if name.startswith(('EMA', 'MACD')):
+            continue  # EMA state is seeded at the checkpoint's first bar, not the window's
+        actual, reference = frame[name].values, expected[name].values
+        assert (np.isnan(actual) == np.isnan(reference)).all(), f"{label} {name}: NaN layout differs"
+        assert np.allclose(actual, reference, rtol=1e-9, equal_nan=True), f"{label} {name}: values differ"
+
+
+@contextmanager
+def _state_dir():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory, \
+            patched(indicator_state, INDICATOR_STATE_DIR=directory):
+        indicator_state.clear()
+        try:
+            yield
+        finally:
+            indicator_state.clear()
+
+
+@using(_state_dir)
+def test_append_bars():
+    df = _make_ohlcv()
+    _assert_matches_engine(df.iloc[:500], 'initial')
+    for end in (501, 505, 560):
+        _assert_matches_engine(df.iloc[:end], f'append to {end}')
+    _assert_matches_engine(df.iloc[40:600], 'window start moved')
+    print("✓ Appended bars update the state incrementally")
+
+
+@using(_state_dir)
+def test_forming_bar_does_not_advance_state():
+    df = _make_ohlcv().iloc[:400].copy()
+    indicator_state.get_frame('TEST', '30m', df)
+    closed_ts = indicator_state._states[('TEST', '30m')].last_ts
+    assert closed_ts == df.index[-2], "forming bar must not be committed"
+
+    df.iloc[-1, df.columns.get_loc('Close')] *= 1.02  # the forming bar keeps changing
+    _assert_matches_engine(df, 'revised forming bar')
+    assert indicator_state._states[('TEST', '30m')].last_ts == closed_ts
+    print("✓ Forming bar is applied to a copy only")
+
+
+@using(_state_dir)
+def test_checkpoint_reload_and_rebuild():
+    df = _make_ohlcv()
+    indicator_state.get_frame('TEST', '30m', df.iloc[:450])
+    indicator_state.clear()  # drop memory; next call loads from disk
+    _assert_matches_engine(df.iloc[:470], 'reloaded')
+
+    adjusted = df.iloc[:480].copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] *= 0.5  # split adjustment rewrites history
+    _assert_matches_engine(adjusted, 'rebuilt')
+    print("✓ Checkpoints reload from disk and rebuild on revised history")
+
+
+@using(_state_dir)
+def test_vwap_prefix_sums_follow_the_anchor():
+    df = _make_ohlcv()
+    for start in range(0, 300, 30):
+        # A rolling request window: the anchor moves forward with every refresh
+        _assert_matches_engine(df.iloc[start:start + 400], f'window from {start}')
+        state = indicator_state._states[('TEST', '30m')]
+        assert len(state.cum_ts) <= 401, f"prefix sums grew to {len(state.cum_ts)} bars"
+        assert start == 0 or state.cum_ts[0] == df.index[start - 1], "VWAP base bar must precede the anchor"
+    print("✓ VWAP prefix sums are trimmed to the requested window")
+
+
+def main():
+    test_append_bars()
+    test_forming_bar_does_not_advance_state()
+    test_checkpoint_reload_and_rebuild()
+    test_vwap_prefix_sums_follow_the_anchor()
+    print("\nAll indicator state tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
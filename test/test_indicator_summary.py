@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test compact indicator summaries (offline).
+
+Usage:
+    python test/test_indicator_summary.py
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import indicator_summary
+
+
+def test_describe():
+    series = pd.Series(np.arange(1.0, 101.0), index=pd.date_range('2024-01-01', periods=100))
+    info = indicator_summary.describe(series, lookback=60, slope_bars=10)
+    assert info['latest'] == 100.0
+    assert info['change'] == 1.0
+    assert abs(info['slope'] - 1.0) < 1e-9
+    assert info['percentile'] == 100.0
+    assert indicator_summary.describe(pd.Series([np.nan, np.nan])) is None
+    print("✓ describe")
+
+
+def test_crossover():
+    index = pd.date_range('2024-01-01', periods=30)
+    fast = pd.Series(np.r_[np.full(20, 1.0), np.full(10, 3.0)], index=index)
+    slow = pd.Series(2.0, index=index)
+    info = indicator_summary.crossover(fast, slow)
+    assert info['state'] == 'above'
+    assert info['direction'] == 'up'
+    assert info['last_cross'] == index[20]
+    assert info['bars_ago'] == 9
+
+    level = indicator_summary.crossover(fast, 5.0)
+    assert level['state'] == 'below' and level['last_cross'] is None
+    print("✓ crossover")
+
+
+def test_render():
+    series = pd.Series(np.linspace(10, 20, 50))
+    table = indicator_summary.render_table([('RSI-14', indicator_summary.describe(series)), ('ADX', None)])
+    assert table.count('\n') == 3 and '| ADX | n/a' in table
+    assert indicator_summary.format_timestamp(pd.Timestamp('2024-05-01')) == '2024-05-01'
+    assert indicator_summary.format_timestamp(pd.Timestamp('2024-05-01 15:30')) == '2024-05-01 15:30'
+    print("✓ render")
+
+
+def main():
+    test_describe()
+    test_crossover()
+    test_render()
+    print("\nAll indicator summary tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the async LLM path (offline).
+
+Stub clients with ainvoke/astream: many concurrent calls share the single
+event loop without extra threads, streamed output reaches the caller's job
+through run_async, retries apply, and clients for one base URL share a pool.
+
+Usage:
+    python test/test_llm_async.py
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from _helpers import patched, running_job
+from src.job_store import _jobs
+from src.utils import llm_client, llm_scheduler
+from src.utils.llm_client import ainvoke_llm_with_retry, run_async, get_http_clients
+from src.utils.cost_tracker import cost_tracker
+
+
+class _Message:
+    def __init__(self, type_, content):
+        self.type = type_
+        self.content = content
+
+
+class _AsyncLLM:
+    model = 'stub-model'
+
+    def __init__(self, delay=0.2, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset by peer")
+        return AIMessage(content=f"re: {messages[-1].content}",
+                         usage_metadata={'input_tokens': 5, 'output_tokens': 3, 'total_tokens': 8})
+
+    async def astream(self, messages, **kwargs):
+        for word in ['streamed ', 'reply']:
+            await asyncio.sleep(0.01)
+            yield AIMessageChunk(content=word)
+
+
+def _messages(text):
+    return [_Message('system', 'You are a test.'), _Message('human', text)]
+
+
+def test_concurrent_calls_share_one_loop():
+    llm = _AsyncLLM(delay=0.3)
+    cost_tracker.reset()
+    threads_before = threading.active_count()
+
+    async def _batch():
+        return await asyncio.gather(*[
+            ainvoke_llm_with_retry(llm, _messages(f"q{i}"), "Bull Analysis") for i in range(30)
+        ])
+
+    start = time.time()
+    # Provider limits are covered by test_llm_scheduler; lift them here. A configured
+    # hedge must not turn these calls (outside a job) into streams
+    with patched(llm_scheduler, LLM_MAX_CONCURRENCY=0), patched(llm_client, LLM_HEDGE_AFTER=30):
+        llm_scheduler.reset()
+        try:
+            replies = run_async(_batch())
+        finally:
+            llm_scheduler.reset()
+    elapsed = time.time() - start
+    assert replies == [f"re: q{i}" for i in range(30)]
+    assert elapsed < 2.0, f"30 concurrent calls took {elapsed:.1f}s"
+    # Only the shared loop thread may have been added
+    assert threading.active_count() <= threads_before + 1
+    assert cost_tracker.get_summary()['total_input_tokens'] == 150
+    print(f"✓ 30 concurrent async calls in {elapsed:.2f}s on one loop")
+
+
+def test_retry_and_stream_context():
+    with patched(llm_client, RETRY_DELAY=0):
+        llm = _AsyncLLM(delay=0, failures=1)
+        assert run_async(ainvoke_llm_with_retry(llm, _messages('x'), "Bear Analysis")) == 're: x'
+        assert llm.calls == 2
+
+    # Hedging is covered by test_llm_hedging
+    with running_job('test-async-stream') as job_id, patched(llm_client, LLM_HEDGE_AFTER=0):
+        text = run_async(ainvoke_llm_with_retry(_AsyncLLM(), _messages('y'), "Research Debate"))
+        assert text == 'streamed reply'
+        stream = _jobs[job_id]["streams"]["TEST_Research Debate"]
+        assert stream["text"] == text and stream["status"] == "completed"
+    print("✓ Async retry and job streaming through run_async")
+
+
+def test_http_pool_per_base_url():
+    a = get_http_clients('https://provider-a.test/v1')
+    b = get_http_clients('https://provider-a.test/v1')
+    c = get_http_clients('https://provider-b.test/v1')
+    assert a[0] is b[0] and a[1] is b[1]
+    assert a[0] is not c[0]
+    print("✓ One pooled client pair per base URL")
+
+
+def main():
+    test_concurrent_calls_share_one_loop()
+    test_retry_and_stream_context()
+    test_http_pool_per_base_url()
+    print("\nAll async LLM tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test the opt-in LLM response cache (offline).
+
+Uses a stub client and a temporary SQLite file: a repeated request is served
+from cache and recorded as a cache hit, TTL 0 steps and replay sessions bypass
+the cache, and the LRU bound evicts the least recently used entry.
+
+Usage:
+    python test/test_llm_cache.py
+"""
+
+import sys
+import os
+import time
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from _helpers import patched, patched_env, using
+from src.utils import llm_cache, replay
+from src.utils.llm_client import invoke_llm_with_retry
+from src.utils.cost_tracker import cost_tracker
+
+
+class _Message:
+    def __init__(self, type_, content):
+        self.type = type_
+        self.content = content
+
+
+class _Response:
+    def __init__(self, content):
+        self.content = content
+        self.usage_metadata = {'input_tokens': 1000, 'output_tokens': 500}
+
+
+class _StubLLM:
+    model = 'stub-model'
+    openai_api_base = 'http://stub/v1'
+
+    def __init__(self, temperature=0.7):
+        self.temperature = temperature
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return _Response(f"echo {self.calls}: {messages[-1].content}")
+
+
+@contextmanager
+def _cache():
+    llm_cache.close()
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory, \
+            patched(llm_cache, LLM_CACHE_PATH=os.path.join(directory, 'llm_cache.sqlite'),
+                    LLM_CACHE_MAX_ENTRIES=llm_cache.LLM_CACHE_MAX_ENTRIES), \
+            patched_env(LLM_CACHE='1', FINAGENT_REPLAY=None, LLM_CACHE_TTL_TRADING_PLAN=None):
+        cost_tracker.reset()
+        try:
+            yield
+        finally:
+            llm_cache.close()
+
+
+def _messages(text):
+    return [_Message('system', 'You are a test.'), _Message('human', text)]
+
+
+@using(_cache)
+def test_hit_is_tracked_separately():
+    llm = _StubLLM()
+    first = invoke_llm_with_retry(llm, _messages('AAPL'), "Bull Analysis")
+    second = invoke_llm_with_retry(llm, _messages('AAPL'), "Bull Analysis")
+    assert first == second
+    assert llm.calls == 1
+
+    summary = cost_tracker.get_summary()
+    assert summary['total_input_tokens'] == 1000, "hits must not count as billed usage"
+    assert summary['cache_hits'] == 1
+    assert summary['cached_input_tokens'] == 1000
+    assert summary['cached_output_tokens'] == 500
+    assert summary['saved_cost'] > 0
+
+    # Persistent: a fresh connection still hits
+    llm_cache.close()
+    assert invoke_llm_with_retry(llm, _messages('AAPL'), "Bull Analysis") == first
+    assert llm.calls == 1
+    print("✓ Cache hit served and tracked as savings")
+
+
+@using(_cache)
+def test_key_covers_prompt_and_sampling():
+    llm = _StubLLM()
+    base = llm_cache.make_key(llm, _messages('AAPL'))
+    assert llm_cache.make_key(llm, _messages('MSFT')) != base
+    assert llm_cache.make_key(_StubLLM(temperature=0.2), _messages('AAPL')) != base
+    assert llm_cache.make_key(_StubLLM(), _messages('AAPL')) == base
+    print("✓ Key covers messages and sampling parameters")
+
+
+@using(_cache)
+def test_ttl_and_bypass():
+    llm = _StubLLM()
+    assert llm_cache.get_ttl("Lesson Summary") == 0
+    invoke_llm_with_retry(llm, _messages('lesson'), "Lesson Summary")
+    invoke_llm_with_retry(llm, _messages('lesson'), "Lesson Summary")
+    assert llm.calls == 2, "TTL 0 steps are never cached"
+
+    os.environ['LLM_CACHE_TTL_TRADING_PLAN'] = '1'
+    assert llm_cache.get_ttl("Trading Plan") == 1
+    invoke_llm_with_retry(llm, _messages('plan'), "Trading Plan")
+    time.sleep(1.1)
+    invoke_llm_with_retry(llm, _messages('plan'), "Trading Plan")
+    assert llm.calls == 4, "expired entries are refetched"
+
+    os.environ['FINAGENT_REPLAY'] = 'record'
+    assert not llm_cache.is_enabled(), "record/replay sessions bypass the cache"
+    os.environ.pop('FINAGENT_REPLAY')
+    os.environ['LLM_CACHE'] = '0'
+    assert not llm_cache.is_enabled()
+    print("✓ Per-step TTLs and bypass")
+
+
+@using(_cache)
+def test_lru_eviction():
+    llm_cache.LLM_CACHE_MAX_ENTRIES = 2
+    for key in ('a', 'b'):
+        llm_cache.set(key, 'Test', 'stub-model', key, 1, 1, 60)
+        time.sleep(0.01)
+    assert llm_cache.get('a') is not None  # 'a' is now most recently used
+    time.sleep(0.01)
+    llm_cache.set('c', 'Test', 'stub-model', 'c', 1, 1, 60)
+    assert llm_cache.get('b') is None
+    assert llm_cache.get('a')['content'] == 'a'
+    assert llm_cache.get('c')['content'] == 'c'
+    print("✓ LRU eviction")
+
+
+def main():
+    test_hit_is_tracked_separately()
+    test_key_covers_prompt_and_sampling()
+    test_ttl_and_bypass()
+    test_lru_eviction()
+    print("\nAll LLM cache tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test hedged LLM requests (offline).
+
+Stub primary/backup clients with controllable first-token delays: a primary
+that stays silent past the hedge deadline loses to the backup, is cancelled
+and still billed, a fast primary never triggers the hedge, a primary that
+fails after the hedge started falls through to the backup, a backup on the
+primary's provider does not queue for a second slot, a primary that loses to a
+backup on another provider frees its slot (charged its estimated usage) while
+the backup is still generating, calls that do not stream (outside a job,
+LLM_STREAMING=0) are never hedged, and the async path cancels the losing task.
+
+Usage:
+    python test/test_llm_hedging.py
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from _helpers import patched, patched_env, running_job, using
+from src import job_store
+from src.utils import llm_client, llm_scheduler
+from src.utils.llm_client import invoke_llm_with_retry, ainvoke_llm_with_retry, run_async
+from src.utils.cost_tracker import cost_tracker
+
+
+class _Message:
+    def __init__(self, type_, content):
+        self.type = type_
+        self.content = content
+
+
+class _StubLLM:
+    def __init__(self, name, first_delay=0.0, fail_after=None, base_url=None, chunk_delay=0.01):
+        self.model = name
+        self.model_name = name
+        self.openai_api_base = base_url or f"https://{name}.test/v1"
+        self.first_delay = first_delay
+        self.fail_after = fail_after
+        self.chunk_delay = chunk_delay
+        self.invokes = 0
+        self.started = 0
+        self.closed = 0
+
+    def _chunks(self):
+        for word in [f"{self.model} ", 'says ', 'hi']:
+            yield AIMessageChunk(content=word)
+        yield AIMessageChunk(content='', usage_metadata={'input_tokens': 7, 'output_tokens': 3, 'total_tokens': 10})
+
+    def invoke(self, messages):
+        self.invokes += 1
+        return AIMessage(content=f"{self.model} says hi")
+
+    async def astream(self, messages, **kwargs):
+        self.started += 1
+        try:
+            if self.fail_after is not None:
+                await asyncio.sleep(self.fail_after)
+                raise ConnectionError("upstream closed")
+            await asyncio.sleep(self.first_delay)
+            for chunk in self._chunks():
+                yield chunk
+                await asyncio.sleep(self.chunk_delay)
+        finally:
+            self.closed += 1
+
+
+def _hedged(backup):
+    @contextmanager
+    def setup():
+        # Only streamed calls are hedged, and calls stream inside a job
+        with running_job('test-llm-hedging'), \
+                patched(llm_client, get_backup_llm=lambda llm: backup, LLM_HEDGE_AFTER=0.2, LLM_STREAMING=True):
+            llm_scheduler.reset()
+            cost_tracker.reset()
+            yield backup
+    return setup
+
+
+def _messages():
+    return [_Message('human', 'hello')]
+
+
+@using(_hedged(_StubLLM('backup')))
+def test_slow_primary_loses_to_backup(backup):
+    primary = _StubLLM('primary', first_delay=1.0)
+    start = time.time()
+    text = invoke_llm_with_retry(primary, _messages(), "Bull Analysis")
+    elapsed = time.time() - start
+    assert text == 'backup says hi'
+    assert elapsed < 0.8, f"hedge should bound latency, took {elapsed:.2f}s"
+    by_model = cost_tracker.get_summary()['by_model']
+    assert by_model['backup']['input_tokens'] == 7, "reported usage is billed to the responder"
+    assert by_model['primary']['input_tokens'] > 0, "the cancelled primary's prompt is billed too"
+
+    time.sleep(0.05)
+    assert primary.closed == 1, "the losing request must be cancelled, not left running"
+    print(f"✓ Slow primary hedged to backup ({elapsed:.2f}s)")
+
+
+@using(_hedged(_StubLLM('backup')))
+def test_fast_primary_never_hedges(backup):
+    primary = _StubLLM('primary', first_delay=0.0)
+    assert invoke_llm_with_retry(primary, _messages(), "Trading Plan") == 'primary says hi'
+    assert backup.started == 0
+    print("✓ Fast primary does not hedge")
+
+
+@using(_hedged(_StubLLM('backup', first_delay=0.5)))
+def test_primary_failure_falls_to_backup(backup):
+    primary = _StubLLM('primary', fail_after=0.3)
+    assert invoke_llm_with_retry(primary, _messages(), "Research Debate", max_retries=0) == 'backup says hi'
+    print("✓ Primary failure after hedge uses backup")
+
+
+@using(_hedged(_StubLLM('backup', base_url='https://zenmux.ai/api/v1')))
+def test_same_provider_backup_shares_slot(backup):
+    with patched_env(LLM_MAX_CONCURRENCY_ZENMUX='1'):
+        llm_scheduler.reset()
+        try:
+            primary = _StubLLM('primary', first_delay=1.0, base_url='https://zenmux.ai/api/v1')
+            start = time.time()
+            assert invoke_llm_with_retry(primary, _messages(), "Bull Analysis") == 'backup says hi'
+            assert time.time() - start < 0.8, "the hedge must not queue behind the primary's own slot"
+        finally:
+            llm_scheduler.reset()
+    print("✓ Same-provider hedge runs under the primary's slot")
+
+
+@using(_hedged(_StubLLM('backup', chunk_delay=0.4)))
+def test_losing_primary_frees_its_slot(backup):
+    zenmux = 'https://zenmux.ai/api/v1'
+    with patched_env(LLM_MAX_CONCURRENCY_ZENMUX='1', LLM_TPM_ZENMUX='100000'):
+        llm_scheduler.reset()
+        try:
+            primary = _StubLLM('primary', first_delay=5.0, base_url=zenmux)
+            # Same job context, so the call streams and hedges
+            call = threading.Thread(target=contextvars.copy_context().run,
+                                    args=(invoke_llm_with_retry, primary, _messages(), "Bull Analysis"))
+            call.start()
+            time.sleep(0.4)  # backup has answered first and is still generating
+
+            start = time.time()
+            with llm_scheduler.slot(_StubLLM('next', base_url=zenmux), _messages(), "Bear Analysis"):
+                waited = time.time() - start
+                assert call.is_alive(), "the backup should still be generating"
+            call.join()
+            assert waited < 0.1, f"the cancelled primary kept its provider slot for {waited:.2f}s"
+
+            charged = llm_scheduler.get_scheduler(zenmux)._window[0][1]
+            assert charged.used_tokens == len('hello') // 4, "the loser is charged its estimated usage, not the reservation"
+        finally:
+            llm_scheduler.reset()
+    print("✓ Losing primary frees its provider slot while the backup generates")
+
+
+@using(_hedged(_StubLLM('backup')))
+def test_no_hedge_without_streaming(backup):
+    primary = _StubLLM('primary', first_delay=1.0)
+    llm_client.LLM_STREAMING = False
+    assert invoke_llm_with_retry(primary, _messages(), "Trading Plan") == 'primary says hi'
+
+    llm_client.LLM_STREAMING = True
+    token = job_store.set_stream_target(None, 'TEST')  # outside a job
+    try:
+        assert invoke_llm_with_retry(primary, _messages(), "Trading Plan") == 'primary says hi'
+    finally:
+        job_store.reset_stream_target(token)
+    assert primary.invokes == 2 and primary.started == 0 and backup.started == 0
+    print("✓ Calls that do not stream are never hedged")
+
+
+@using(_hedged(_StubLLM('backup')))
+def test_async_hedge_cancels_loser(backup):
+    primary = _StubLLM('primary', first_delay=5.0)
+    start = time.time()
+    text = run_async(ainvoke_llm_with_retry(primary, _messages(), "Bear Analysis"))
+    assert text == 'backup says hi'
+    assert time.time() - start < 1.0
+    time.sleep(0.05)
+    assert primary.closed == 1, "losing task must be cancelled"
+    print("✓ Async hedge cancels the losing task")
+
+
+def main():
+    test_slow_primary_loses_to_backup()
+    test_fast_primary_never_hedges()
+    test_primary_failure_falls_to_backup()
+    test_same_provider_backup_shares_slot()
+    test_losing_primary_frees_its_slot()
+    test_no_hedge_without_streaming()
+    test_async_hedge_cancels_loser()
+    print("\nAll hedging tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Test per-provider LLM scheduling (offline).
+
+Stub clients only: the concurrency cap holds per provider, queued calls are
+granted round-robin across jobs, the tokens-per-minute window delays calls
+over budget, async waiters queue on the same scheduler, a call still queued at
+its step deadline is dropped without being sent, and queue wait is reported
+separately from model latency.
+
+Usage:
+    python test/test_llm_scheduler.py
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage
+
+from _helpers import patched, patched_env, using
+from src.utils import llm_scheduler
+from src.utils.llm_scheduler import ProviderScheduler, Slot, QueueTimeoutError
+from src.utils.api_key_selector import get_provider_for_url
+from src.utils.llm_client import invoke_llm_with_retry, ainvoke_llm_with_retry, run_async
+from src.utils.cost_tracker import cost_tracker
+
+
+class _Message:
+    def __init__(self, type_, content):
+        self.type = type_
+        self.content = content
+
+
+class _SlowLLM:
+    model = 'stub-model'
+
+    def __init__(self, base_url, delay=0.1):
+        self.openai_api_base = base_url
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def invoke(self, messages):
+        self._enter()
+        time.sleep(self.delay)
+        self._exit()
+        return AIMessage(content='ok', usage_metadata={'input_tokens': 1, 'output_tokens': 1, 'total_tokens': 2})
+
+    async def ainvoke(self, messages):
+        self._enter()
+        await asyncio.sleep(self.delay)
+        self._exit()
+        return AIMessage(content='ok', usage_metadata={'input_tokens': 1, 'output_tokens': 1, 'total_tokens': 2})
+
+
+def _limits(concurrency, provider='zenmux'):
+    @contextmanager
+    def setup():
+        with patched_env(**{f"LLM_MAX_CONCURRENCY_{provider.upper()}": str(concurrency)}):
+            llm_scheduler.reset()
+            cost_tracker.reset()
+            try:
+                yield
+            finally:
+                llm_scheduler.reset()
+    return setup
+
+
+def _messages():
+    return [_Message('human', 'hi')]
+
+
+def test_provider_ids():
+    assert get_provider_for_url('https://zenmux.ai/api/v1') == 'zenmux'
+    assert get_provider_for_url('https://apihub.agnes-ai.com/v1') == 'agnes'
+    assert get_provider_for_url('http://localhost:8080/v1/') == 'http://localhost:8080/v1'
+    print("✓ Provider ids from URL prefixes")
+
+
+@using(_limits(2))
+def test_concurrency_cap_and_queue_wait():
+    llm = _SlowLLM('https://zenmux.ai/api/v1', delay=0.1)
+    other = _SlowLLM('https://apihub.agnes-ai.com/v1', delay=0.1)
+    threads = [threading.Thread(target=invoke_llm_with_retry, args=(llm, _messages(), "Bull Analysis"))
+               for _ in range(6)]
+    threads += [threading.Thread(target=invoke_llm_with_retry, args=(other, _messages(), "Fund Holdings"))
+                for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert llm.peak == 2, f"zenmux peak {llm.peak}"
+    assert other.peak == 3, "agnes calls must not wait on zenmux capacity"
+
+    summary = cost_tracker.get_summary()
+    bull = summary['by_step_latency']['Bull Analysis']
+    assert bull['calls'] == 6 and bull['provider'] == 'zenmux'
+    assert bull['queue_wait'] >= 0.4, "4 of 6 calls queued behind the cap"
+    assert summary['by_step_latency']['Fund Holdings']['queue_wait'] < 0.1
+    assert summary['model_latency_seconds'] >= 0.8
+    print("✓ Concurrency cap per provider, queue wait reported separately")
+
+
+def test_round_robin_across_jobs():
+    scheduler = ProviderScheduler('test', max_concurrency=1, tpm=0)
+    holder = scheduler.acquire(Slot('test', 'A', 'step', 1))
+    order = []
+
+    def _wait(job, n):
+        slot = scheduler.acquire(Slot('test', job, f"{job}{n}", 1))
+        order.append(slot.step_name)
+        time.sleep(0.01)
+        scheduler.release(slot)
+
+    threads = []
+    for job, n in [('A', 1), ('A', 2), ('A', 3), ('B', 1), ('B', 2)]:
+        t = threading.Thread(target=_wait, args=(job, n))
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)  # deterministic enqueue order
+    scheduler.release(holder)
+    for t in threads:
+        t.join()
+    assert order == ['A1', 'B1', 'A2', 'B2', 'A3'], order
+    print("✓ Round-robin across jobs")
+
+
+def test_token_budget_window():
+    with patched(llm_scheduler, TPM_WINDOW=0.3):
+        scheduler = ProviderScheduler('test', max_concurrency=0, tpm=1000)
+        first = scheduler.acquire(Slot('test', 'A', 'one', 600))
+        scheduler.release(first)
+        start = time.time()
+        second = scheduler.acquire(Slot('test', 'A', 'two', 600))
+        waited = time.time() - start
+        scheduler.release(second)
+        assert 0.2 <= waited < 1.0, f"waited {waited:.2f}s"
+
+        # Reported usage replaces the estimate: a small actual call frees budget
+        third = scheduler.acquire(Slot('test', 'A', 'three', 900))
+        third.used_tokens = 100
+        scheduler.release(third)
+        start = time.time()
+        scheduler.release(scheduler.acquire(Slot('test', 'A', 'four', 800)))
+        assert time.time() - start < 0.1
+    print("✓ Tokens-per-minute window")
+
+
+def test_oversized_call_after_window_expires():
+    with patched(llm_scheduler, TPM_WINDOW=0.2):
+        scheduler = ProviderScheduler('test', max_concurrency=0, tpm=1000)
+        scheduler.release(scheduler.acquire(Slot('test', 'A', 'small', 900)))
+        time.sleep(0.3)  # the window has expired but not been pruned yet
+        start = time.time()
+        scheduler.release(scheduler.acquire(Slot('test', 'A', 'oversized', 5000), timeout=2))
+        assert time.time() - start < 0.1, "an oversized call must run once the window is empty"
+    print("✓ Oversized call runs once the window has expired")
+
+
+def test_queue_timeout_dequeues():
+    scheduler = ProviderScheduler('test', max_concurrency=1, tpm=0)
+    holder = scheduler.acquire(Slot('test', 'A', 'holder', 1))
+    try:
+        scheduler.acquire(Slot('test', 'A', 'late', 1), timeout=0.1)
+        raise AssertionError("expected QueueTimeoutError")
+    except QueueTimeoutError:
+        pass
+    assert scheduler.stats()['queued'] == 0
+    scheduler.release(holder)
+    assert scheduler.stats()['in_flight'] == 0, "an expired waiter must never be granted"
+    print("✓ Expired waiters leave the queue")
+
+
+@using(_limits(1))
+def test_step_deadline_bounds_queueing():
+    llm = _SlowLLM('https://zenmux.ai/api/v1', delay=0.5)
+    busy = threading.Thread(target=invoke_llm_with_retry, args=(llm, _messages(), "Bull Analysis"))
+    busy.start()
+    time.sleep(0.05)
+
+    token = llm_scheduler.set_deadline(time.time() + 0.1)
+    start = time.time()
+    try:
+        invoke_llm_with_retry(llm, _messages(), "Bear Analysis")
+        raise AssertionError("expected QueueTimeoutError")
+    except QueueTimeoutError:
+        pass
+    finally:
+        llm_scheduler.reset_deadline(token)
+    assert time.time() - start < 0.3, "queue timeouts must not be retried"
+    busy.join()
+    assert llm.peak == 1 and 'Bear Analysis' not in cost_tracker.get_summary()['by_step_latency']
+    print("✓ Calls queued past the step deadline are never sent")
+
+
+@using(_limits(1))
+def test_async_calls_queue():
+    llm = _SlowLLM('https://zenmux.ai/api/v1', delay=0.05)
+
+    async def _batch():
+        return await asyncio.gather(*[ainvoke_llm_with_retry(llm, _messages(), "Research Debate") for _ in range(4)])
+
+    assert run_async(_batch()) == ['ok'] * 4
+    assert llm.peak == 1
+    assert cost_tracker.get_summary()['by_step_latency']['Research Debate']['queue_wait'] >= 0.1
+    print("✓ Async calls share the provider queue")
+
+
+def main():
+    test_provider_ids()
+    test_concurrency_cap_and_queue_wait()
+    test_round_robin_across_jobs()
+    test_token_budget_window()
+    test_oversized_call_after_window_expires()
+    test_queue_timeout_dequeues()
+    test_step_deadline_bounds_queueing()
+    test_async_calls_queue()
+    print("\nAll LLM scheduler tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
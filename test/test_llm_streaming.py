@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test streaming LLM responses into the job store (offline).
+
+A stub client streams message chunks: partial text must appear in the job's
+"streams" while the call runs, usage is aggregated for cost tracking, a stream
+that goes quiet is cut by the stall timeout (closing the request), and calls
+outside a job still use blocking invoke().
+
+Usage:
+    python test/test_llm_streaming.py
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from _helpers import patched, running_job, using
+from src.job_store import _jobs, _jobs_lock
+from src.utils import llm_client
+from src.utils.llm_client import invoke_llm_with_retry, StreamStalledError
+from src.utils.cost_tracker import cost_tracker
+
+
+class _Message:
+    def __init__(self, type_, content):
+        self.type = type_
+        self.content = content
+
+
+class _StreamingLLM:
+    model = 'stub-model'
+
+    def __init__(self, words, delay=0.0, hang_after=None):
+        self.words = words
+        self.delay = delay
+        self.hang_after = hang_after
+        self.invokes = 0
+        self.closed = 0
+
+    def invoke(self, messages):
+        self.invokes += 1
+        return AIMessage(content=''.join(self.words))
+
+    async def astream(self, messages, **kwargs):
+        try:
+            for i, word in enumerate(self.words):
+                if self.hang_after is not None and i == self.hang_after:
+                    await asyncio.sleep(5)  # the provider stops sending
+                await asyncio.sleep(self.delay)
+                yield AIMessageChunk(content=word)
+            yield AIMessageChunk(content='', usage_metadata={'input_tokens': 10, 'output_tokens': len(self.words),
+                                                             'total_tokens': 10 + len(self.words)})
+        finally:
+            self.closed += 1
+
+
+@contextmanager
+def _job():
+    # Hedging is covered by test_llm_hedging
+    with running_job('test-llm-streaming') as job_id, patched(llm_client, LLM_HEDGE_AFTER=0):
+        cost_tracker.reset()
+        yield job_id
+
+
+def _messages():
+    return [_Message('system', 'You are a test.'), _Message('human', 'go')]
+
+
+@using(_job)
+def test_partial_text_visible_while_running(job_id):
+    llm = _StreamingLLM(['Bull ', 'case ', 'is ', 'strong.'], delay=0.1)
+    result = {}
+    # Worker threads see the job only through a copied context, as in the pipeline
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(
+        lambda: result.update(text=invoke_llm_with_retry(llm, _messages(), "Bull Analysis")),))
+    worker.start()
+
+    partial = ''
+    deadline = time.time() + 5
+    while time.time() < deadline and not partial:
+        with _jobs_lock:
+            stream = _jobs[job_id]["streams"].get("TEST_Bull Analysis")
+            if stream and stream["status"] == "streaming" and stream["text"]:
+                partial = stream["text"]
+        time.sleep(0.02)
+    worker.join()
+
+    assert partial and partial != 'Bull case is strong.', "partial output must be visible mid-stream"
+    assert result['text'] == 'Bull case is strong.'
+    stream = _jobs[job_id]["streams"]["TEST_Bull Analysis"]
+    assert stream["status"] == "completed" and stream["text"] == result['text']
+    assert llm.invokes == 0
+    summary = cost_tracker.get_summary()
+    assert summary['total_input_tokens'] == 10 and summary['total_output_tokens'] == 4
+    print("✓ Partial text streamed to job store")
+
+
+@using(_job)
+def test_stalled_stream_is_cut(job_id):
+    llm = _StreamingLLM(['one ', 'two'], hang_after=1)
+    start = time.time()
+    try:
+        llm_client._stream_llm(llm, _messages(), "Bear Analysis", stall_timeout=0.3)
+        raise AssertionError("expected StreamStalledError")
+    except StreamStalledError as e:
+        assert 'timeout' in str(e).lower(), "stalls must count as retryable timeouts"
+    assert time.time() - start < 2
+    time.sleep(0.05)
+    assert llm.closed == 1, "the stalled request must be closed, not left hanging"
+    print("✓ Stalled stream cut early and closed")
+
+
+def test_blocking_outside_job():
+    # A configured hedge must not turn calls outside a job into streams
+    with patched(llm_client, get_backup_llm=lambda llm: _StreamingLLM(['backup']), LLM_HEDGE_AFTER=30):
+        llm = _StreamingLLM(['plain'])
+        assert invoke_llm_with_retry(llm, _messages(), "Trading Plan") == 'plain'
+        assert llm.invokes == 1 and llm.closed == 0
+    print("✓ Blocking invoke outside a job")
+
+
+def main():
+    test_partial_text_visible_while_running()
+    test_stalled_stream_is_cut()
+    test_blocking_outside_job()
+    print("\nAll streaming tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
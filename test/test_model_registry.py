@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the model registry (offline): single-flight training, atomic saves and
+the in-memory model cache.
+
+Usage:
+    python test/test_model_registry.py
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from _helpers import patched, using
+from src.utils import model_registry
+
+
+@contextmanager
+def _registry():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory, \
+            patched(model_registry, MODEL_DIR=directory):
+        model_registry.clear()
+        try:
+            yield
+        finally:
+            model_registry.clear()
+
+
+@using(_registry)
+def test_single_flight_training():
+    calls = []
+
+    def trainer():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'weights': [1, 2, 3]}, {'holdout_accuracy': 0.6}
+
+    threads = [threading.Thread(target=model_registry.train, args=('meta_label', 'aapl', 1, trainer))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1, f"expected one trainer run, got {len(calls)}"
+    entry = model_registry.load('meta_label', 'AAPL', 1)
+    assert entry['model'] == {'weights': [1, 2, 3]}
+    assert not model_registry.is_stale(entry)
+    assert model_registry.load('meta_label', 'AAPL', 2) is None, "schema versions must not mix"
+    print("✓ Concurrent trainers collapse into one run")
+
+
+@using(_registry)
+def test_cached_load():
+    model_registry.save('meta_label', 'MSFT', 1, {'v': 1})
+    first = model_registry.load('meta_label', 'MSFT', 1)
+    assert model_registry.load('meta_label', 'MSFT', 1) is first, "unchanged file should hit the cache"
+
+    model_registry.clear()
+    reloaded = model_registry.load('meta_label', 'MSFT', 1)
+    assert reloaded is not first and reloaded['model'] == {'v': 1}
+    print("✓ Loaded models are cached until the file changes")
+
+
+def main():
+    test_single_flight_training()
+    test_cached_load()
+    print("\nAll model registry tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,12 @@ Usage:
     python test_regression.py --step 8.1         # Test only step 8.1
     python test_regression.py --step 1,2,3       # Test steps 1, 2, and 3
     python test_regression.py --symbol NVDA      # Test with different symbol
+    python test_regression.py --record           # Call live services, save cassettes
+    python test_regression.py --replay           # Offline run from saved cassettes
+    python test_regression.py --replay --batch AAPL,NVDA,MSFT   # Time run_batch_pipeline offline
+
+Record/replay can also be switched on with FINAGENT_REPLAY=record / FINAGENT_REPLAY=1
+(cassettes live in FINAGENT_CASSETTE_DIR, default test/cassettes; see src/utils/replay.py).
 """
 
 import sys
@@ -356,6 +362,23 @@ def run_step_test(step_id, symbol, period, prev_results=None):
             return None
 
 
+def run_batch_benchmark(symbols, period):
+    """Run the full batch pipeline once and report wall-clock time."""
+    from src.workflow_parallel import run_batch_pipeline
+
+    print(f"\nBatch benchmark: {','.join(symbols)} ({period}), "
+          f"FINAGENT_REPLAY={os.getenv('FINAGENT_REPLAY', '') or 'off'}")
+    start = time.time()
+    results = run_batch_pipeline(symbols, period)
+    elapsed = time.time() - start
+
+    failed = [r.get('symbol') for r in results if not r.get('success')]
+    print(f"\n✓ Batch finished in {elapsed:.1f}s ({len(results) - len(failed)}/{len(results)} completed)")
+    if failed:
+        print(f"✗ Failed: {', '.join(str(f) for f in failed)}")
+    return 0 if not failed else 1
+
+
 def main():
     """Run regression tests."""
     parser = argparse.ArgumentParser(description='FinAgent Pipeline Regression Tests')
@@ -365,8 +388,22 @@ def main():
                        help='Stock symbol to test')
     parser.add_argument('--period', type=str, default=DEFAULT_PERIOD,
                        help='Investment period')
+    parser.add_argument('--record', action='store_true',
+                       help='Record live responses to cassettes (FINAGENT_REPLAY=record)')
+    parser.add_argument('--replay', action='store_true',
+                       help='Replay responses from cassettes only (FINAGENT_REPLAY=1)')
+    parser.add_argument('--batch', type=str, default=None,
+                       help='Time run_batch_pipeline for comma-separated symbols instead of per-step tests')
     args = parser.parse_args()
 
+    if args.record:
+        os.environ['FINAGENT_REPLAY'] = 'record'
+    elif args.replay:
+        os.environ['FINAGENT_REPLAY'] = '1'
+
+    if args.batch:
+        return run_batch_benchmark([s.strip().upper() for s in args.batch.split(',')], args.period)
+
     symbol = args.symbol
     period = args.period
 
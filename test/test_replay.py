@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test record/replay cassettes (offline).
+
+Serves a JSON document from a local HTTP server, records it through http_get and
+fetch_all, shuts the server down and checks that replay returns the same bytes.
+LLM record/replay is checked with a stub client.
+
+Usage:
+    python test/test_replay.py
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from _helpers import patched, patched_env, using
+
+from src.utils import replay
+from src.utils.http_session import http_get
+from src.utils.async_fetch import fetch_all
+from src.utils.llm_client import invoke_llm_with_retry
+from src.utils.cost_tracker import cost_tracker
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({'path': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Message:
+    def __init__(self, type_, content):
+        self.type = type_
+        self.content = content
+
+
+class _Response:
+    def __init__(self, content):
+        self.content = content
+        self.usage_metadata = {'input_tokens': 12, 'output_tokens': 34}
+
+
+class _StubLLM:
+    model = 'stub-model'
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return _Response(f"echo: {messages[-1].content}")
+
+
+@contextmanager
+def _cassettes():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory, \
+            patched(replay, CASSETTE_DIR=directory), patched_env(FINAGENT_REPLAY=None):
+        yield
+
+
+@using(_cassettes)
+def test_http_record_then_replay():
+    server = HTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/chart"
+
+    os.environ['FINAGENT_REPLAY'] = 'record'
+    live = http_get(url, params={'range': '1y', 'period2': '123'})
+    live_batch = fetch_all([{'url': url, 'params': {'page': 1}}, {'url': url, 'params': {'page': 2}}])
+    server.shutdown()
+    server.server_close()
+
+    os.environ['FINAGENT_REPLAY'] = '1'
+    # period2 is volatile, so a different "now" still hits the same cassette
+    replayed = http_get(url, params={'range': '1y', 'period2': '999'})
+    assert replayed.status_code == 200
+    assert replayed.json() == live.json()
+
+    replayed_batch = fetch_all([{'url': url, 'params': {'page': 1}}, {'url': url, 'params': {'page': 2}}])
+    assert [r.json() for r in replayed_batch] == [r.json() for r in live_batch]
+
+    try:
+        http_get(url, params={'range': '5y'})
+        raise AssertionError("expected ReplayMissError")
+    except replay.ReplayMissError:
+        pass
+    print("✓ HTTP record/replay")
+
+
+@using(_cassettes)
+def test_llm_record_then_replay():
+    llm = _StubLLM()
+    messages = [_Message('system', 'You are a test.'), _Message('human', 'hello')]
+
+    os.environ['FINAGENT_REPLAY'] = 'record'
+    recorded = invoke_llm_with_retry(llm, messages, "Test Step")
+
+    os.environ['FINAGENT_REPLAY'] = '1'
+    cost_tracker.reset()
+    replayed = invoke_llm_with_retry(llm, messages, "Test Step")
+    assert replayed == recorded
+    assert llm.calls == 1, "replay must not call the model"
+    assert cost_tracker.get_summary()['total_input_tokens'] == 12
+    print("✓ LLM record/replay")
+
+
+@using(_cassettes)
+def test_library_call_replay():
+    os.environ['FINAGENT_REPLAY'] = 'record'
+    replay.call('yfinance', {'call': 'info', 'symbol': 'TEST'}, lambda: {'longName': 'Test Corp'})
+
+    os.environ['FINAGENT_REPLAY'] = '1'
+    info = replay.call('yfinance', {'call': 'info', 'symbol': 'TEST'}, lambda: {'longName': 'LIVE'})
+    assert info == {'longName': 'Test Corp'}
+    print("✓ Library call record/replay")
+
+
+def main():
+    test_http_record_then_replay()
+    test_llm_record_then_replay()
+    test_library_call_replay()
+    print("\nAll replay tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
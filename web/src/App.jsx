@@ -62,6 +62,7 @@ function HomePage({ onLogout }) {
   const [symbolInput, setSymbolInput] = useState('');
   const [period, setPeriod] = useState('medium');
   const [log, setLog] = useState('');
+  const [streams, setStreams] = useState({});
   const [multiResults, setMultiResults] = useState([]);
   const [timing, setTiming] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -351,6 +352,7 @@ function HomePage({ onLogout }) {
     setMultiResults([]);
     setTiming(null);
     setExpandedPanels({});
+    setStreams({});
     setLog(`🚀 Starting analysis for ${symbols.join(', ')} (${period})...\n`);
 
     // Create new AbortController for this request with 10-minute timeout
@@ -400,6 +402,9 @@ function HomePage({ onLogout }) {
 
           const statusData = await statusResponse.json();
 
+          // Partial LLM output of steps still generating
+          setStreams(statusData.status === 'running' ? (statusData.streams || {}) : {});
+
           // Show real-time step updates while running
           if (statusData.status === 'running' && statusData.step_logs && statusData.step_logs.length > 0) {
             // Only show new logs (track by length)
@@ -446,11 +451,14 @@ function HomePage({ onLogout }) {
 
             // Log cost summary
             let totalCost = 0, totalInputTokens = 0, totalOutputTokens = 0, costByModel = {};
+            let queueWait = 0, modelLatency = 0;
             data.results.forEach(result => {
               if (result.cost_summary) {
                 totalCost += result.cost_summary.total_cost || 0;
                 totalInputTokens += result.cost_summary.total_input_tokens || 0;
                 totalOutputTokens += result.cost_summary.total_output_tokens || 0;
+                queueWait += result.cost_summary.queue_wait_seconds || 0;
+                modelLatency += result.cost_summary.model_latency_seconds || 0;
                 if (result.cost_summary.by_model) {
                   Object.entries(result.cost_summary.by_model).forEach(([model, info]) => {
                     if (!costByModel[model]) costByModel[model] = { input: 0, output: 0, cost: 0 };
@@ -467,6 +475,9 @@ function HomePage({ onLogout }) {
               Object.entries(costByModel).forEach(([model, info]) => {
                 costLog += `   ${model}: HK$${info.cost.toFixed(1)} (${info.input.toLocaleString()} in / ${info.output.toLocaleString()} out)\n`;
               });
+              if (modelLatency > 0) {
+                costLog += `   ⏱️ Provider queue wait: ${queueWait.toFixed(1)}s, model time: ${modelLatency.toFixed(1)}s\n`;
+              }
               setLog(prev => prev + costLog);
             }
 
@@ -736,6 +747,12 @@ function HomePage({ onLogout }) {
               </div>
               <div ref={logEndRef} />
             </div>
+            {Object.values(streams).filter(s => s.status === 'streaming').map(s => (
+              <div key={`${s.symbol}_${s.step}`} className="mt-3 bg-black/40 rounded-xl p-3 font-mono text-xs text-slate-400 border border-slate-800/50">
+                <div className="text-cyan-500 mb-1">✍️ [{s.symbol}] {s.step} ({(s.chars ?? s.text.length).toLocaleString()} chars)</div>
+                <div className="whitespace-pre-wrap max-h-24 overflow-hidden">…{s.text.slice(-400)}</div>
+              </div>
+            ))}
           </div>
         </section>
 